@@ -0,0 +1,790 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+import sys
+import os
+import re
+import gzip
+import json
+import shutil
+import subprocess
+import tempfile
+import time
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import transport as MwTransport
+
+DIR_PROJECT = os.path.dirname(os.path.realpath(__file__))
+DIR_GLOBAL = os.path.dirname(os.path.dirname(DIR_PROJECT))
+
+# Files of end-to-end benchmark, they are written to temporary folder and removed after run
+FILE_BENCH_CONFIG = "benchmark.json"
+FILE_BENCH_SCRIPT = "benchmark-script.py"
+FOLDER_BENCH_WIKI = "mwparser-benchmark"
+
+# Data type number, namespace and name of every step, in the order they depend on each other
+BENCH_MODES = (
+    ("1", "0", "allpages"),
+    ("1", "6", "allpages-files"),
+    ("2", "0", "pageids"),
+    ("3", "", "recentchanges"),
+    ("4", "", "pagesrecent"),
+    ("5", "", "savefiles"),
+    ("7", "0", "allcontent"),
+    ("6", "0", "history"),
+)
+
+# Stub server answers at once, limit of real wikis would hide speed of parser
+BENCH_OVERRIDES_DEFAULT = {
+    "MwRateLimit.SETTING_RATE_MAX": "1000.0",
+}
+
+BYTES_IN_MB = 1024 * 1024
+
+BENCH_HEADERS = {
+    "User-Agent": "MyGuildWarsBot/1.2 (burova.anna+parser+bot@gmail.com)",
+    "Accept-Encoding": "gzip",
+}
+
+BENCH_PARAMS = {
+    "action": "query",
+    "format": "json",
+    "maxlag": "2",
+    "utf8": "true",
+    "formatversion": "2",
+    "prop": "revisions",
+    "rvprop": "content",
+    "rvslots": "*",
+    "pageids": "1|2|3|4|5",
+}
+
+
+class StubApiHandler(BaseHTTPRequestHandler):
+    """Answer api.php queries of all modes with synthetic pages, list answers continue like on real wiki."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, without it keep-alive answers wait for delayed ACK
+    disable_nagle_algorithm = True
+    server: StubApiServer
+
+    def log_message(
+            self,
+            format: str,
+            *args
+            ) -> None:
+        pass
+
+    def do_GET(
+            self
+            ) -> None:
+        time_request = time.perf_counter()
+        url_parts = urlsplit(self.path)
+        params = {key: values[0] for key, values in parse_qs(url_parts.query).items()}
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if url_parts.path.startswith("/img/"):
+            self.server.count_items("images", 1)
+            self.send_body(b"\x89PNG" + b"x" * self.server.image_size, "image/png", time_request)
+            return
+
+        page_continue = params.get("apcontinue", params.get("gapcontinue"))
+        if page_continue is not None and page_continue.replace(" ", "_") in self.server.forbidden_titles:
+            self.send_forbidden(time_request)
+            return
+
+        if params.get("generator") == "allpages":
+            answer = self.get_allcontent(params)
+        elif params.get("list") == "allpages":
+            answer = self.get_allpages(params)
+        elif params.get("list") == "recentchanges":
+            answer = self.get_recentchanges(params)
+        elif params.get("prop") == "imageinfo":
+            answer = self.get_imageinfo(params)
+        # Only history asks for several revisions of one page, revision IDs of incremental pageids come without rvlimit
+        elif params.get("prop") == "revisions" and "rvlimit" in params:
+            answer = self.get_history(params)
+        else:
+            answer = self.get_pages(params)
+
+        body = json.dumps(answer).encode("utf-8")
+
+        # Broken answer makes parser split batch of page IDs, single page is always complete
+        if answer.get("broken"):
+            body = body[:len(body) // 2]
+
+        self.send_body(body, "application/json; charset=utf-8", time_request)
+
+    def get_page_ids(
+            self,
+            namespace: int
+            ) -> range:
+        if namespace == 6:
+            return range(self.server.pages + 1, self.server.pages + self.server.images + 1)
+        return range(1, self.server.pages + 1)
+
+    def get_title(
+            self,
+            page_id: int
+            ) -> str:
+        # Numbers with leading zeros keep title order the same as page ID order
+        if page_id > self.server.pages:
+            return f"File:Image {page_id:07d}.png"
+        return f"Page {page_id:07d}"
+
+    def get_revision(
+            self,
+            page_id: int,
+            index_revision: int,
+            rvprop: str
+            ) -> dict:
+        """Return revision with keys of rvprop, like wiki does, the last one is the current revision of page."""
+
+        revision: dict = {}
+        props = rvprop.split("|")
+        if "ids" in props:
+            revision["revid"] = page_id * 1000 + index_revision
+            revision["parentid"] = page_id * 1000 + index_revision - 1 if index_revision else 0
+        if "timestamp" in props:
+            revision["timestamp"] = f"2026-01-01T00:{index_revision // 60 % 60:02d}:{index_revision % 60:02d}Z"
+        if "user" in props:
+            revision["user"] = f"User {index_revision % 7}"
+        if "sha1" in props:
+            revision["sha1"] = f"{page_id:020d}{index_revision:020d}"
+
+        if "content" in props:
+            # Every 20th page is redirect, so both folders get files
+            if page_id % 20 == 0:
+                content = "#REDIRECT [[Page 0000001]]"
+            else:
+                content = (f"Content of page {page_id}. " * (self.server.page_size // 20 + 1))[:self.server.page_size]
+            revision["slots"] = {"main": {"contentmodel": "wikitext", "contentformat": "text/x-wiki", "content": content}}
+
+        return revision
+
+    def get_page(
+            self,
+            page_id: int,
+            rvprop: str = "content"
+            ) -> dict:
+        if page_id > self.server.pages + self.server.images:
+            return {"pageid": page_id, "missing": True}
+
+        return {
+            "pageid": page_id,
+            "ns": 6 if page_id > self.server.pages else 0,
+            "title": self.get_title(page_id),
+            "revisions": [self.get_revision(page_id, self.server.revisions - 1, rvprop)],
+        }
+
+    def get_list_part(
+            self,
+            params: dict,
+            prefix: str
+            ) -> tuple[list[int], str | None]:
+        """Return page IDs of one list answer and continue title for the next one."""
+
+        page_ids = self.get_page_ids(int(params.get(f"{prefix}namespace", "0")))
+        index_start = 0
+        if f"{prefix}continue" in params:
+            page_id_start = int(params[f"{prefix}continue"].rsplit("_", 1)[-1].split(".")[0])
+            index_start = page_ids.index(page_id_start)
+
+        limit = self.server.list_limit
+        if params.get(f"{prefix}limit", "max") != "max":
+            limit = min(limit, int(params[f"{prefix}limit"]))
+
+        page_ids_part = list(page_ids[index_start:index_start + limit])
+        if index_start + limit >= len(page_ids):
+            return (page_ids_part, None)
+        return (page_ids_part, self.get_title(page_ids[index_start + limit]).replace(" ", "_"))
+
+    def get_allpages(
+            self,
+            params: dict
+            ) -> dict:
+        page_ids, continue_title = self.get_list_part(params, "ap")
+        self.server.count_items("rows", len(page_ids))
+
+        answer: dict = {
+            "batchcomplete": True,
+            "limits": {"allpages": self.server.list_limit},
+            "query": {"allpages": [
+                {"pageid": page_id, "ns": 6 if page_id > self.server.pages else 0, "title": self.get_title(page_id)}
+                for page_id in page_ids
+            ]},
+        }
+        if continue_title is not None:
+            answer["continue"] = {"apcontinue": continue_title, "continue": "-||"}
+        return answer
+
+    def get_allcontent(
+            self,
+            params: dict
+            ) -> dict:
+        page_ids, continue_title = self.get_list_part(params, "gap")
+
+        # Like wiki with too large result: the same pages come again with rvcontinue until all of them have content
+        index_content = page_ids.index(int(params["rvcontinue"])) if "rvcontinue" in params else 0
+        index_content_end = len(page_ids)
+        if self.server.content_limit:
+            index_content_end = min(index_content + self.server.content_limit, len(page_ids))
+        self.server.count_items("pages", index_content_end - index_content)
+
+        pages = []
+        for index_page, page_id in enumerate(page_ids):
+            page = self.get_page(page_id, params.get("rvprop", "content"))
+            if not index_content <= index_page < index_content_end:
+                page.pop("revisions", None)
+            pages.append(page)
+
+        answer: dict = {"query": {"pages": pages}}
+        if index_content_end < len(page_ids):
+            # Generator continues from the same place, its continue is sent back only if request had it
+            answer["continue"] = {"rvcontinue": str(page_ids[index_content_end]), "continue": "gapcontinue||"}
+            if "gapcontinue" in params:
+                answer["continue"]["gapcontinue"] = params["gapcontinue"]
+            return answer
+
+        answer["batchcomplete"] = True
+        if continue_title is not None:
+            answer["continue"] = {"gapcontinue": continue_title, "continue": "gapcontinue||"}
+        return answer
+
+    def get_recentchanges(
+            self,
+            params: dict
+            ) -> dict:
+        index_start = int(params.get("rccontinue", "0"))
+        index_end = min(index_start + self.server.list_limit, self.server.changes)
+        time_now = datetime.now(timezone.utc)
+        self.server.count_items("rows", index_end - index_start)
+
+        changes = []
+        for index_change in range(index_start, index_end):
+            page_id = index_change * 7 % self.server.pages + 1
+            changes.append({
+                "type": "new" if index_change % 5 == 0 else "edit",
+                "ns": 0,
+                "title": self.get_title(page_id),
+                "pageid": page_id,
+                "revid": 100000 + index_change,
+                "old_revid": 99999 + index_change,
+                "rcid": 500000 - index_change,
+                "timestamp": (time_now - timedelta(minutes=index_change)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            })
+
+        answer: dict = {
+            "batchcomplete": True,
+            "limits": {"recentchanges": self.server.list_limit},
+            "query": {"recentchanges": changes},
+        }
+        if index_end < self.server.changes:
+            answer["continue"] = {"rccontinue": str(index_end), "continue": "-||"}
+        return answer
+
+    def get_imageinfo(
+            self,
+            params: dict
+            ) -> dict:
+        pages = []
+        for title in params.get("titles", "").split("|"):
+            page_id = int(title.rsplit(" ", 1)[-1].split(".")[0])
+            pages.append({
+                "pageid": page_id,
+                "ns": 6,
+                "title": title,
+                "imagerepository": "local",
+                "imageinfo": [{
+                    "url": f"http://127.0.0.1:{self.server.server_address[1]}/img/{page_id}.png",
+                    "descriptionurl": f"http://127.0.0.1/wiki/{title}",
+                    "descriptionshorturl": f"http://127.0.0.1/index.php?curid={page_id}",
+                }],
+            })
+
+        return {"batchcomplete": True, "query": {"pages": pages}}
+
+    def get_history(
+            self,
+            params: dict
+            ) -> dict:
+        page_id = int(params["pageids"])
+        index_start = int(params.get("rvcontinue", "0"))
+        index_end = min(index_start + self.server.history_limit, self.server.revisions)
+        self.server.count_items("pages", index_end - index_start)
+
+        page = self.get_page(page_id)
+        page["revisions"] = [
+            self.get_revision(page_id, index_revision, params.get("rvprop", "content"))
+            for index_revision in range(index_start, index_end)
+        ]
+
+        answer: dict = {"limits": {"revisions": self.server.history_limit}, "query": {"pages": [page]}}
+        if index_end < self.server.revisions:
+            answer["continue"] = {"rvcontinue": str(index_end), "continue": "||"}
+        else:
+            answer["batchcomplete"] = True
+        return answer
+
+    def get_pages(
+            self,
+            params: dict
+            ) -> dict:
+        page_ids = [int(page_id) for page_id in params.get("pageids", "1").split("|") if page_id]
+        rvprop = params.get("rvprop", "content")
+        answer: dict = {"batchcomplete": True, "query": {"pages": [self.get_page(page_id, rvprop) for page_id in page_ids]}}
+
+        if self.server.broken_every and len(page_ids) > 1 and self.server.next_broken():
+            answer["broken"] = True
+        else:
+            self.server.count_items("pages", len(page_ids))
+        return answer
+
+    def send_forbidden(
+            self,
+            time_request: float
+            ) -> None:
+        self.server.count_forbidden += 1
+        self.send_body(b"Forbidden", "text/plain", time_request, status=403)
+
+    def send_body(
+            self,
+            body: bytes,
+            content_type: str,
+            time_request: float,
+            status: int = 200
+            ) -> None:
+        """Send body with gzip if client accepts it."""
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        if "gzip" in self.headers.get("Accept-Encoding", "") and content_type.startswith("application/json"):
+            body = gzip.compress(body, compresslevel=1)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+        self.server.add_request(len(body), time.perf_counter() - time_request)
+
+
+class StubApiServer(ThreadingHTTPServer):
+    """Local stand-in for api.php, runs in background thread.
+
+    Args:
+        latency: Seconds to wait before every answer.
+        page_size: Characters of content of every page.
+        pages: Pages in namespace 0, page IDs start from 1.
+        images: Pages in File namespace 6, page IDs follow pages.
+        changes: Rows of recentchanges.
+        revisions: Revisions of every page in history mode.
+        list_limit: Rows in one answer of allpages and recentchanges, less rows give more continue requests.
+        history_limit: Revisions in one answer of history mode.
+        content_limit: Pages with content in one answer of allcontent, others come with rvcontinue, 0 for all.
+        image_size: Bytes of every image.
+        forbidden_titles: Continue titles that get 403 Forbidden, like "Page_0000101".
+        broken_every: Every Nth answer with several pages has broken JSON, 0 for never.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+            self,
+            latency: float = 0.0,
+            page_size: int = 2000,
+            pages: int = 1000,
+            images: int = 100,
+            changes: int = 500,
+            revisions: int = 20,
+            list_limit: int = 500,
+            history_limit: int = 50,
+            content_limit: int = 0,
+            image_size: int = 10000,
+            forbidden_titles: set[str] | None = None,
+            broken_every: int = 0,
+            handler: type[BaseHTTPRequestHandler] = StubApiHandler
+            ) -> None:
+        super().__init__(("127.0.0.1", 0), handler)
+        self.latency = latency
+        self.page_size = page_size
+        self.pages = pages
+        self.images = images
+        self.changes = changes
+        self.revisions = revisions
+        self.list_limit = list_limit
+        self.history_limit = history_limit
+        self.content_limit = content_limit
+        self.image_size = image_size
+        self.forbidden_titles = forbidden_titles or set()
+        self.broken_every = broken_every
+
+        self.stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(
+            self
+            ) -> None:
+        with self.stats_lock:
+            self.count_requests = 0
+            self.count_bytes = 0
+            self.count_forbidden = 0
+            self.count_broken = 0
+            self.items: dict[str, int] = {}
+            self.latencies: list[float] = []
+
+    def add_request(
+            self,
+            size: int,
+            latency: float
+            ) -> None:
+        with self.stats_lock:
+            self.count_requests += 1
+            self.count_bytes += size
+            self.latencies.append(latency)
+
+    def count_items(
+            self,
+            name: str,
+            count: int
+            ) -> None:
+        with self.stats_lock:
+            self.items[name] = self.items.get(name, 0) + count
+
+    def next_broken(
+            self
+            ) -> bool:
+        with self.stats_lock:
+            self.count_broken += 1
+            return self.count_broken % self.broken_every == 0
+
+    @property
+    def base_url(
+            self
+            ) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/api.php"
+
+    def __enter__(
+            self
+            ) -> StubApiServer:
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(
+            self,
+            *args
+            ) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def fetch_per_call(
+        base_url: str
+        ) -> str | None:
+    """Fetch with a new connection for every call, the same way as without shared transport."""
+
+    request = urllib.request.Request(f"{base_url}?{urlencode(BENCH_PARAMS)}", headers=BENCH_HEADERS)
+    with urllib.request.urlopen(request, timeout=MwTransport.SETTING_TIMEOUT_SECONDS) as response:
+        body = response.read()
+        if response.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+    return body.decode("utf-8")
+
+
+def fetch_with_transport(
+        base_url: str
+        ) -> str | None:
+    """Fetch through shared keep-alive session."""
+
+    return MwTransport.fetch_text(base_url, BENCH_PARAMS, BENCH_HEADERS, logging=False)
+
+
+def run_requests(
+        fetch_function,
+        base_url: str,
+        count: int,
+        workers: int
+        ) -> float:
+    """Run count requests with workers threads and return requests per second."""
+
+    time_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(lambda _: fetch_function(base_url), range(count)))
+    time_spent = time.perf_counter() - time_start
+
+    if not all(results):
+        print(f"Warning: {results.count(None)} failed requests")
+
+    return count / time_spent
+
+
+def benchmark_transport(
+        count: int = 500,
+        workers: int = 4,
+        latency: float = 0.0
+        ) -> dict[str, float]:
+    """Compare requests/second with and without shared transport."""
+
+    result = {}
+    with StubApiServer(latency=latency) as server:
+        for workers_nr in sorted({1, workers}):
+            result[f"per-call x{workers_nr}"] = run_requests(fetch_per_call, server.base_url, count, workers_nr)
+            result[f"transport x{workers_nr}"] = run_requests(fetch_with_transport, server.base_url, count, workers_nr)
+        session = MwTransport.get_session(server.base_url)
+        print(f"Transport connections opened: {session.count_connections} for {session.count_requests} requests")
+        MwTransport.close_sessions()
+
+    return result
+
+
+def get_percentile(
+        values: list[float],
+        percent: float
+        ) -> float:
+    if not values:
+        return 0.0
+    values_sorted = sorted(values)
+    return values_sorted[min(len(values_sorted) - 1, int(len(values_sorted) * percent / 100))]
+
+
+def get_written_bytes(
+        path_folder: str,
+        time_start: float
+        ) -> int:
+    """Return size of files changed since time_start, files written before run are not counted."""
+
+    count_bytes = 0
+    for path_root, _, files in os.walk(path_folder):
+        for name_file in files:
+            stat_file = os.stat(os.path.join(path_root, name_file))
+            if stat_file.st_mtime >= time_start:
+                count_bytes += stat_file.st_size
+    return count_bytes
+
+
+def prepare_script(
+        overrides: dict[str, str],
+        path_folder: str
+        ) -> str:
+    """Write copy of script.py with changed settings to path_folder, source tree is not changed.
+
+    Copy is run with DIR_PROJECT in PYTHONPATH, so imports and DIR_GLOBAL of todo.py stay the same.
+
+    Names like CONCURRENT_CHECK change setting of script.py,
+    names like MwRateLimit.SETTING_RATE_MAX are set after imports for module imported by script.py.
+    """
+
+    with open(os.path.join(DIR_PROJECT, "script.py"), "r", encoding="utf-8") as file_script:
+        text_script = file_script.read()
+
+    lines_modules = [
+        f"{name_setting} = {value_setting}\n"
+        for name_setting, value_setting in overrides.items() if "." in name_setting
+    ]
+    if lines_modules:
+        match_imports = list(re.finditer(r"^import \w+ as Mw\w+\n", text_script, flags=re.MULTILINE))
+        index_insert = match_imports[-1].end()
+        text_script = text_script[:index_insert] + "".join(lines_modules) + text_script[index_insert:]
+
+    for name_setting, value_setting in overrides.items():
+        if "." in name_setting:
+            continue
+
+        # Every assignment is replaced, settings with two lines get the same value in both
+        text_script, count_replaced = re.subn(
+            rf"^{re.escape(name_setting)}( *:[^=]+)? = .*$",
+            lambda match: f"{name_setting}{match.group(1) or ''} = {value_setting}",
+            text_script, flags=re.MULTILINE
+        )
+        if count_replaced == 0:
+            raise ValueError(f"Unknown setting of script.py: {name_setting}")
+
+    path_script = os.path.join(path_folder, FILE_BENCH_SCRIPT)
+    with open(path_script, "w", encoding="utf-8") as file_script:
+        file_script.write(text_script)
+    return path_script
+
+
+def prepare_wiki(
+        server: StubApiServer,
+        path_folder: str
+        ) -> tuple[str, str]:
+    """Create config in path_folder and empty wiki folder for stub server, return paths of wiki folder and config."""
+
+    path_wiki = os.path.join(DIR_GLOBAL, FOLDER_BENCH_WIKI)
+    shutil.rmtree(path_wiki, ignore_errors=True)
+
+    os.makedirs(os.path.join(path_wiki, "data", "schemas"))
+    with open(os.path.join(path_wiki, "data", "schemas", "namespace_types.json"), "w", encoding="utf-8") as file_namespaces:
+        json.dump({"0": "Main", "6": "File"}, file_namespaces)
+
+    # Absolute path of config is used as is by read_config(), configs folder of project is not changed
+    path_config = os.path.join(path_folder, FILE_BENCH_CONFIG)
+    with open(path_config, "w", encoding="utf-8") as file_config:
+        json.dump({"FOLDER_LINK": FOLDER_BENCH_WIKI, "BASE_URL": server.base_url}, file_config)
+
+    return (path_wiki, path_config)
+
+
+def run_mode(
+        server: StubApiServer,
+        path_script: str,
+        path_config: str,
+        path_wiki: str,
+        wiki_data_type_nr: str,
+        namespace: str,
+        name_mode: str
+        ) -> dict:
+    """Run one mode of script.py in its own process and return its numbers."""
+
+    server.reset_stats()
+    path_log = os.path.join(path_wiki, f"benchmark-{name_mode}.log")
+    time_start = time.time()
+    time_counter = time.perf_counter()
+
+    with open(path_log, "w", encoding="utf-8") as file_log:
+        process = subprocess.Popen(
+            [sys.executable, path_script, path_config, wiki_data_type_nr, namespace],
+            stdin=subprocess.DEVNULL, stdout=file_log, stderr=subprocess.STDOUT,
+            env={
+                **os.environ,
+                "PYTHONUNBUFFERED": "1",
+                "PYTHONPATH": os.pathsep.join(filter(None, (DIR_PROJECT, os.environ.get("PYTHONPATH")))),
+            }
+        )
+
+        # Peak memory of this process only, wait4 is not available on Windows
+        peak_rss_mbytes = None
+        if hasattr(os, "wait4"):
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            # Linux gives kilobytes, macOS gives bytes
+            peak_rss_mbytes = usage.ru_maxrss / (BYTES_IN_MB if sys.platform == "darwin" else 1024)
+        else:
+            process.wait()
+
+    time_spent = time.perf_counter() - time_counter
+
+    with server.stats_lock:
+        count_requests = server.count_requests
+        count_items = sum(server.items.values())
+        latencies = list(server.latencies)
+        count_forbidden = server.count_forbidden
+
+    return {
+        "mode": name_mode,
+        "returncode": process.returncode,
+        "seconds": time_spent,
+        "requests": count_requests,
+        "requests/s": count_requests / time_spent,
+        "items/s": count_items / time_spent,
+        "MB/s written": get_written_bytes(os.path.join(path_wiki, "data"), time_start) / BYTES_IN_MB / time_spent,
+        "peak RSS MB": peak_rss_mbytes,
+        "p50 ms": get_percentile(latencies, 50) * 1000,
+        "p99 ms": get_percentile(latencies, 99) * 1000,
+        "403": count_forbidden,
+        "log": path_log,
+    }
+
+
+def benchmark_modes(
+        overrides: dict[str, str] | None = None,
+        modes: list[str] | None = None,
+        keep_files: bool = False,
+        **server_options
+        ) -> list[dict]:
+    """Run modes of script.py end to end against stub server and return numbers of every mode.
+
+    Args:
+        overrides: Settings to change, like {"CONCURRENT_CHECK": "True"}, added to BENCH_OVERRIDES_DEFAULT.
+        modes: Names from BENCH_MODES to run, all if None. Modes read lists of modes before them.
+        keep_files: Keep wiki folder with data and logs after run.
+        server_options: Arguments of StubApiServer.
+
+    Returns:
+        List of dicts with requests/s, items/s, MB/s written, peak RSS and p50/p99 latency.
+    """
+
+    results = []
+    path_folder_tmp = tempfile.mkdtemp(prefix="mwparser-benchmark-")
+    path_wiki = ""
+
+    try:
+        path_script = prepare_script({**BENCH_OVERRIDES_DEFAULT, **(overrides or {})}, path_folder_tmp)
+        with StubApiServer(**server_options) as server:
+            path_wiki, path_config = prepare_wiki(server, path_folder_tmp)
+            for wiki_data_type_nr, namespace, name_mode in BENCH_MODES:
+                if modes is not None and name_mode not in modes:
+                    continue
+
+                result = run_mode(server, path_script, path_config, path_wiki, wiki_data_type_nr, namespace, name_mode)
+                results.append(result)
+                if result["returncode"] != 0:
+                    print(f"Mode {name_mode} failed with code {result['returncode']}, see log: {result['log']}")
+                    break
+
+    finally:
+        shutil.rmtree(path_folder_tmp, ignore_errors=True)
+        if path_wiki and not keep_files:
+            shutil.rmtree(path_wiki, ignore_errors=True)
+
+    return results
+
+
+def print_modes_results(
+        results: list[dict]
+        ) -> None:
+    print(f"{'mode':<15}{'seconds':>9}{'requests':>10}{'req/s':>9}{'items/s':>10}{'MB/s':>8}{'RSS MB':>8}{'p50 ms':>8}{'p99 ms':>8}{'403':>5}")
+    for result in results:
+        peak_rss = f"{result['peak RSS MB']:.1f}" if result["peak RSS MB"] is not None else "n/a"
+        print(
+            f"{result['mode']:<15}{result['seconds']:>9.2f}{result['requests']:>10}"
+            f"{result['requests/s']:>9.1f}{result['items/s']:>10.1f}{result['MB/s written']:>8.2f}"
+            f"{peak_rss:>8}{result['p50 ms']:>8.1f}{result['p99 ms']:>8.1f}{result['403']:>5}"
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "modes":
+        # NAME=VALUE in upper case changes setting of script.py, Module.NAME=VALUE of its module,
+        # in lower case option of stub server
+        bench_overrides = {}
+        bench_options: dict = {}
+        bench_modes = None
+        for argument in sys.argv[2:]:
+            name_argument, _, value_argument = argument.partition("=")
+            if name_argument == "modes":
+                bench_modes = value_argument.split(",")
+            elif name_argument == "keep":
+                bench_options["keep_files"] = value_argument == "1"
+            elif name_argument == "forbidden_titles":
+                bench_options[name_argument] = set(value_argument.split(","))
+            elif name_argument.isupper() or "." in name_argument:
+                bench_overrides[name_argument] = value_argument
+            elif name_argument in ("latency",):
+                bench_options[name_argument] = float(value_argument)
+            else:
+                bench_options[name_argument] = int(value_argument)
+
+        print(f"=== Benchmark of modes: {bench_overrides or 'default settings'} ===")
+        bench_results = benchmark_modes(bench_overrides, bench_modes, **bench_options)
+        print_modes_results(bench_results)
+        sys.exit(1 if any(result["returncode"] != 0 for result in bench_results) else 0)
+
+    bench_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    bench_workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    bench_latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+
+    print(f"=== Benchmark: {bench_count} requests, latency {bench_latency} s ===")
+    for bench_name, requests_per_second in benchmark_transport(bench_count, bench_workers, bench_latency).items():
+        print(f"{bench_name:<16} {requests_per_second:10.1f} requests/s")
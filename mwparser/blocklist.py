@@ -0,0 +1,143 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+
+import metrics as MwMetrics
+
+# Line format of blocked page ID in blocked.txt, other lines are titles with "_" instead of spaces
+PAGE_ID_PREFIX = "---> Page ID: "
+
+
+class BlockedStore:
+    """Blocked titles and page IDs from blocked.txt, new entries are added to memory and appended to file only once.
+
+    Read-only store never writes file, new entries are kept only in memory.
+    """
+
+    def __init__(
+            self,
+            path_file: str,
+            read_only: bool = False
+            ) -> None:
+        self.path_file = path_file
+        self.read_only = read_only
+        self.titles: set[str] = set()
+        self.page_ids: set[int] = set()
+        self.lock = threading.Lock()
+        # Last line of file written by other tools can have no line break
+        self.needs_line_break = False
+
+        self.load()
+
+    def load(
+            self
+            ) -> None:
+        """Read file into sets, file is written again only if its text changes without duplicates and empty lines."""
+
+        if not os.path.isfile(self.path_file):
+            return
+
+        with open(self.path_file, "r", encoding="utf-8") as file_blocked:
+            text_blocked = file_blocked.read()
+        self.needs_line_break = text_blocked != "" and not text_blocked.endswith("\n")
+
+        # Unique lines in order of file, so compacted file differs from old one only by removed lines
+        lines_unique: dict[str, None] = {}
+        for line in text_blocked.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+
+            if line.startswith(PAGE_ID_PREFIX) and line[len(PAGE_ID_PREFIX):].strip().isdigit():
+                page_id = int(line[len(PAGE_ID_PREFIX):])
+                line = f"{PAGE_ID_PREFIX}{page_id}"
+                self.page_ids.add(page_id)
+            else:
+                self.titles.add(line)
+            lines_unique[line] = None
+
+        text_unique = "".join(f"{line}\n" for line in lines_unique)
+        # File without line break at the end gets it with the next entry, it is not written again for it
+        if text_unique not in (text_blocked, text_blocked + "\n") and not self.read_only:
+            print(f"Blocked list has duplicates or empty lines, compact: {self.path_file}")
+            self.compact(text_unique)
+
+        print(f"Blocked titles: {len(self.titles)}, page IDs: {len(self.page_ids)}")
+
+    def compact(
+            self,
+            text_unique: str
+            ) -> None:
+        """Write unique entries to temporary file and replace blocked file."""
+
+        path_file_tmp = self.path_file + ".tmp"
+        with open(path_file_tmp, "w", encoding="utf-8") as file_tmp:
+            file_tmp.write(text_unique)
+        os.replace(path_file_tmp, self.path_file)
+        self.needs_line_break = False
+
+    def append_line(
+            self,
+            line: str
+            ) -> None:
+        if self.read_only:
+            return
+
+        os.makedirs(os.path.dirname(self.path_file), exist_ok=True)
+        with open(self.path_file, "a", encoding="utf-8") as file_blocked:
+            if self.needs_line_break:
+                file_blocked.write("\n")
+                self.needs_line_break = False
+            file_blocked.write(f"{line}\n")
+
+    def has_title(
+            self,
+            title: str
+            ) -> bool:
+        return title.replace(" ", "_") in self.titles
+
+    def has_page_id(
+            self,
+            page_id: int
+            ) -> bool:
+        return page_id in self.page_ids
+
+    def add_title(
+            self,
+            title: str
+            ) -> bool:
+        """Block title, return False if it was already blocked."""
+
+        title = title.replace(" ", "_")
+        with self.lock:
+            if title in self.titles:
+                return False
+            self.titles.add(title)
+            self.append_line(title)
+
+        MwMetrics.add("blocked_titles")
+        print(f"Blocked title: {title}")
+        return True
+
+    def add_page_id(
+            self,
+            page_id: int
+            ) -> bool:
+        """Block page ID, return False if it was already blocked."""
+
+        with self.lock:
+            if page_id in self.page_ids:
+                return False
+            self.page_ids.add(page_id)
+            self.append_line(f"{PAGE_ID_PREFIX}{page_id}")
+
+        MwMetrics.add("blocked_page_ids")
+        print(f"Blocked page ID: {page_id}")
+        return True
@@ -0,0 +1,188 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+import os
+import gzip
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from urllib.parse import urlencode
+
+# Params that do not change content of answer, they are not part of key
+PARAMS_IGNORED = ("maxlag",)
+
+FILE_EXTENSION = ".json.gz"
+FOLDER_STATE = "state"
+
+# Cache is made smaller to this part of max size, so eviction does not run after every run
+SETTING_EVICT_TO_PART = 0.9
+
+
+def get_key(
+        base_url: str,
+        params: dict
+        ) -> str:
+    """Return SHA-256 of URL with sorted params, the same request gives the same key in every run."""
+
+    params_sorted = sorted((str(name), str(value)) for name, value in params.items() if name not in PARAMS_IGNORED)
+    return hashlib.sha256(f"{base_url}?{urlencode(params_sorted)}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """API answers as gzip files named by key of request, one file per answer, written once and replaced on update."""
+
+    def __init__(
+            self,
+            path_folder: str,
+            ttl_seconds: float | None = None,
+            max_bytes: int | None = None
+            ) -> None:
+        """Open cache folder.
+
+        Args:
+            path_folder: Folder of cache, it is created on first write.
+            ttl_seconds: Answers older than this are not returned, None to return all.
+            max_bytes: Oldest answers are removed in evict() while cache is larger, None for no limit.
+        """
+
+        self.path_folder = path_folder
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        # Keys of answers returned by get(), put() of the same answer after decoding is skipped
+        self.keys_read: set[str] = set()
+
+        self.count_hits = 0
+        self.count_misses = 0
+        self.count_writes = 0
+
+    def get_path(
+            self,
+            key: str
+            ) -> str:
+        # Two levels, so one folder does not get millions of files
+        return os.path.join(self.path_folder, key[:2], f"{key}{FILE_EXTENSION}")
+
+    def get(
+            self,
+            base_url: str,
+            params: dict
+            ) -> str | None:
+        """Return cached answer text, None if it is missing, expired or broken."""
+
+        key = get_key(base_url, params)
+        path_file = self.get_path(key)
+
+        try:
+            if self.ttl_seconds is not None and time.time() - os.path.getmtime(path_file) > self.ttl_seconds:
+                raise FileNotFoundError(path_file)
+            with gzip.open(path_file, "rt", encoding="utf-8") as file_cache:
+                text = file_cache.read()
+        except (OSError, EOFError):
+            with self.lock:
+                self.count_misses += 1
+            return None
+
+        with self.lock:
+            self.count_hits += 1
+            self.keys_read.add(key)
+        return text
+
+    def put(
+            self,
+            base_url: str,
+            params: dict,
+            text: str
+            ) -> None:
+        """Save answer text, temporary file is renamed, so readers never see half-written file.
+
+        Call it only after answer is decoded, broken answer in cache would be returned again until it expires.
+        """
+
+        key = get_key(base_url, params)
+        with self.lock:
+            if key in self.keys_read:
+                return
+
+        path_file = self.get_path(key)
+        os.makedirs(os.path.dirname(path_file), exist_ok=True)
+
+        file_descriptor, path_file_tmp = tempfile.mkstemp(dir=os.path.dirname(path_file), suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as file_tmp:
+                # Level 6 is much faster than 9 and answers are almost the same size
+                file_tmp.write(gzip.compress(text.encode("utf-8"), compresslevel=6, mtime=0))
+            os.replace(path_file_tmp, path_file)
+        except BaseException:
+            if os.path.exists(path_file_tmp):
+                os.remove(path_file_tmp)
+            raise
+
+        with self.lock:
+            self.count_writes += 1
+
+    def save_state(
+            self,
+            name: str,
+            state: dict
+            ) -> None:
+        """Save values a replay needs to send the same requests, like time range of recent changes."""
+
+        path_file = os.path.join(self.path_folder, FOLDER_STATE, f"{name}.json")
+        os.makedirs(os.path.dirname(path_file), exist_ok=True)
+        with open(path_file + ".tmp", "w", encoding="utf-8") as file_tmp:
+            json.dump(state, file_tmp, ensure_ascii=False, indent=2)
+        os.replace(path_file + ".tmp", path_file)
+
+    def load_state(
+            self,
+            name: str
+            ) -> dict | None:
+        path_file = os.path.join(self.path_folder, FOLDER_STATE, f"{name}.json")
+        if not os.path.isfile(path_file):
+            return None
+
+        with open(path_file, "r", encoding="utf-8") as file_state:
+            return json.load(file_state)
+
+    def evict(
+            self
+            ) -> tuple[int, int]:
+        """Remove expired answers, then oldest ones while cache is larger than max size, return count and bytes left."""
+
+        entries: list[tuple[float, int, str]] = []
+        if os.path.isdir(self.path_folder):
+            for entry_dir in os.scandir(self.path_folder):
+                if not entry_dir.is_dir() or entry_dir.name == FOLDER_STATE:
+                    continue
+                for entry_file in os.scandir(entry_dir.path):
+                    if entry_file.name.endswith(FILE_EXTENSION):
+                        stat_file = entry_file.stat()
+                        entries.append((stat_file.st_mtime, stat_file.st_size, entry_file.path))
+
+        entries.sort()
+        size_total = sum(size_file for _, size_file, _ in entries)
+        time_expired = time.time() - self.ttl_seconds if self.ttl_seconds is not None else None
+        size_limit = self.max_bytes * SETTING_EVICT_TO_PART if self.max_bytes is not None else None
+        evict_for_size = self.max_bytes is not None and size_total > self.max_bytes
+
+        count_left = len(entries)
+        for time_file, size_file, path_file in entries:
+            expired = time_expired is not None and time_file < time_expired
+            too_large = evict_for_size and size_limit is not None and size_total > size_limit
+            if not expired and not too_large:
+                break
+
+            os.remove(path_file)
+            size_total -= size_file
+            count_left -= 1
+
+        return (count_left, size_total)
+
@@ -0,0 +1,230 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator
+
+FILE_CATALOG = "catalog.sqlite"
+
+# Rows read from database at once during export
+SETTING_FETCH_ROWS = 10000
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS pages (
+    page_id INTEGER PRIMARY KEY,
+    namespace INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    run TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_namespace ON pages (namespace, page_id);
+CREATE INDEX IF NOT EXISTS pages_namespace_title ON pages (namespace, title);
+
+CREATE TABLE IF NOT EXISTS recentchanges (
+    timestamp TEXT NOT NULL,
+    page_id TEXT NOT NULL,
+    namespace TEXT NOT NULL,
+    type TEXT NOT NULL,
+    title TEXT NOT NULL,
+    run TEXT NOT NULL,
+    PRIMARY KEY (timestamp, page_id, namespace, type, title)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS recentchanges_page_id ON recentchanges (page_id);
+
+CREATE TABLE IF NOT EXISTS missing (
+    kind TEXT NOT NULL,
+    item TEXT NOT NULL,
+    time_added TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now')),
+    PRIMARY KEY (kind, item)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS blocked (
+    kind TEXT NOT NULL,
+    item TEXT NOT NULL,
+    PRIMARY KEY (kind, item)
+) WITHOUT ROWID;
+"""
+
+
+class Catalog:
+    """Lists of one wiki in SQLite: pages, recent changes, missing items and blocked entries.
+
+    Rows of recent changes are kept as strings of CSV file, so export gives the same file as the CSV lists.
+    Every write call is one transaction, connection is shared by threads under lock.
+    """
+
+    def __init__(
+            self,
+            path_file: str
+            ) -> None:
+        self.path_file = path_file
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path_file), exist_ok=True)
+        self.connection = sqlite3.connect(path_file, timeout=30, check_same_thread=False)
+        # Readers do not wait for writer, WAL keeps database consistent after crash without fsync on every commit
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.executescript(SCHEMA_SQL)
+
+    def upsert_pages(
+            self,
+            namespace: int,
+            rows: Iterable[tuple[int, str]],
+            run: str
+            ) -> None:
+        """Add or update pages of namespace, rows are page ID and title."""
+
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT INTO pages (page_id, namespace, title, run) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (page_id) DO UPDATE SET namespace = excluded.namespace, title = excluded.title, run = excluded.run",
+                ((page_id, namespace, title, run) for page_id, title in rows)
+            )
+
+    def upsert_recentchanges(
+            self,
+            rows: Iterable[list[str]],
+            run: str
+            ) -> None:
+        """Add rows of recent changes in CSV format, the same row is kept once."""
+
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT INTO recentchanges (timestamp, page_id, namespace, type, title, run) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (timestamp, page_id, namespace, type, title) DO UPDATE SET run = excluded.run",
+                ((*row, run) for row in rows)
+            )
+
+    def remove_other_runs(
+            self,
+            table: str,
+            run: str,
+            namespace: int | None = None
+            ) -> int:
+        """Remove rows not seen by complete run, return their count."""
+
+        if table not in ("pages", "recentchanges"):
+            raise ValueError(f"Unknown table: {table}")
+
+        sql = f"DELETE FROM {table} WHERE run != ?"
+        params: tuple = (run,)
+        if namespace is not None:
+            sql += " AND namespace = ?"
+            params = (run, namespace)
+
+        with self.lock, self.connection:
+            return self.connection.execute(sql, params).rowcount
+
+    def add_missing(
+            self,
+            kind: str,
+            item: str
+            ) -> None:
+        with self.lock, self.connection:
+            self.connection.execute("INSERT OR IGNORE INTO missing (kind, item) VALUES (?, ?)", (kind, item))
+
+    def replace_blocked(
+            self,
+            titles: Iterable[str],
+            page_ids: Iterable[int]
+            ) -> None:
+        """Write blocked entries of blocked.txt, the file stays the list other tools edit."""
+
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM blocked")
+            self.connection.executemany(
+                "INSERT INTO blocked (kind, item) VALUES (?, ?)",
+                [("title", title) for title in titles] + [("page_id", str(page_id)) for page_id in page_ids]
+            )
+
+    def count_pages(
+            self,
+            namespace: int
+            ) -> int:
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM pages WHERE namespace = ?", (namespace,)).fetchone()[0]
+
+    def get_page_ids(
+            self,
+            namespace: int
+            ) -> list[int]:
+        with self.lock:
+            return [row[0] for row in self.connection.execute(
+                "SELECT page_id FROM pages WHERE namespace = ? ORDER BY page_id", (namespace,)
+            )]
+
+    def get_titles(
+            self,
+            namespace: int
+            ) -> list[str]:
+        with self.lock:
+            return [row[0] for row in self.connection.execute(
+                "SELECT title FROM pages WHERE namespace = ? ORDER BY title", (namespace,)
+            )]
+
+    def count_recentchanges(
+            self
+            ) -> int:
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM recentchanges").fetchone()[0]
+
+    def get_recent_page_ids(
+            self
+            ) -> list[int]:
+        """Return changed page IDs once each, changes without page have page ID 0."""
+
+        with self.lock:
+            return [int(row[0]) for row in self.connection.execute(
+                "SELECT DISTINCT page_id FROM recentchanges WHERE CAST(page_id AS INTEGER) > 0 ORDER BY page_id"
+            )]
+
+    def iter_rows(
+            self,
+            sql: str,
+            params: tuple = ()
+            ) -> Iterator[tuple]:
+        """Yield rows of query in parts, so large list is never in memory at once."""
+
+        cursor = self.connection.cursor()
+        with self.lock:
+            cursor.execute(sql, params)
+
+        while True:
+            with self.lock:
+                rows = cursor.fetchmany(SETTING_FETCH_ROWS)
+            if not rows:
+                break
+            yield from rows
+
+    def iter_pages_rows(
+            self,
+            namespace: int
+            ) -> Iterator[list[str]]:
+        """Yield rows of allpages CSV file, in the same order as sorted file."""
+
+        for page_id, title in self.iter_rows(
+                "SELECT page_id, title FROM pages WHERE namespace = ? ORDER BY page_id", (namespace,)
+                ):
+            yield [f"{page_id:010d}", title]
+
+    def iter_recentchanges_rows(
+            self
+            ) -> Iterator[list[str]]:
+        """Yield rows of recentchanges CSV file, in the same order as sorted file."""
+
+        for row in self.iter_rows("SELECT timestamp, page_id, namespace, type, title FROM recentchanges ORDER BY 1, 2, 3, 4, 5"):
+            yield list(row)
+
+    def close(
+            self
+            ) -> None:
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,332 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+import sys
+import os
+import csv
+import shutil
+
+import storage as MwStorage
+import wikiapi as MwWikiApi
+
+FOLDER_COLUMNAR = os.path.join("data", "columnar")
+FILE_RECENTCHANGES = os.path.join("data", "lists", "recentchanges.csv")
+
+# Row group is written when it has this many rows or this much text, whichever comes first
+SETTING_ROW_GROUP_ROWS = 50000
+SETTING_ROW_GROUP_MBYTES = 128
+# zstd is the default of most readers and smaller than snappy for wikitext
+SETTING_PARQUET_COMPRESSION = "zstd"
+
+BYTES_IN_MB = 1024 * 1024
+
+
+def get_pyarrow_modules(
+        ) -> tuple:
+    """Return pyarrow and pyarrow.parquet modules, they are imported only for export."""
+
+    try:
+        import pyarrow  # type: ignore[import-not-found]
+        import pyarrow.parquet  # type: ignore[import-not-found]
+    except ImportError:
+        raise ImportError("Parquet export needs package: pip install pyarrow") from None
+
+    return (pyarrow, pyarrow.parquet)
+
+
+def parse_page_text(
+        text: str
+        ) -> tuple[int, str, str]:
+    """Return namespace, title and content of page text written by MwWikiApi.format_page_text().
+
+    Content is the text between the first revision line and the end line, taken as is,
+    so wikitext with the same dash line stays one revision. Several revisions keep the framing of page file.
+    ValueError if text has no header or framing of page file.
+    """
+
+    lines_header = text.split("\n", 3)
+    if (
+            len(lines_header) < 4
+            or not lines_header[0].startswith("Namespace ::: ")
+            or not lines_header[2].startswith("Title     ::: ")
+            ):
+        raise ValueError(f"Page text has no header: {text[:100]!r}")
+
+    namespace = int(lines_header[0].split(" ::: ")[1])
+    title = lines_header[2][len("Title     ::: "):]
+
+    # Body starts with empty line after title, every revision ends with two line breaks
+    body = lines_header[3]
+    if body == "\n" + MwWikiApi.LINE_END:
+        return (namespace, title, "")
+
+    prefix_body = "\n" + MwWikiApi.LINE_REVISION
+    suffix_body = "\n\n" + MwWikiApi.LINE_END
+    if not body.startswith(prefix_body) or not body.endswith(suffix_body) or len(body) < len(prefix_body) + len(suffix_body):
+        raise ValueError(f"Page text has no revision framing: {text[:100]!r}")
+
+    return (namespace, title, body[len(prefix_body):-len(suffix_body)])
+
+
+class PartitionWriter:
+    """Rows of one Parquet file, buffered in columns and written as row group when buffer is full."""
+
+    def __init__(
+            self,
+            path_file: str,
+            schema
+            ) -> None:
+        self.path_file = path_file
+        self.schema = schema
+        self.columns: dict[str, list] = {field.name: [] for field in schema}
+        self.buffer_bytes = 0
+        self.writer = None
+        self.count_rows = 0
+
+    def add(
+            self,
+            row: tuple,
+            row_bytes: int
+            ) -> None:
+        for column, value in zip(self.columns.values(), row):
+            column.append(value)
+        self.buffer_bytes += row_bytes
+
+        if len(self.columns[self.schema[0].name]) >= SETTING_ROW_GROUP_ROWS or self.buffer_bytes >= SETTING_ROW_GROUP_MBYTES * BYTES_IN_MB:
+            self.write_row_group()
+
+    def write_row_group(
+            self
+            ) -> None:
+        count_rows = len(self.columns[self.schema[0].name])
+        if count_rows == 0:
+            return
+
+        pyarrow, parquet = get_pyarrow_modules()
+        if self.writer is None:
+            os.makedirs(os.path.dirname(self.path_file), exist_ok=True)
+            self.writer = parquet.ParquetWriter(self.path_file, self.schema, compression=SETTING_PARQUET_COMPRESSION)
+
+        self.writer.write_table(pyarrow.Table.from_pydict(self.columns, schema=self.schema), row_group_size=count_rows)
+        self.count_rows += count_rows
+        for column in self.columns.values():
+            column.clear()
+        self.buffer_bytes = 0
+
+    def close(
+            self
+            ) -> None:
+        self.write_row_group()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+class ColumnarWriter:
+    """Pages as Parquet files partitioned by folder class and namespace like data/raw.
+
+    Layout: <path_folder>/pages/<folder class>/<namespace>/part-00000.parquet,
+    columns: pageid, ns, title, folder_class, content.
+    New export of namespace is written to pages.tmp and moved to pages only in close(),
+    so failed export leaves the previous one of namespace complete.
+    """
+
+    def __init__(
+            self,
+            path_folder: str,
+            file_name: str = "part-00000.parquet"
+            ) -> None:
+        pyarrow, _ = get_pyarrow_modules()
+
+        self.path_folder = path_folder
+        self.file_name = file_name
+        self.schema = pyarrow.schema([
+            ("pageid", pyarrow.int64()),
+            ("ns", pyarrow.int32()),
+            ("title", pyarrow.string()),
+            ("folder_class", pyarrow.string()),
+            # Content of one row group can be over 2 GB
+            ("content", pyarrow.large_string()),
+        ])
+        self.partitions: dict[tuple[str, str], PartitionWriter] = {}
+        self.namespaces_started: set[str] = set()
+
+    def get_path_partition(
+            self,
+            folder_pages: str,
+            folder_class: str,
+            namespace_dir: str
+            ) -> str:
+        return os.path.join(self.path_folder, folder_pages, folder_class, namespace_dir)
+
+    def remove_partitions(
+            self,
+            folder_pages: str,
+            namespace_dir: str
+            ) -> None:
+        for folder_class in MwStorage.FOLDER_CLASSES:
+            path_partition = self.get_path_partition(folder_pages, folder_class, namespace_dir)
+            if os.path.isdir(path_partition):
+                shutil.rmtree(path_partition)
+
+    def remove_empty_tmp(
+            self
+            ) -> None:
+        for folder_class in MwStorage.FOLDER_CLASSES:
+            path_class_tmp = os.path.join(self.path_folder, "pages.tmp", folder_class)
+            if os.path.isdir(path_class_tmp) and not os.listdir(path_class_tmp):
+                os.rmdir(path_class_tmp)
+
+        path_pages_tmp = os.path.join(self.path_folder, "pages.tmp")
+        if os.path.isdir(path_pages_tmp) and not os.listdir(path_pages_tmp):
+            os.rmdir(path_pages_tmp)
+
+    def start_namespace(
+            self,
+            namespace_dir: str
+            ) -> None:
+        """Start new export of namespace, files of previous export stay until close()."""
+
+        # Left by export that was killed before abort()
+        self.remove_partitions("pages.tmp", namespace_dir)
+        self.namespaces_started.add(namespace_dir)
+
+    def add_page(
+            self,
+            namespace_dir: str,
+            page_id: int,
+            folder_class: str,
+            text: str
+            ) -> None:
+        namespace, title, content = parse_page_text(text)
+
+        if namespace_dir not in self.namespaces_started:
+            raise RuntimeError(f"Export of namespace is not started: {namespace_dir}")
+
+        key = (folder_class, namespace_dir)
+        if key not in self.partitions:
+            self.partitions[key] = PartitionWriter(
+                os.path.join(self.get_path_partition("pages.tmp", folder_class, namespace_dir), self.file_name),
+                self.schema
+            )
+
+        self.partitions[key].add((page_id, namespace, title, folder_class, content), len(text))
+
+    def close(
+            self
+            ) -> int:
+        """Write last row groups, replace previous export of started namespaces, return count of rows."""
+
+        count_rows = 0
+        for partition in self.partitions.values():
+            partition.close()
+            count_rows += partition.count_rows
+        self.partitions.clear()
+
+        for namespace_dir in sorted(self.namespaces_started):
+            self.remove_partitions("pages", namespace_dir)
+            for folder_class in MwStorage.FOLDER_CLASSES:
+                path_partition_tmp = self.get_path_partition("pages.tmp", folder_class, namespace_dir)
+                if os.path.isdir(path_partition_tmp):
+                    path_partition = self.get_path_partition("pages", folder_class, namespace_dir)
+                    os.makedirs(os.path.dirname(path_partition), exist_ok=True)
+                    os.replace(path_partition_tmp, path_partition)
+        self.namespaces_started.clear()
+        self.remove_empty_tmp()
+
+        return count_rows
+
+    def abort(
+            self
+            ) -> None:
+        """Close files and remove new export, previous export of namespaces stays as it was."""
+
+        for partition in self.partitions.values():
+            partition.close()
+        self.partitions.clear()
+
+        for namespace_dir in self.namespaces_started:
+            self.remove_partitions("pages.tmp", namespace_dir)
+        self.namespaces_started.clear()
+        self.remove_empty_tmp()
+
+
+def export_pages(
+        path_wiki: str,
+        namespace_dir: str | None = None
+        ) -> int:
+    """Write pages of one or all namespaces from page files and packed stores to Parquet, return count of pages."""
+
+    columnar_writer = ColumnarWriter(os.path.join(path_wiki, FOLDER_COLUMNAR))
+
+    try:
+        for page_record in MwStorage.iter_page_records(path_wiki, namespace_dir):
+            if page_record.namespace not in columnar_writer.namespaces_started:
+                columnar_writer.start_namespace(page_record.namespace)
+
+            columnar_writer.add_page(page_record.namespace, page_record.page_id, page_record.folder_class, page_record.text)
+
+    except BaseException:
+        columnar_writer.abort()
+        raise
+
+    return columnar_writer.close()
+
+
+def export_recentchanges(
+        path_wiki: str
+        ) -> int:
+    """Write recentchanges.csv to Parquet file, return count of rows."""
+
+    pyarrow, _ = get_pyarrow_modules()
+    schema = pyarrow.schema([
+        ("timestamp", pyarrow.string()),
+        ("pageid", pyarrow.int64()),
+        ("ns", pyarrow.int32()),
+        ("type", pyarrow.string()),
+        ("title", pyarrow.string()),
+    ])
+
+    # Previous file is replaced only after new one is complete, like partitions of ColumnarWriter
+    path_file = os.path.join(path_wiki, FOLDER_COLUMNAR, "recentchanges", "part-00000.parquet")
+    path_file_tmp = path_file + ".tmp"
+
+    partition = PartitionWriter(path_file_tmp, schema)
+    try:
+        with open(os.path.join(path_wiki, FILE_RECENTCHANGES), newline="", encoding="utf-8") as file_rc:
+            reader = csv.reader(file_rc)
+            next(reader, None)
+            for row in reader:
+                partition.add((row[0], int(row[1]), int(row[2]), row[3].strip(), row[4]), len(row[4]) + 40)
+        partition.close()
+
+    except BaseException:
+        partition.close()
+        if os.path.isfile(path_file_tmp):
+            os.remove(path_file_tmp)
+        raise
+
+    if os.path.isfile(path_file_tmp):
+        os.replace(path_file_tmp, path_file)
+    # Empty list writes no file, old rows must not stay
+    elif os.path.isfile(path_file):
+        os.remove(path_file)
+
+    return partition.count_rows
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python mwparser/columnar.py <path to FOLDER_LINK> [namespace folder, e.g. 0000]")
+        sys.exit(1)
+
+    count_exported = export_pages(sys.argv[1], sys.argv[2] if len(sys.argv) == 3 else None)
+    print(f"Exported pages: {count_exported}")
+
+    if os.path.isfile(os.path.join(sys.argv[1], FILE_RECENTCHANGES)):
+        print(f"Exported recent changes: {export_recentchanges(sys.argv[1])}")
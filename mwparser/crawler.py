@@ -0,0 +1,363 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+import sys
+import os
+import json
+import time
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime, timedelta, timezone
+
+import blocklist as MwBlocklist
+import ratelimit as MwRateLimit
+import schemas as MwSchemas
+import storage as MwStorage
+import transport as MwTransport
+import wikiapi as MwWikiApi
+
+DIR_PROJECT = os.path.dirname(os.path.realpath(__file__))
+DIR_GLOBAL = os.path.dirname(os.path.dirname(DIR_PROJECT))
+
+FILE_NAMESPACES = os.path.join("data", "schemas", "namespace_types.json")
+FILE_BLOCKED = os.path.join("data", "lists", "blocked.txt")
+
+# Page IDs in one content request, API allows 50
+SETTING_BATCH_PAGES = 50
+# Recent changes are read this many days back if start and end are not given
+SETTING_BACK_IN_TIME_DAYS = 7
+SETTING_MAXLAG_WAIT_SECONDS = 5
+SETTING_MAXLAG_MAX_REPEATS = 10
+
+# Items of list queries are checked with the same schemas as restructure_json_*() in script.py
+CHECKS_LIST_ITEMS = {
+    "allpages": MwSchemas.check_allpages_page,
+    "recentchanges": MwSchemas.check_recentchanges_page,
+}
+
+
+class Crawler:
+    """Crawler of one wiki for use as library, generator methods request next part only when caller asks for it.
+
+    Every crawler keeps its own settings, so several wikis can be crawled in one process.
+    Requests to the same host share one rate limiter. Requests, maxlag repeats, answer keys and page text
+    are handled by the same functions of wikiapi.py as script.py uses. Errors are raised, nothing is written to disk:
+    blocked.txt is only read, titles blocked during crawl are kept in memory.
+
+    Example:
+        crawler = Crawler.from_config("wiki.json")
+        for record in crawler.iter_pages(row["pageid"] for row in crawler.iter_allpages(0)):
+            ...
+    """
+
+    def __init__(
+            self,
+            base_url: str,
+            namespace_types: dict[str, str],
+            blocked_store: MwBlocklist.BlockedStore | None = None,
+            user_agent: str = MwWikiApi.USER_AGENT
+            ) -> None:
+        self.base_url = base_url
+        self.namespace_types = namespace_types
+        self.ns_max_key_len = len(max(namespace_types.keys(), key=len))
+        self.blocked_store = blocked_store
+        self.headers = MwWikiApi.get_headers(user_agent)
+        self.limiter = MwRateLimit.get_limiter(base_url)
+
+        self.count_requests = 0
+
+    @classmethod
+    def from_config(
+            cls,
+            file_config: str
+            ) -> Crawler:
+        """Create crawler from config file in mwparser/configs, the same files as script.py uses."""
+
+        with open(os.path.join(DIR_PROJECT, "configs", file_config), "r", encoding="utf-8") as file_settings:
+            settings = json.load(file_settings)
+
+        for key in ("FOLDER_LINK", "BASE_URL"):
+            if not isinstance(settings.get(key), str) or not settings[key]:
+                raise ValueError(f"Config {file_config} has no {key}")
+
+        path_wiki = os.path.join(DIR_GLOBAL, settings["FOLDER_LINK"])
+        with open(os.path.join(path_wiki, FILE_NAMESPACES), "r", encoding="utf-8") as file_namespaces:
+            namespace_types = json.load(file_namespaces)
+
+        return cls(
+            settings["BASE_URL"],
+            namespace_types,
+            blocked_store=MwBlocklist.BlockedStore(os.path.join(path_wiki, FILE_BLOCKED), read_only=True)
+        )
+
+    def get_params(
+            self,
+            **params_extra: str
+            ) -> dict:
+        params = dict(MwWikiApi.PARAMS_QUERY)
+        params.update(params_extra)
+        return params
+
+    def fetch_json(
+            self,
+            params: dict
+            ) -> dict | None:
+        """Return JSON answer of wiki, None if its text is broken, wait and repeat while wiki reports maxlag."""
+
+        def fetch_once(
+                ) -> str | None:
+            self.count_requests += 1
+            return MwTransport.fetch_text(
+                self.base_url, params, self.headers,
+                logging=False, limiter=self.limiter
+            )
+
+        # Transport tells limiter about successful answers itself
+        data_from_url = MwWikiApi.fetch_repeat_on_maxlag(
+            fetch_once, self.limiter, SETTING_MAXLAG_WAIT_SECONDS, SETTING_MAXLAG_MAX_REPEATS,
+            report_success=False
+        )
+        if not data_from_url:
+            raise RuntimeError(f"No answer from {self.base_url} for {params}")
+
+        wiki_error = MwWikiApi.get_error(data_from_url)
+        if wiki_error is not None:
+            raise RuntimeError(f"Wiki error: {wiki_error}")
+
+        try:
+            json_from_url = json.loads(data_from_url)
+        except json.JSONDecodeError:
+            return None
+
+        if not isinstance(json_from_url, dict):
+            raise RuntimeError(f"Unexpected answer from {self.base_url}: {data_from_url[:200]}")
+
+        return json_from_url
+
+    def iter_query(
+            self,
+            params: dict,
+            list_name: str
+            ) -> Iterator[dict]:
+        """Yield items of list query, next part is requested with continue only after all items of part are taken.
+
+        ValueError if answer or its items have other keys than script.py expects.
+        """
+
+        params = dict(params)
+
+        while True:
+            json_data = self.fetch_json(params)
+            if json_data is None:
+                raise RuntimeError(f"Broken JSON answer for {params}")
+
+            MwWikiApi.check_answer_keys(
+                json_data, MwWikiApi.get_list_answer_keys(json_data),
+                location="crawler.iter_query : json_data"
+            )
+            MwWikiApi.check_answer_keys(
+                json_data["query"], {list_name},
+                location="crawler.iter_query : json_data[query]"
+            )
+            self.check_items(json_data["query"][list_name], CHECKS_LIST_ITEMS[list_name], list_name)
+
+            yield from json_data["query"][list_name]
+
+            if "continue" not in json_data:
+                return
+            params.update(json_data["continue"])
+
+    def check_items(
+            self,
+            items: list,
+            check_item: Callable[[object], bool],
+            location: str
+            ) -> None:
+        """ValueError with the first item that does not match schema."""
+
+        if MwSchemas.check_items(items, check_item):
+            return
+
+        for item in items:
+            if not check_item(item):
+                raise ValueError(f"crawler.check_items : {location}: unexpected item {item}")
+
+    def iter_allpages(
+            self,
+            namespace: int
+            ) -> Iterator[dict]:
+        """Yield pageid, ns and title of all pages of namespace, blocked titles are skipped."""
+
+        params = self.get_params(list="allpages", aplimit="max", apnamespace=str(namespace))
+
+        for page in self.iter_query(params, "allpages"):
+            if self.blocked_store is not None and self.blocked_store.has_title(page["title"]):
+                continue
+            yield page
+
+    def iter_recentchanges(
+            self,
+            time_start: str | None = None,
+            time_end: str | None = None,
+            namespace: str = "*"
+            ) -> Iterator[dict]:
+        """Yield recent changes from time_start back to time_end, changes without page are skipped.
+
+        Args:
+            time_start: Newest time like 2026-10-01T00:00:00Z, now if None.
+            time_end: Oldest time, SETTING_BACK_IN_TIME_DAYS before now if None.
+            namespace: Namespace number or "*" for all.
+
+        Returns:
+            Iterator of recent change dicts as wiki returns them.
+        """
+
+        time_now = datetime.now(timezone.utc)
+        if time_start is None:
+            time_start = time_now.strftime("%Y-%m-%dT%H:%M:%SZ")
+        if time_end is None:
+            time_end = (time_now - timedelta(days=SETTING_BACK_IN_TIME_DAYS)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        params = self.get_params(
+            list="recentchanges", rcnamespace=namespace, rclimit="max",
+            rcstart=time_start, rcend=time_end
+        )
+
+        for change in self.iter_query(params, "recentchanges"):
+            if change.get("pageid", 0) == 0:
+                continue
+            yield change
+
+    def fetch_pages(
+            self,
+            page_ids: list[int]
+            ) -> list[dict]:
+        """Return pages with latest revision content, part with broken JSON is split in halves."""
+
+        return MwWikiApi.fetch_bisect(page_ids, self.fetch_pages_part)
+
+    def fetch_pages_part(
+            self,
+            page_ids: list[int]
+            ) -> list[dict] | None:
+        params = self.get_params(pageids="|".join(map(str, page_ids)), **MwWikiApi.PARAMS_PAGES_CONTENT)
+        json_data = self.fetch_json(params)
+
+        if json_data is None:
+            if len(page_ids) == 1:
+                raise RuntimeError(f"Broken JSON answer for page ID {page_ids[0]}")
+            return None
+
+        MwWikiApi.check_answer_keys(
+            json_data, MwWikiApi.KEYS_PAGES_ANSWER,
+            location="crawler.fetch_pages_part : json_data"
+        )
+        MwWikiApi.check_answer_keys(
+            json_data["query"], {"pages"},
+            location="crawler.fetch_pages_part : json_data[query]"
+        )
+        pages = json_data["query"]["pages"]
+        self.check_items(
+            [page for page in pages if "missing" not in page], MwSchemas.check_pageids_page, "pages"
+        )
+
+        return pages
+
+    def get_page_record(
+            self,
+            page: dict
+            ) -> MwStorage.PageRecord | None:
+        """Return page text in the same format as page files of pageids, None if page is skipped."""
+
+        if "missing" in page:
+            return MwStorage.PageRecord("", page["pageid"], "missing", "")
+
+        if str(page["ns"]) not in self.namespace_types:
+            raise RuntimeError(f"Unexpected namespace value: {page['ns']} for page ID {page['pageid']}")
+
+        unexpected_content = MwWikiApi.find_unexpected_content(page)
+        if unexpected_content is not None:
+            content_key, content_value = unexpected_content
+
+            if content_key == "contentmodel":
+                if self.blocked_store is not None:
+                    self.blocked_store.add_title(page["title"])
+                return None
+
+            raise RuntimeError(f"Unexpected contentformat: {content_value} for page ID {page['pageid']}")
+
+        folder_class, text = MwWikiApi.format_page_text(page, self.namespace_types[str(page["ns"])])
+        return MwStorage.PageRecord(f"{page['ns']:0{self.ns_max_key_len}d}", page["pageid"], folder_class, text)
+
+    def iter_pages(
+            self,
+            page_ids: Iterable[int],
+            batch_size: int = SETTING_BATCH_PAGES
+            ) -> Iterator[MwStorage.PageRecord]:
+        """Yield pages with latest content, page IDs are read lazily, so they can come from another generator."""
+
+        page_ids_batch: list[int] = []
+
+        for page_id in page_ids:
+            if self.blocked_store is not None and self.blocked_store.has_page_id(page_id):
+                continue
+
+            page_ids_batch.append(page_id)
+            if len(page_ids_batch) < batch_size:
+                continue
+
+            yield from self.iter_page_records(page_ids_batch)
+            page_ids_batch = []
+
+        if page_ids_batch:
+            yield from self.iter_page_records(page_ids_batch)
+
+    def iter_page_records(
+            self,
+            page_ids_batch: list[int]
+            ) -> Iterator[MwStorage.PageRecord]:
+        for page in self.fetch_pages(page_ids_batch):
+            page_record = self.get_page_record(page)
+            if page_record is not None:
+                yield page_record
+
+    def iter_pages_recent(
+            self,
+            time_start: str | None = None,
+            time_end: str | None = None
+            ) -> Iterator[MwStorage.PageRecord]:
+        """Yield latest content of pages changed in time range, every page once."""
+
+        yield from self.iter_pages(self.iter_recent_page_ids(time_start, time_end))
+
+    def iter_recent_page_ids(
+            self,
+            time_start: str | None = None,
+            time_end: str | None = None
+            ) -> Iterator[int]:
+        page_ids_seen: set[int] = set()
+
+        for change in self.iter_recentchanges(time_start, time_end):
+            if change["pageid"] not in page_ids_seen:
+                page_ids_seen.add(change["pageid"])
+                yield change["pageid"]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python mwparser/crawler.py <config file> <namespace number>")
+        sys.exit(1)
+
+    crawler_cli = Crawler.from_config(sys.argv[1])
+    time_crawl = time.monotonic()
+    count_pages = 0
+    for page_record_cli in crawler_cli.iter_pages(row["pageid"] for row in crawler_cli.iter_allpages(int(sys.argv[2]))):
+        count_pages += 1
+        print(f"{page_record_cli.namespace} {page_record_cli.page_id:010d} {page_record_cli.folder_class}")
+
+    print(f"Pages: {count_pages}, requests: {crawler_cli.count_requests}, seconds: {time.monotonic() - time_crawl:.1f}")
+    MwTransport.close_sessions()
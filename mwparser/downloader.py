@@ -0,0 +1,161 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import urllib.error
+import urllib.request
+from collections.abc import Callable
+
+import ratelimit as MwRateLimit
+
+# Threads that download images at the same time
+SETTING_DOWNLOAD_WORKERS = 4
+# Queue holds this many images per worker, then next batch waits for free place
+SETTING_QUEUE_PER_WORKER = 25
+# Size of one piece of image body written to disk
+SETTING_CHUNK_BYTES = 64 * 1024
+# Seconds to wait for connection and for every piece of body
+SETTING_TIMEOUT_SECONDS = 60
+
+BYTES_IN_MB = 1024 * 1024
+
+
+class ImageDownloader:
+    """Download stage for savefiles mode, worker threads stream queued images to disk."""
+
+    def __init__(
+            self,
+            headers: dict,
+            max_mbytes: float,
+            workers: int = SETTING_DOWNLOAD_WORKERS,
+            on_fail: Callable[[str, str], None] | None = None,
+            logging: bool = True
+            ) -> None:
+        self.headers = headers
+        self.max_mbytes = max_mbytes
+        self.max_bytes = int(max_mbytes * BYTES_IN_MB)
+        self.on_fail = on_fail
+        self.logging = logging
+
+        self.count_saved = 0
+        self.count_failed = 0
+        self.count_lock = threading.Lock()
+
+        self.queue: queue.Queue[tuple[str, str] | None] = queue.Queue(
+            maxsize=workers * SETTING_QUEUE_PER_WORKER
+        )
+        self.threads = [
+            threading.Thread(target=self.run_worker, name=f"mwparser-download-{nr}", daemon=True)
+            for nr in range(workers)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def put(
+            self,
+            url: str,
+            path_file: str
+            ) -> None:
+        """Add image to queue, wait only if queue is full."""
+
+        self.queue.put((url, path_file))
+
+    def wait(
+            self
+            ) -> None:
+        """Wait until all images queued so far are downloaded or failed, workers keep running."""
+
+        self.queue.join()
+
+    def close(
+            self
+            ) -> None:
+        """Wait until all queued images are downloaded and stop workers."""
+
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+
+        print(f"Images saved: {self.count_saved}, failed: {self.count_failed}")
+
+    def run_worker(
+            self
+            ) -> None:
+        while True:
+            task = self.queue.get()
+            if task is None:
+                self.queue.task_done()
+                break
+
+            url, path_file = task
+            try:
+                try:
+                    is_saved = self.download(url, path_file)
+                except Exception as e:
+                    print(f"Download error: {url} : {e!r}")
+                    is_saved = False
+
+                with self.count_lock:
+                    if is_saved:
+                        self.count_saved += 1
+                    else:
+                        self.count_failed += 1
+
+                if not is_saved and self.on_fail is not None:
+                    self.on_fail(url, path_file)
+
+            finally:
+                self.queue.task_done()
+
+    def download(
+            self,
+            url: str,
+            path_file: str
+            ) -> bool:
+        """Stream one image to disk, check size from Content-Length before body is read."""
+
+        path_part = path_file + ".part"
+        request = urllib.request.Request(url, headers=self.headers)
+        limiter = MwRateLimit.get_limiter(url)
+        limiter.acquire()
+
+        try:
+            with urllib.request.urlopen(request, timeout=SETTING_TIMEOUT_SECONDS) as response:
+                content_length = response.headers.get("Content-Length")
+                if content_length is not None and int(content_length) > self.max_bytes:
+                    print(f"Skip image over {self.max_mbytes} MB: {url} : {int(content_length) / BYTES_IN_MB:.1f} MB")
+                    return False
+
+                os.makedirs(os.path.dirname(path_file), exist_ok=True)
+                size_saved = 0
+                with open(path_part, "wb") as file_part:
+                    while chunk := response.read(SETTING_CHUNK_BYTES):
+                        size_saved += len(chunk)
+                        # Content-Length can be missing, so size is checked while streaming too
+                        if size_saved > self.max_bytes:
+                            raise ValueError(f"Image body is over {self.max_mbytes} MB")
+                        file_part.write(chunk)
+
+            os.replace(path_part, path_file)
+            limiter.on_success()
+
+        except (OSError, ValueError) as e:
+            if isinstance(e, urllib.error.HTTPError) and e.code in (429, 503):
+                limiter.on_throttle(MwRateLimit.parse_retry_after(e.headers.get("Retry-After")))
+            print(f"Failed to download image: {url} : {e!r}")
+            if os.path.isfile(path_part):
+                os.remove(path_part)
+            return False
+
+        if self.logging:
+            print(f"Saved image: {path_file} : {size_saved} bytes")
+
+        return True
@@ -0,0 +1,122 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+import re
+import json
+from collections.abc import Iterator
+
+# Start of pages list in query answer, nothing before it has page content
+PATTERN_PAGES_START = re.compile(r'"pages"\s*:\s*\[')
+PATTERN_WHITESPACE = re.compile(r"\s*")
+
+DECODER = json.JSONDecoder()
+
+
+def count_open_objects(
+        text: str,
+        index_end: int
+        ) -> int:
+    """Return count of JSON objects open at index_end, brackets inside strings are skipped."""
+
+    count_open = 0
+    in_string = False
+    index = 0
+    while index < index_end:
+        char = text[index]
+        if in_string:
+            if char == "\\":
+                index += 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            count_open += 1
+        elif char == "}":
+            count_open -= 1
+        index += 1
+    return count_open
+
+
+class PagesStream:
+    """Pages of query answer with formatversion=2 decoded one by one from answer text.
+
+    Answer text still comes whole from the network, only the decoded dict of whole answer is avoided:
+    one page is decoded at a time, so memory is the answer text and one decoded page.
+    Answer keys can be before and after pages list in any order, envelope has keys before it
+    until the list is read to the end, then keys of the whole answer.
+    If text ends in the middle, pages before the broken one are still returned and complete is False.
+    """
+
+    def __init__(
+            self,
+            text: str
+            ) -> None:
+        """Decode answer keys before pages list, ValueError if text has no pages list or its beginning is broken."""
+
+        match_pages = PATTERN_PAGES_START.search(text)
+        if match_pages is None:
+            raise ValueError("Answer has no pages list")
+
+        # Text before pages list is short, objects open there are closed to read keys before it
+        text_head = text[:match_pages.end()] + "]"
+        self.envelope = json.loads(text_head + "}" * count_open_objects(text, match_pages.start()))
+        if not isinstance(self.envelope, dict):
+            raise ValueError("Answer is not JSON object")
+
+        self.text = text
+        self.text_head = text_head
+        self.index_start = match_pages.end()
+        self.page_ids_seen: set[int] = set()
+        self.complete = False
+
+    def __iter__(
+            self
+            ) -> Iterator[dict]:
+        text = self.text
+        index = PATTERN_WHITESPACE.match(text, self.index_start).end()
+
+        if text.startswith("]", index):
+            self.check_tail(index + 1)
+            return
+
+        while True:
+            try:
+                page, index = DECODER.raw_decode(text, index)
+            except json.JSONDecodeError:
+                return
+
+            if not isinstance(page, dict):
+                return
+            if isinstance(page.get("pageid"), int):
+                self.page_ids_seen.add(page["pageid"])
+            yield page
+
+            index = PATTERN_WHITESPACE.match(text, index).end()
+            if text.startswith(",", index):
+                index = PATTERN_WHITESPACE.match(text, index + 1).end()
+                continue
+
+            if text.startswith("]", index):
+                self.check_tail(index + 1)
+            return
+
+    def check_tail(
+            self,
+            index: int
+            ) -> None:
+        """Answer is complete only if text after pages list closes it as valid JSON, its keys are added to envelope."""
+
+        try:
+            envelope = json.loads(self.text_head + self.text[index:])
+        except json.JSONDecodeError:
+            return
+
+        if isinstance(envelope, dict):
+            self.envelope = envelope
+            self.complete = True
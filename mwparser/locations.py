@@ -0,0 +1,209 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+import os
+from typing import NamedTuple, TextIO
+
+import storage as MwStorage
+
+FILE_LOCATIONS = "page-locations.tsv"
+
+# Index line of page that has no file anymore
+FOLDER_CLASS_DELETED = "deleted"
+
+# File is written again without old lines when it has this many lines per page
+SETTING_COMPACT_LINES_PER_PAGE = 4
+
+
+class PageLocation(NamedTuple):
+    """Namespace, folder class and codec of page file, folder class names are the same as in storage.py."""
+
+    namespace: int
+    folder_class: str
+    codec: str
+
+
+class LocationIndex:
+    """Page ID to location of its file for all namespaces of wiki, kept in append-only TSV file, the last line of page wins."""
+
+    def __init__(
+            self,
+            path_wiki: str,
+            path_file: str
+            ) -> None:
+        self.path_wiki = path_wiki
+        self.path_file = path_file
+        self.locations: dict[int, PageLocation] = {}
+        self.file_index: TextIO | None = None
+
+        if os.path.isfile(self.path_file):
+            self.load()
+        else:
+            self.rebuild()
+
+    def load(
+            self
+            ) -> None:
+        """Read lines of file, half-written last line after crash is skipped."""
+
+        count_lines = 0
+        with open(self.path_file, "r", encoding="utf-8") as file_index:
+            for line in file_index:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) != 4 or not parts[0].isdigit() or not line.endswith("\n"):
+                    continue
+
+                count_lines += 1
+                page_id = int(parts[0])
+                if parts[2] == FOLDER_CLASS_DELETED:
+                    self.locations.pop(page_id, None)
+                else:
+                    self.locations[page_id] = PageLocation(int(parts[1]), parts[2], parts[3])
+
+        print(f"Page locations: {len(self.locations)}")
+
+        if count_lines > SETTING_COMPACT_LINES_PER_PAGE * max(len(self.locations), 1):
+            self.compact()
+
+    def rebuild(
+            self
+            ) -> None:
+        """Scan page folders and packed stores once, when index file does not exist yet."""
+
+        print(f"Building page locations from folders: {self.path_wiki}")
+
+        path_packed = os.path.join(self.path_wiki, MwStorage.FOLDER_RAW_PACKED)
+        if os.path.isdir(path_packed):
+            for entry_ns in os.scandir(path_packed):
+                if not entry_ns.is_dir() or not entry_ns.name.isdigit():
+                    continue
+                store = MwStorage.PackedStore(entry_ns.path)
+                for page_id, (_, _, _, flags) in store.index.items():
+                    self.locations[page_id] = PageLocation(
+                        int(entry_ns.name),
+                        MwStorage.FOLDER_CLASS_NAMES[flags & 0x0F],
+                        MwStorage.CODEC_NAMES[flags >> 4]
+                    )
+                store.close()
+
+        for folder_class in ("pages", "redirect", "removed"):
+            path_folder = os.path.join(self.path_wiki, MwStorage.FOLDER_RAW, folder_class)
+            if not os.path.isdir(path_folder):
+                continue
+
+            for entry_ns in os.scandir(path_folder):
+                # Missing pages are moved to removed folder as <ns>-<pageid>.txt
+                if entry_ns.is_file() and folder_class == "removed":
+                    ns_part, _, page_part = entry_ns.name.partition("-")
+                    page_id_part, _, _ = page_part.partition(".txt")
+                    if ns_part.isdigit() and page_id_part.isdigit():
+                        self.locations[int(page_id_part)] = PageLocation(
+                            int(ns_part), "missing", MwStorage.get_codec_from_path(entry_ns.name)
+                        )
+                    continue
+
+                if not entry_ns.is_dir() or not entry_ns.name.isdigit():
+                    continue
+
+                for entry_page in os.scandir(entry_ns.path):
+                    page_id_part, _, _ = entry_page.name.partition(".txt")
+                    if entry_page.is_file() and page_id_part.isdigit():
+                        self.locations[int(page_id_part)] = PageLocation(
+                            int(entry_ns.name), folder_class, MwStorage.get_codec_from_path(entry_page.name)
+                        )
+
+        self.compact()
+        print(f"Page locations: {len(self.locations)}")
+
+    def compact(
+            self
+            ) -> None:
+        """Write one line per page to temporary file and replace index file."""
+
+        self.close()
+
+        os.makedirs(os.path.dirname(self.path_file), exist_ok=True)
+        path_file_tmp = self.path_file + ".tmp"
+        with open(path_file_tmp, "w", encoding="utf-8") as file_tmp:
+            for page_id in sorted(self.locations):
+                location = self.locations[page_id]
+                file_tmp.write(f"{page_id}\t{location.namespace}\t{location.folder_class}\t{location.codec}\n")
+            file_tmp.flush()
+            os.fsync(file_tmp.fileno())
+        os.replace(path_file_tmp, self.path_file)
+
+    def get(
+            self,
+            page_id: int
+            ) -> PageLocation | None:
+        return self.locations.get(page_id)
+
+    def append_line(
+            self,
+            line: str
+            ) -> None:
+        if self.file_index is None:
+            self.file_index = open(self.path_file, "a", encoding="utf-8")
+        self.file_index.write(line)
+
+    def set(
+            self,
+            page_id: int,
+            namespace: int,
+            folder_class: str,
+            codec: str
+            ) -> None:
+        """Save new location of page, nothing is written if it did not change."""
+
+        location = PageLocation(namespace, folder_class, codec)
+        if self.locations.get(page_id) == location:
+            return
+
+        self.locations[page_id] = location
+        self.append_line(f"{page_id}\t{namespace}\t{folder_class}\t{codec}\n")
+
+    def delete(
+            self,
+            page_id: int
+            ) -> None:
+        if self.locations.pop(page_id, None) is None:
+            return
+
+        self.append_line(f"{page_id}\t0\t{FOLDER_CLASS_DELETED}\tnone\n")
+
+    def delete_namespace(
+            self,
+            namespace: int,
+            folder_classes: tuple[str, ...]
+            ) -> int:
+        """Delete pages of namespace in given folder classes, return their count."""
+
+        page_ids = [
+            page_id for page_id, location in self.locations.items()
+            if location.namespace == namespace and location.folder_class in folder_classes
+        ]
+        for page_id in page_ids:
+            self.delete(page_id)
+
+        return len(page_ids)
+
+    def flush(
+            self
+            ) -> None:
+        if self.file_index is not None:
+            self.file_index.flush()
+            os.fsync(self.file_index.fileno())
+
+    def close(
+            self
+            ) -> None:
+        self.flush()
+
+        if self.file_index is not None:
+            self.file_index.close()
+            self.file_index = None
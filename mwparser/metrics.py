@@ -0,0 +1,149 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+import os
+import json
+import time
+import functools
+import threading
+import cProfile
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+# Lines of largest memory users in tracemalloc report
+SETTING_TRACEMALLOC_TOP = 25
+
+METRICS_LOCK = threading.Lock()
+# Timer name to count of calls, total seconds and longest call
+timers: dict[str, list[float]] = {}
+counters: dict[str, int] = {}
+time_run_start = time.perf_counter()
+
+profiler: cProfile.Profile | None = None
+
+
+@contextmanager
+def timer(
+        name: str
+        ) -> Iterator[None]:
+    """Add time of block to timer, safe to use from several threads, so time of stages can be more than run time."""
+
+    time_block = time.perf_counter()
+    try:
+        yield
+    finally:
+        time_block = time.perf_counter() - time_block
+        with METRICS_LOCK:
+            timer_values = timers.setdefault(name, [0, 0.0, 0.0])
+            timer_values[0] += 1
+            timer_values[1] += time_block
+            timer_values[2] = max(timer_values[2], time_block)
+
+
+def timed(
+        name: str
+        ) -> Callable:
+    """Decorator that adds every call of function to timer."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def add(
+        name: str,
+        value: int = 1
+        ) -> None:
+    with METRICS_LOCK:
+        counters[name] = counters.get(name, 0) + value
+
+
+def get_summary(
+        ) -> dict:
+    """Return run time, timers and counters as dict for JSON."""
+
+    with METRICS_LOCK:
+        return {
+            "run_seconds": round(time.perf_counter() - time_run_start, 3),
+            "timers": {
+                name: {
+                    "count": int(timer_values[0]),
+                    "seconds": round(timer_values[1], 3),
+                    "max_seconds": round(timer_values[2], 3),
+                }
+                for name, timer_values in sorted(timers.items())
+            },
+            "counters": dict(sorted(counters.items())),
+        }
+
+
+def save_summary(
+        path_file: str,
+        run_info: dict
+        ) -> dict:
+    """Save summary with run info to JSON file and return it."""
+
+    summary = {**run_info, **get_summary()}
+    if tracemalloc.is_tracing():
+        summary["tracemalloc_peak_mbytes"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 3)
+
+    os.makedirs(os.path.dirname(path_file), exist_ok=True)
+    with open(path_file, "w", encoding="utf-8") as file_summary:
+        json.dump(summary, file_summary, ensure_ascii=False, indent=2)
+
+    return summary
+
+
+def start_profiling(
+        use_cprofile: bool,
+        use_tracemalloc: bool
+        ) -> None:
+    """Start cProfile and tracemalloc, cProfile sees only the thread that called it."""
+
+    global profiler
+
+    if use_cprofile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    if use_tracemalloc:
+        tracemalloc.start()
+
+
+def stop_profiling(
+        path_prefix: str
+        ) -> None:
+    """Stop profiling and save <prefix>-profile.prof and <prefix>-tracemalloc.txt."""
+
+    global profiler
+
+    os.makedirs(os.path.dirname(path_prefix), exist_ok=True)
+
+    if profiler is not None:
+        profiler.disable()
+        # Read it with: python -m pstats <file>
+        profiler.dump_stats(f"{path_prefix}-profile.prof")
+        print(f"Profile saved: {path_prefix}-profile.prof")
+        profiler = None
+
+    if tracemalloc.is_tracing():
+        snapshot = tracemalloc.take_snapshot()
+        size_current, size_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        with open(f"{path_prefix}-tracemalloc.txt", "w", encoding="utf-8") as file_trace:
+            file_trace.write(f"Current: {size_current / (1024 * 1024):.3f} MB, peak: {size_peak / (1024 * 1024):.3f} MB\n\n")
+            for statistic in snapshot.statistics("lineno")[:SETTING_TRACEMALLOC_TOP]:
+                file_trace.write(f"{statistic}\n")
+        print(f"Memory report saved: {path_prefix}-tracemalloc.txt")
@@ -0,0 +1,153 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+# If SETTING_RATE_LIMITED is False, requests are not limited, only pauses after throttle answers are kept
+SETTING_RATE_LIMITED = True
+# Requests per second to one host when it does not throttle
+SETTING_RATE_MAX = 10.0
+# Requests per second never goes below this
+SETTING_RATE_MIN = 0.2
+# Per-host max rate, key is host name from URL
+SETTING_RATE_MAX_PER_HOST: dict[str, float] = {}
+# Requests that can be sent at once after idle time
+SETTING_BURST = 5
+# Rate is multiplied by this after throttle answer
+SETTING_RATE_FACTOR_DOWN = 0.5
+# Rate grows by this after every successful request, up to max rate
+SETTING_RATE_STEP_UP = 0.25
+# Seconds to pause all requests to host after throttle answer without Retry-After
+SETTING_THROTTLE_WAIT_SECONDS = 5.0
+# Retry-After longer than this is cut, wiki can ask for minutes during maintenance
+SETTING_THROTTLE_MAX_WAIT_SECONDS = 120.0
+
+# Limiters are shared by threads of one process, scheduler.py limits processes per host on its own
+LIMITERS_LOCK = threading.Lock()
+limiters: dict[str, RateLimiter] = {}
+
+
+class RateLimiter:
+    """Token bucket of one host, rate goes down after throttle answers and back up after successful requests."""
+
+    def __init__(
+            self,
+            rate_max: float = SETTING_RATE_MAX,
+            rate_min: float = SETTING_RATE_MIN,
+            burst: int = SETTING_BURST,
+            limited: bool = True
+            ) -> None:
+        self.limited = limited
+        self.rate_max = rate_max
+        self.rate_min = min(rate_min, rate_max)
+        self.burst = burst
+
+        self.rate = rate_max
+        self.tokens = float(burst)
+        self.time_updated = time.monotonic()
+        self.pause_until = 0.0
+        self.lock = threading.Lock()
+
+        self.count_requests = 0
+        self.count_throttled = 0
+
+    def acquire(
+            self
+            ) -> None:
+        """Wait for one token, safe to call from several threads."""
+
+        while True:
+            with self.lock:
+                time_now = time.monotonic()
+
+                if time_now < self.pause_until:
+                    wait_seconds = self.pause_until - time_now
+                elif not self.limited:
+                    self.count_requests += 1
+                    return
+                else:
+                    self.tokens = min(self.burst, self.tokens + (time_now - self.time_updated) * self.rate)
+                    self.time_updated = time_now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        self.count_requests += 1
+                        return
+                    wait_seconds = (1 - self.tokens) / self.rate
+
+            time.sleep(wait_seconds)
+
+    def on_success(
+            self
+            ) -> None:
+        with self.lock:
+            if self.rate < self.rate_max:
+                self.rate = min(self.rate_max, self.rate + SETTING_RATE_STEP_UP)
+
+    def on_throttle(
+            self,
+            wait_seconds: float | None = None
+            ) -> None:
+        """Lower rate and pause all requests to host, wait_seconds comes from Retry-After if server sends it."""
+
+        if wait_seconds is None:
+            wait_seconds = SETTING_THROTTLE_WAIT_SECONDS
+        wait_seconds = min(max(wait_seconds, 0.0), SETTING_THROTTLE_MAX_WAIT_SECONDS)
+
+        with self.lock:
+            self.count_throttled += 1
+            self.rate = max(self.rate_min, self.rate * SETTING_RATE_FACTOR_DOWN)
+            self.pause_until = max(self.pause_until, time.monotonic() + wait_seconds)
+            # No tokens are collected during pause
+            self.tokens = 0.0
+            self.time_updated = self.pause_until
+
+        print(f"Throttled, pause {wait_seconds:.1f} s, rate {self.rate:.2f} requests/s")
+
+
+def get_limiter(
+        url: str
+        ) -> RateLimiter:
+    """Return shared limiter for host of URL, create it on first use."""
+
+    host = urlsplit(url).hostname or url
+
+    with LIMITERS_LOCK:
+        if host not in limiters:
+            limiters[host] = RateLimiter(
+                rate_max=SETTING_RATE_MAX_PER_HOST.get(host, SETTING_RATE_MAX),
+                limited=SETTING_RATE_LIMITED
+            )
+
+    return limiters[host]
+
+
+def parse_retry_after(
+        value: str | None
+        ) -> float | None:
+    """Return seconds from Retry-After header, it can be seconds or HTTP date."""
+
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_time = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_time.tzinfo is None:
+        retry_time = retry_time.replace(tzinfo=timezone.utc)
+
+    return max(0.0, (retry_time - datetime.now(timezone.utc)).total_seconds())
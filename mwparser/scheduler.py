@@ -0,0 +1,218 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+import sys
+import os
+import subprocess
+import threading
+from urllib.parse import urlsplit
+
+import newtutils.files as NewtFiles
+
+import todo as MwTodo
+
+# Max script.py processes at the same time for all wikis
+SETTING_MAX_WORKERS = 4
+# Max script.py processes at the same time for wikis on one host
+# Rate limiter of ratelimit.py lives in one script.py process, so this is the only limit shared by processes:
+# with 2 processes per host the host gets up to twice SETTING_RATE_MAX requests per second
+SETTING_HOST_WORKERS_DEFAULT = 1
+# Per-host limit, key is host name from BASE_URL
+SETTING_HOST_WORKERS_PER_HOST: dict[str, int] = {}
+
+# Tasks of one wiki run in this order, so every task runs after the tasks it reads from
+TASK_ORDER = ("allpages", "pageids", "recentchanges", "pagesrecent", "savefiles")
+WIKI_DATA_TYPE_NR = {value: key for key, value in MwTodo.WIKI_DATA_TYPE_DICT.items()}
+
+WORKERS_SLOTS = threading.BoundedSemaphore(SETTING_MAX_WORKERS)
+HOST_LOCK = threading.Lock()
+host_slots: dict[str, threading.BoundedSemaphore] = {}
+RESULTS_LOCK = threading.Lock()
+task_results: dict[tuple[str, str, str | None], int] = {}
+
+
+def get_host_slots(
+        host: str
+        ) -> threading.BoundedSemaphore:
+    with HOST_LOCK:
+        if host not in host_slots:
+            host_slots[host] = threading.BoundedSemaphore(
+                SETTING_HOST_WORKERS_PER_HOST.get(host, SETTING_HOST_WORKERS_DEFAULT)
+            )
+    return host_slots[host]
+
+
+def get_wiki_settings(
+        file_config: str
+        ) -> dict:
+    """Read config file, its structure is already checked in check_todo()."""
+
+    settings = NewtFiles.read_json_from_file(os.path.join(MwTodo.DIR_PROJECT, "configs", file_config))
+    assert isinstance(settings, dict)  # for type checker
+    return settings
+
+
+def get_file_namespace(
+        ns_dict: dict
+        ) -> str | None:
+    """Return key of File namespace, savefiles reads allpages list of it."""
+
+    keys = [key for key, value in ns_dict.items() if value == "File"]
+    return keys[0] if len(keys) == 1 else None
+
+
+def get_task_dependencies(
+        task: tuple[str, str, str | None],
+        file_namespace: str | None
+        ) -> list[tuple[str, str, str | None]]:
+    """Return tasks of the same wiki whose output this task reads."""
+
+    file_config, wiki_data_type, ns_key = task
+
+    match wiki_data_type:
+        case "pageids":
+            return [(file_config, "allpages", ns_key)]
+        case "pagesrecent":
+            return [(file_config, "recentchanges", None)]
+        case "savefiles":
+            return [(file_config, "allpages", file_namespace)]
+        case _:
+            return []
+
+
+def get_path_log_marker(
+        settings: dict,
+        ns_max_key_len: int,
+        wiki_data_type: str,
+        ns_key: str | None
+        ) -> str:
+    """Return path of log file that check_todo() looks for."""
+
+    if ns_key is not None:
+        name_log_file = f"{wiki_data_type}-{int(ns_key):0{ns_max_key_len}d}.txt"
+    else:
+        name_log_file = f"{wiki_data_type}.txt"
+
+    return os.path.join(MwTodo.DIR_GLOBAL, settings["FOLDER_LINK"], MwTodo.FOLDER_LOGS, name_log_file)
+
+
+def run_task(
+        task: tuple[str, str, str | None],
+        settings: dict,
+        ns_max_key_len: int
+        ) -> int:
+    """Run one task in its own script.py process, write log marker if it ends without error."""
+
+    file_config, wiki_data_type, ns_key = task
+
+    path_marker = get_path_log_marker(settings, ns_max_key_len, wiki_data_type, ns_key)
+    path_running = path_marker[:-len(".txt")] + "-running.txt"
+    path_failed = path_marker[:-len(".txt")] + "-failed.txt"
+    os.makedirs(os.path.dirname(path_marker), exist_ok=True)
+
+    command = [
+        sys.executable, os.path.join(MwTodo.DIR_PROJECT, "script.py"),
+        file_config, WIKI_DATA_TYPE_NR[wiki_data_type], ns_key or ""
+    ]
+    print(f"Start: {file_config} {wiki_data_type} {ns_key or ''}")
+
+    with open(path_running, "w", encoding="utf-8") as file_log:
+        process = subprocess.run(
+            command,
+            stdin=subprocess.DEVNULL, stdout=file_log, stderr=subprocess.STDOUT,
+            env={**os.environ, "PYTHONUNBUFFERED": "1"}
+        )
+
+    if process.returncode != 0:
+        os.replace(path_running, path_failed)
+        print(f"Failed ({process.returncode}): {file_config} {wiki_data_type} {ns_key or ''} : {path_failed}")
+        return process.returncode
+
+    # Script saves its own log there if SAVE_LOG is True
+    if os.path.isfile(path_marker):
+        os.remove(path_running)
+    else:
+        os.replace(path_running, path_marker)
+    if os.path.isfile(path_failed):
+        os.remove(path_failed)
+
+    print(f"Done: {file_config} {wiki_data_type} {ns_key or ''}")
+    return 0
+
+
+def run_wiki(
+        file_config: str,
+        tasks: list[tuple[str, str, str | None]]
+        ) -> None:
+    """Run tasks of one wiki one after another, skip task if a task it depends on has failed."""
+
+    settings = get_wiki_settings(file_config)
+    host = urlsplit(settings["BASE_URL"]).hostname or settings["BASE_URL"]
+    ns_dict = NewtFiles.read_json_from_file(os.path.join(MwTodo.DIR_GLOBAL, settings["FOLDER_LINK"], MwTodo.FILE_NAMESPACES))
+    assert isinstance(ns_dict, dict)  # for type checker
+    file_namespace = get_file_namespace(ns_dict)
+    ns_max_key_len = len(max(ns_dict.keys(), key=len))
+
+    for task in tasks:
+        with RESULTS_LOCK:
+            failed_dependencies = [
+                dependency for dependency in get_task_dependencies(task, file_namespace)
+                if task_results.get(dependency, 0) != 0
+            ]
+        if failed_dependencies:
+            print(f"Skip: {task} : failed dependency {failed_dependencies}")
+            with RESULTS_LOCK:
+                task_results[task] = -1
+            continue
+
+        with get_host_slots(host), WORKERS_SLOTS:
+            returncode = run_task(task, settings, ns_max_key_len)
+
+        with RESULTS_LOCK:
+            task_results[task] = returncode
+
+
+def run_todo_list(
+        dry_run: bool = False
+        ) -> dict[tuple[str, str, str | None], int]:
+    """Run all tasks from check_todo(), one thread per wiki, and return exit code of every task."""
+
+    tasks_by_wiki: dict[str, list[tuple[str, str, str | None]]] = {}
+    for file_config, wiki_data_type, ns_key, _ in MwTodo.check_todo():
+        tasks_by_wiki.setdefault(file_config, []).append((file_config, wiki_data_type, ns_key))
+
+    for tasks in tasks_by_wiki.values():
+        tasks.sort(key=lambda task: (TASK_ORDER.index(task[1]), int(task[2] or 0)))
+
+    if dry_run:
+        for tasks in tasks_by_wiki.values():
+            for task in tasks:
+                print(task)
+        return {}
+
+    threads = [
+        threading.Thread(target=run_wiki, args=(file_config, tasks), name=f"mwparser-wiki-{file_config}")
+        for file_config, tasks in tasks_by_wiki.items()
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return dict(task_results)
+
+
+if __name__ == "__main__":
+    results = run_todo_list(dry_run=len(sys.argv) > 1 and sys.argv[1] == "dry")
+
+    print()
+    print("=== SCHEDULER RESULT ===")
+    for result_task, result_code in results.items():
+        print(f"{'OK' if result_code == 0 else 'SKIPPED' if result_code < 0 else 'FAILED'} : {result_task}")
+
+    sys.exit(1 if any(result_code != 0 for result_code in results.values()) else 0)
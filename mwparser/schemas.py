@@ -0,0 +1,82 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+
+# Schema is dict of keys that item must have, exactly like NewtUtil.check_dict_keys():
+# value None - any value, dict - nested schema, list with one schema - list of such items
+Schema = dict
+
+# Items of answers, the same keys as restructure_json_*() check in script.py
+SCHEMA_ALLPAGES_PAGE: Schema = {"pageid": None, "ns": None, "title": None}
+
+SCHEMA_RECENTCHANGES_PAGE: Schema = {
+    "type": None, "ns": None, "title": None, "pageid": None,
+    "revid": None, "old_revid": None, "rcid": None, "timestamp": None,
+}
+
+SCHEMA_PAGEIDS_PAGE: Schema = {
+    "pageid": None, "ns": None, "title": None,
+    "revisions": [{"slots": {"main": {"contentmodel": None, "contentformat": None, "content": None}}}],
+}
+
+SCHEMA_SAVEFILES_IMAGE: Schema = {
+    "pageid": None, "ns": None, "title": None, "imagerepository": None,
+    "imageinfo": [{"url": None, "descriptionurl": None, "descriptionshorturl": None}],
+}
+
+
+def compile_schema(
+        schema: Schema
+        ) -> Callable[[object], bool]:
+    """Return function that checks item against schema, it only says if item fits, errors are reported by caller."""
+
+    keys = frozenset(schema)
+    checks_nested = []
+    for key, schema_value in schema.items():
+        if isinstance(schema_value, dict):
+            checks_nested.append((key, compile_schema(schema_value)))
+        elif isinstance(schema_value, list):
+            checks_nested.append((key, compile_list(compile_schema(schema_value[0]))))
+
+    if not checks_nested:
+        def check_flat(item: object) -> bool:
+            return type(item) is dict and item.keys() == keys
+        return check_flat
+
+    def check_nested(item: object) -> bool:
+        if type(item) is not dict or item.keys() != keys:
+            return False
+        for key, check_value in checks_nested:
+            if not check_value(item[key]):
+                return False
+        return True
+    return check_nested
+
+
+def compile_list(
+        check_item: Callable[[object], bool]
+        ) -> Callable[[object], bool]:
+    def check_list(value: object) -> bool:
+        return type(value) is list and all(map(check_item, value))
+    return check_list
+
+
+def check_items(
+        items: Iterable[object],
+        check_item: Callable[[object], bool]
+        ) -> bool:
+    """Return True if all items fit, then per-item checks of batch can be skipped."""
+
+    return all(map(check_item, items))
+
+
+check_allpages_page = compile_schema(SCHEMA_ALLPAGES_PAGE)
+check_recentchanges_page = compile_schema(SCHEMA_RECENTCHANGES_PAGE)
+check_pageids_page = compile_schema(SCHEMA_PAGEIDS_PAGE)
+check_savefiles_image = compile_schema(SCHEMA_SAVEFILES_IMAGE)
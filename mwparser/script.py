@@ -9,7 +9,19 @@
 
 import sys
 import os
+import atexit
+import csv
+import functools
+import hashlib
+import heapq
+import json
 import shutil
+import tempfile
+import time
+import threading
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 import newtutils.console as NewtCons
@@ -17,10 +29,26 @@
 import newtutils.files as NewtFiles
 import newtutils.network as NewtNet
 
-DIR_PROJECT = os.path.dirname(os.path.realpath(__file__))
+import blocklist as MwBlocklist
+import cache as MwCache
+import catalog as MwCatalog
+import columnar as MwColumnar
+import downloader as MwDownloader
+import jsonstream as MwJsonStream
+import locations as MwLocations
+import metrics as MwMetrics
+import ratelimit as MwRateLimit
+import schemas as MwSchemas
+import storage as MwStorage
+import todo as MwTodo
+import transport as MwTransport
+import wikiapi as MwWikiApi
+import writer as MwWriter
+
+DIR_PROJECT = MwTodo.DIR_PROJECT
 # print(DIR_PROJECT)  # D:\VS_Code\dev-parser-mediawiki\mwparser
 
-DIR_GLOBAL = os.path.dirname(os.path.dirname(DIR_PROJECT))
+DIR_GLOBAL = MwTodo.DIR_GLOBAL
 # print(DIR_GLOBAL)  # D:\VS_Code
 
 # Add the project root directory to sys.path
@@ -39,11 +67,18 @@
 FOLDER_RAW_REDIRECT = os.path.join("data", "raw", "redirect")
 FOLDER_RAW_REMOVED = os.path.join("data", "raw", "removed")
 FOLDER_RAW_IMAGES = os.path.join("data", "raw", "images")
+FOLDER_RAW_HISTORY = os.path.join("data", "raw", "history")
+FOLDER_RAW_PACKED = MwStorage.FOLDER_RAW_PACKED
 FOLDER_LISTS = os.path.join("data", "lists")
-FOLDER_LOGS = os.path.join("data", "logs")
-FILE_NAMESPACES = os.path.join("data", "schemas", "namespace_types.json")
+FOLDER_MANIFEST = os.path.join("data", "lists", "manifest")
+FOLDER_LOGS = MwTodo.FOLDER_LOGS
+FOLDER_CACHE = os.path.join("data", "cache")
+FOLDER_CHECKPOINTS = os.path.join("data", "logs", "checkpoints")
+FILE_NAMESPACES = MwTodo.FILE_NAMESPACES
 FILE_BLOCKED = "blocked.txt"
 FILE_RECENTCHANGES = "recentchanges.csv"
+FILE_RECENTCHANGES_WATERMARK = "recentchanges-watermark.json"
+FILE_BATCH_SIZES = "batch-sizes.json"
 
 # Extended functionality in read_config()
 if sys.argv and len(sys.argv) > 1 and sys.argv[1] != "":
@@ -56,13 +91,7 @@
     # File must be in configs folder
     file_config_set = "xxx.json"  # TODO
 
-WIKI_DATA_TYPE_DICT = {
-    "1": "allpages",
-    "2": "pageids",
-    "3": "recentchanges",
-    "4": "pagesrecent",
-    "5": "savefiles",
-}
+WIKI_DATA_TYPE_DICT = MwTodo.WIKI_DATA_TYPE_DICT
 
 # Extended functionality in read_config()
 if sys.argv and len(sys.argv) > 2 and sys.argv[2] != "":
@@ -76,10 +105,14 @@
 
 namespace_types_set: dict = {}
 # Extended functionality in read_config()
-NAMESPACE_NR_CHECK = False
-NAMESPACE_NR_CHECK = True
-# If NAMESPACE_NR_CHECK is False, set namespace number here
-namespace_nr_set: int = 0
+if sys.argv and len(sys.argv) > 3 and sys.argv[3] != "":
+    NAMESPACE_NR_CHECK = False
+    namespace_nr_set: int = int(sys.argv[3])
+else:
+    NAMESPACE_NR_CHECK = False
+    NAMESPACE_NR_CHECK = True
+    # If NAMESPACE_NR_CHECK is False, set namespace number here
+    namespace_nr_set = 0
 
 # Extended functionality in prep_headers_params_for_url()
 APCONTINUE_CHECK = True
@@ -96,106 +129,172 @@
 # max 8 MB for images to avoid downloading very large files that may cause issues
 SETTING_IMAGE_MAX_MBYTES = 8
 
+# Extended functionality in read_config() and load_checkpoint()
+RESUME_CHECK = True
+RESUME_CHECK = False
+# If RESUME_CHECK is True, pageids, pagesrecent and savefiles save the index after every written batch
+# to data/logs/checkpoints/<mode>-<ns>.json, the next run continues from it if the list of IDs is the same,
+# pageids folders are not removed then, checkpoint is removed after the last batch
+
+# Extended functionality in get_next_page_ids_batch() and fetch_json_pageids()
+ADAPTIVE_BATCH_CHECK = True
+ADAPTIVE_BATCH_CHECK = False
+# If ADAPTIVE_BATCH_CHECK is True, pageids and pagesrecent learn batch size per namespace from response size and time,
+# it is saved in data/lists/batch-sizes.json, halved on broken response and doubled back up to SETTING_INDEX_MAX_PAGES
+# Batch gets smaller if response text is longer than this
+SETTING_BATCH_TARGET_MBYTES = 8
+# Batch gets smaller if response takes longer than this
+SETTING_BATCH_TARGET_SECONDS = 20
+BATCH_SIZE_LOCK = threading.Lock()
+
+# Extended functionality in fetch_json_pageids()
+STREAM_DECODE_CHECK = True
+STREAM_DECODE_CHECK = False
+# If STREAM_DECODE_CHECK is True, pages of pageids and pagesrecent answers are decoded one by one while they are saved,
+# so only one decoded page is in memory, and if answer text is cut, only pages after the cut are requested again
+
+# Extended functionality in remove_duplicated_lines()
+# Lists bigger than this are deduplicated in sorted chunks spilled to disk instead of in memory,
+# it is also the approximate memory ceiling for one chunk
+SETTING_DEDUP_MAX_MBYTES = 256
+# Rows written to list file at once during merge of chunks
+SETTING_DEDUP_WRITE_ROWS = 10000
+BYTES_IN_MB = 1024 * 1024
+
+# Extended functionality in read_config() and merge_recentchanges_rows()
+RC_WATERMARK_CHECK = True
+RC_WATERMARK_CHECK = False
+# If RC_WATERMARK_CHECK is True, recentchanges starts from the newest change of last successful run,
+# saved in data/lists/recentchanges-watermark.json, BACK_IN_TIME_DAYS is used only for the first run
+# Bytes read from the end of recentchanges.csv to find rows with watermark timestamp
+SETTING_RC_TAIL_BLOCK_BYTES = 64 * 1024
+
+# Extended functionality in read_config(), save_data_list() and export_catalog_list()
+CATALOG_CHECK = True
+CATALOG_CHECK = False
+# If CATALOG_CHECK is True, pages, recent changes, missing items and blocked entries are kept in data/lists/catalog.sqlite,
+# rows are upserted instead of appended and deduplicated, CSV lists are exported from it at the end of run,
+# pageids, history, pagesrecent and savefiles read their IDs from it, CSV lists are read while it has no rows
+# Rows of complete run replace rows of older runs, so pages removed from wiki are removed from list too
+CATALOG_RUN = f"{TIME_NOW.strftime('%Y-%m-%dT%H:%M:%SZ')}-{os.getpid()}"
+CATALOG: MwCatalog.Catalog | None = None
+
+# Extended functionality in read_config() and prepare_incremental_pageids()
+INCREMENTAL_CHECK = True
+INCREMENTAL_CHECK = False
+# If INCREMENTAL_CHECK is True, pageids keeps namespace folders and downloads only pages
+# with a latest revision different from the manifest in data/lists/manifest/<ns>.json
+# First run without manifest downloads every page once to build it
+
+# Extended functionality in save_page_text()
+PACKED_STORE_CHECK = True
+PACKED_STORE_CHECK = False
+# If PACKED_STORE_CHECK is True, pageids and pagesrecent write pages into append-only segment files
+# in data/raw/packed/<ns>/ instead of one file per page, see storage.py for export to files
+PACKED_FOLDER_CLASSES = {
+    FOLDER_RAW_PAGES: "pages",
+    FOLDER_RAW_REDIRECT: "redirect",
+    FOLDER_RAW_REMOVED: "removed",
+}
+PACKED_STORES: dict[int, MwStorage.PackedStore] = {}
+FOLDERS_BY_CLASS = {value: key for key, value in PACKED_FOLDER_CLASSES.items()}
+
+# Extended functionality in save_page_text()
+COLUMNAR_CHECK = True
+COLUMNAR_CHECK = False
+# If COLUMNAR_CHECK is True, full pageids and allcontent runs also write pages of namespace to Parquet files
+# in data/columnar/pages/<folder class>/<ns>, it needs pyarrow; other runs can export them with columnar.py
+COLUMNAR_WRITER: MwColumnar.ColumnarWriter | None = None
+# Compression of page text in files and packed store: "none", "gzip" or "zstd"
+# Compressed page files get .txt.gz or .txt.zst, read them back with MwStorage.iter_page_records()
+SETTING_PAGE_COMPRESSION = "none"
+
+# Extended functionality in save_page_text() and loop_next_pages_pipeline()
+WRITER_POOL_CHECK = True
+WRITER_POOL_CHECK = False
+# If WRITER_POOL_CHECK is True, page files are written by background threads from writer.py,
+# parser only queues them and goes on, files are fsynced together before checkpoint and at the end,
+# next batches of pageids and pagesrecent are fetched by another thread while parser works
+PAGE_WRITER: MwWriter.WriterPool | None = None
+# Page files written without writer pool since last checkpoint, they are fsynced before checkpoint moves
+PATHS_UNSYNCED: list[str] = []
+
+# Extended functionality in restructure_json_pageids()
+LOCATION_INDEX_CHECK = True
+LOCATION_INDEX_CHECK = False
+# If LOCATION_INDEX_CHECK is True, pageids and pagesrecent keep namespace and folder of every page
+# in data/lists/page-locations.tsv, missing pages and stale files are found there instead of checking all folders
+# The first run builds it from data/raw once
+PAGE_LOCATIONS: MwLocations.LocationIndex | None = None
+
+# Extended functionality in loop_next_pages_concurrent()
+CONCURRENT_CHECK = True
+CONCURRENT_CHECK = False
+# If CONCURRENT_CHECK is True, pageids and pagesrecent keep several batches in flight
+# Default number of batches in flight for wikis not listed below
+SETTING_CONCURRENT_BATCHES_DEFAULT = 4
+# Per-wiki limit, key is FOLDER_LINK from config file
+SETTING_CONCURRENT_BATCHES_PER_WIKI: dict[str, int] = {}
+
+# Extended functionality in restructure_json_savefiles()
+PARALLEL_DOWNLOAD_CHECK = True
+PARALLEL_DOWNLOAD_CHECK = False
+# If PARALLEL_DOWNLOAD_CHECK is True, images are streamed to disk by background workers
+# while the next batch of titles is queried
+SETTING_DOWNLOAD_WORKERS = 4
+IMAGE_DOWNLOADER: MwDownloader.ImageDownloader | None = None
+MISSING_IMAGE_LOCK = threading.Lock()
+
+# Extended functionality in fetch_data_from_api()
+ASYNC_TRANSPORT_CHECK = True
+ASYNC_TRANSPORT_CHECK = False
+# If ASYNC_TRANSPORT_CHECK is True, all API requests share one pool of keep-alive connections per BASE_URL
+
+# Extended functionality in fetch_data_from_api()
+RESPONSE_CACHE_CHECK = True
+RESPONSE_CACHE_CHECK = False
+# If RESPONSE_CACHE_CHECK is True, decoded API answers are saved gzipped to data/cache, key is BASE_URL with sorted params,
+# the same request in next run is answered from cache while answer is younger than TTL
+SETTING_CACHE_TTL_HOURS = 1
+# Oldest answers are removed at the end of run while cache is larger
+SETTING_CACHE_MAX_MBYTES = 4096
+# If REPLAY_CHECK is True, all answers come from cache without TTL and nothing is sent to the wiki,
+# so changed restructure code can write data/raw and data/lists again, missing answer stops the run
+# Images are not API answers, savefiles replay does not download them
+REPLAY_CHECK = True
+REPLAY_CHECK = False
+RESPONSE_CACHE: MwCache.ResponseCache | None = None
+
+# Extended functionality in fetch_data_from_api()
+RATE_LIMIT_CHECK = True
+RATE_LIMIT_CHECK = False
+# If RATE_LIMIT_CHECK is True, all requests to one host share token bucket from ratelimit.py, it slows down on maxlag errors,
+# 429 / 503 answers and Retry-After headers, and speeds up again while requests succeed
+# Without it requests are not limited, all requests still pause after maxlag error
+# Seconds to pause all requests to the wiki after maxlag error
+SETTING_MAXLAG_WAIT_SECONDS = 5
+# Max repeats of one request rejected with maxlag error
+SETTING_MAXLAG_MAX_REPEATS = 10
+
 LOGGING = False
 LOGGING = True
 
 SAVE_LOG = True
 SAVE_LOG = False
 
+# Metrics of every run are saved to data/logs/<type>-<ns>-metrics.json, these checks add heavy profiling
+# Extended functionality in __main__
+# cProfile of parser thread to data/logs/<type>-<ns>-profile.prof, read it with: python -m pstats <file>
+PROFILE_CHECK = True
+PROFILE_CHECK = False
+# Largest memory users to data/logs/<type>-<ns>-tracemalloc.txt, tracing makes run a few times slower
+TRACEMALLOC_CHECK = True
+TRACEMALLOC_CHECK = False
+
 if SAVE_LOG:
     SETUP_LOGGING_DATA = NewtFiles.setup_logging(DIR_GLOBAL)
 
 
-def check_todo(
-        ) -> list[tuple[str, str, str]]:
-    """ Check for missing log files based on existing config files and return a list of tasks to do. """
-
-    todo_list = []
-    path_config = os.path.join(DIR_PROJECT, "configs")
-    for file in os.listdir(path_config):
-        # Skip if it's not a file (e.g., directory)
-        if not os.path.isfile(os.path.join(path_config, file)):
-            continue
-
-        # Skip specific config example file
-        if file == "xxx.json":
-            continue
-
-        # Skip non-config files
-        if not file.endswith(".json"):
-            NewtCons.error_msg(
-                f"Found non-config file: {file}", stop=False,
-                location="mwparser.check_todo : non-config file"
-            )
-            continue
-
-        # Get settings from config file
-        path_config_file = os.path.join(path_config, file)
-        file_settings = NewtFiles.read_json_from_file(path_config_file)
-        NewtCons.validate_input(
-            file_settings, dict, check_non_empty=True,
-            location="mwparser.check_todo : file_settings"
-        )
-        assert isinstance(file_settings, dict)  # for type checker
-
-        # Check required keys in file_settings
-        NewtUtil.check_dict_keys(
-            file_settings, {"FOLDER_LINK", "BASE_URL"},
-            location="mwparser.check_todo : file_settings"
-        )
-
-        for value in file_settings.values():
-            NewtCons.validate_input(
-                value, str, check_non_empty=True,
-                location="mwparser.check_todo : file_settings[value]"
-            )
-
-        # Check if namespace_types.json exists for the config
-        path_namespace_types = os.path.join(DIR_GLOBAL, file_settings["FOLDER_LINK"], FILE_NAMESPACES)
-        if not os.path.isfile(path_namespace_types):
-            NewtCons.error_msg(
-                f"Missing namespace_types.json for config: {file}",
-                f"File must be here: {path_namespace_types}",
-                location="mwparser.check_todo : namespace_types.json missing"
-            )
-
-        # Get namespace types from file
-        ns_dict = NewtFiles.read_json_from_file(path_namespace_types)
-        NewtCons.validate_input(
-            ns_dict, dict, check_non_empty=True,
-            location="mwparser.check_todo : ns_dict"
-        )
-        assert isinstance(ns_dict, dict)
-
-        # Calculate max key length from namespace types for formatting
-        max_key_len = len(max(ns_dict.keys(), key=len))
-
-        path_logs = os.path.join(DIR_GLOBAL, file_settings["FOLDER_LINK"], FOLDER_LOGS)
-
-        for wiki_data_type in WIKI_DATA_TYPE_DICT.values():
-            if wiki_data_type in ("allpages", "pageids"):
-                for ns_key, ns_value in ns_dict.items():
-                    name_wiki_log_file = f"{wiki_data_type}-{int(ns_key):0{max_key_len}d}.txt"
-                    path_wiki_log_file = os.path.join(path_logs, name_wiki_log_file)
-                    if not os.path.isfile(path_wiki_log_file):
-                        todo_list.append((file, wiki_data_type, ns_key, ns_value))
-            else:
-                name_wiki_log_file = f"{wiki_data_type}.txt"
-                path_wiki_log_file = os.path.join(path_logs, name_wiki_log_file)
-                if not os.path.isfile(path_wiki_log_file):
-                    todo_list.append((file, wiki_data_type, None, None))
-
-    print()
-    if todo_list and LOGGING:
-        print("=== TODO LIST ===")
-        todo_list.reverse()
-        for todo in todo_list:
-            print(todo)
-        print()
-
-    return todo_list
-
-
 def read_config(
         ) -> dict:
     """Read configuration from a selected JSON file."""
@@ -204,6 +303,7 @@ def read_config(
     global wiki_data_type_set
     global namespace_types_set
     global namespace_nr_set
+    global time_end
 
     # Select WIKI Project
     # Settings are at file beginning of script
@@ -265,6 +365,8 @@ def read_config(
     if wiki_data_type_set in (
         "allpages",
         "pageids",
+        "history",
+        "allcontent",
     ):
         if NAMESPACE_NR_CHECK:
             print()
@@ -291,34 +393,57 @@ def read_config(
             settings["file_name"] = os.path.join("allpages", f"{namespace_nr_set:0{settings['ns_max_key_len']}d}.csv")
 
         case "pageids":
-            for folder_type in (FOLDER_RAW_PAGES, FOLDER_RAW_REDIRECT, FOLDER_RAW_REMOVED):
-                folder_to_remove = os.path.join(
-                    DIR_GLOBAL, settings["FOLDER_LINK"], folder_type,
-                    str(namespace_nr_set).zfill(settings["ns_max_key_len"])
-                )
-                if os.path.isdir(folder_to_remove):
-                    print(f"Removing folder: {folder_to_remove}")
-                    shutil.rmtree(folder_to_remove)
+            # Incremental mode updates files in place, see prepare_incremental_pageids()
+            # Resumed run keeps pages of batches written before, see load_checkpoint()
+            path_checkpoint = get_path_checkpoint(settings)
+            if not INCREMENTAL_CHECK and not (RESUME_CHECK and os.path.isfile(path_checkpoint)):
+                remove_namespace_folders(settings)
 
             settings["index_start"] = SETTING_INDEX_START_DEFAULT
-            path_allpages = os.path.join(
-                DIR_GLOBAL, settings["FOLDER_LINK"], FOLDER_LISTS,
-                "allpages", f"{namespace_nr_set:0{settings['ns_max_key_len']}d}.csv"
-            )
-            list_allpages = NewtFiles.read_csv_from_file(path_allpages)
+            settings["page_ids"] = read_allpages_page_ids(settings)
 
-            NewtCons.validate_input(
-                list_allpages, list, check_non_empty=True,
-                location="mwparser.read_config : list_allpages"
-            )
-            assert isinstance(list_allpages, list)  # for type checker
+        case "allcontent":
+            # The same list as allpages writes, page content is written while list is read
+            settings["file_name"] = os.path.join("allpages", f"{namespace_nr_set:0{settings['ns_max_key_len']}d}.csv")
+            # All pages of namespace are written again, there is no manifest or checkpoint for allcontent,
+            # so files of removed pages and old copies of pages moved to redirect would stay otherwise
+            remove_namespace_folders(settings)
 
-            # skip header and get only ids from first column
-            settings["page_ids"] = sorted([int(row[0]) for row in list_allpages[1:]])
+        case "history":
+            # Finished pages are skipped and unfinished ones continue, see save_history_page()
+            settings["page_ids"] = read_allpages_page_ids(settings)
 
         case "recentchanges":
             settings["file_name"] = FILE_RECENTCHANGES
 
+            if RC_WATERMARK_CHECK:
+                settings["rc_newest"] = {"timestamp": time_end, "rcid": 0}
+                path_watermark = os.path.join(DIR_GLOBAL, settings["FOLDER_LINK"], FOLDER_LISTS, FILE_RECENTCHANGES_WATERMARK)
+
+                if os.path.isfile(path_watermark):
+                    watermark = NewtFiles.read_json_from_file(path_watermark)
+                    NewtCons.validate_input(
+                        watermark, dict, check_non_empty=True,
+                        location="mwparser.read_config : watermark"
+                    )
+                    assert isinstance(watermark, dict)  # for type checker
+
+                    NewtUtil.check_dict_keys(
+                        watermark, {"timestamp", "rcid"},
+                        location="mwparser.read_config : watermark"
+                    )
+
+                    # Query only changes after last run, new rows are merged in merge_recentchanges_rows()
+                    time_end = watermark["timestamp"]
+                    settings["rc_watermark"] = watermark
+                    settings["rc_newest"] = dict(watermark)
+                    settings["rc_rows_new"] = []
+                    print(f"Recent changes from watermark: {time_end}, rcid {watermark['rcid']}")
+
+        case "pagesrecent" if CATALOG_CHECK and get_catalog(settings).count_recentchanges() > 0:
+            settings["index_start"] = SETTING_INDEX_START_DEFAULT
+            settings["page_ids"] = get_catalog(settings).get_recent_page_ids()
+
         case "pagesrecent":
             settings["index_start"] = SETTING_INDEX_START_DEFAULT
             path_recentchanges = os.path.join(DIR_GLOBAL, settings["FOLDER_LINK"], FOLDER_LISTS, FILE_RECENTCHANGES)
@@ -333,6 +458,10 @@ def read_config(
             # skip header and get only ids from second column, convert them to int, filter out 0, check unique and sort
             settings["page_ids"] = sorted(list(set([int(row[1]) for row in list_recentchanges[1:] if int(row[1]) > 0])))
 
+        case "savefiles" if CATALOG_CHECK and get_catalog(settings).count_pages(namespace_nr_set) > 0:
+            settings["index_start"] = SETTING_INDEX_START_DEFAULT
+            settings["files_titles"] = get_catalog(settings).get_titles(namespace_nr_set)
+
         case "savefiles":
             settings["index_start"] = SETTING_INDEX_START_DEFAULT
             path_allpages = os.path.join(
@@ -359,6 +488,43 @@ def read_config(
     return settings
 
 
+def get_catalog(
+        settings: dict
+        ) -> MwCatalog.Catalog:
+    """Open catalog of wiki once, read_config() uses it before SETTINGS is set."""
+
+    global CATALOG
+
+    if CATALOG is None:
+        CATALOG = MwCatalog.Catalog(os.path.join(DIR_GLOBAL, settings["FOLDER_LINK"], FOLDER_LISTS, MwCatalog.FILE_CATALOG))
+
+    return CATALOG
+
+
+def read_allpages_page_ids(
+        settings: dict
+        ) -> list[int]:
+    """Return sorted page IDs of namespace from catalog, or from allpages CSV list if catalog has none."""
+
+    if CATALOG_CHECK and get_catalog(settings).count_pages(namespace_nr_set) > 0:
+        return get_catalog(settings).get_page_ids(namespace_nr_set)
+
+    path_allpages = os.path.join(
+        DIR_GLOBAL, settings["FOLDER_LINK"], FOLDER_LISTS,
+        "allpages", f"{namespace_nr_set:0{settings['ns_max_key_len']}d}.csv"
+    )
+    list_allpages = NewtFiles.read_csv_from_file(path_allpages)
+
+    NewtCons.validate_input(
+        list_allpages, list, check_non_empty=True,
+        location="mwparser.read_allpages_page_ids : list_allpages"
+    )
+    assert isinstance(list_allpages, list)  # for type checker
+
+    # skip header and get only ids from first column
+    return sorted([int(row[0]) for row in list_allpages[1:]])
+
+
 def prep_headers_params_for_url(
         ) -> tuple:
     """Set headers and parameters for the URL request based on settings."""
@@ -368,18 +534,8 @@ def prep_headers_params_for_url(
     global wiki_data_type_set
     global namespace_nr_set
 
-    headers = {
-        "User-Agent": "MyGuildWarsBot/1.2 (burova.anna+parser+bot@gmail.com)",
-        "Accept-Encoding": "gzip",
-    }
-
-    params = {
-        "action": "query",
-        "format": "json",
-        "maxlag": "2",
-        "utf8": "true",
-        "formatversion": "2",
-    }
+    headers = MwWikiApi.get_headers()
+    params = dict(MwWikiApi.PARAMS_QUERY)
 
     match wiki_data_type_set:
         case "allpages":
@@ -388,9 +544,7 @@ def prep_headers_params_for_url(
             params.update({"apnamespace": str(namespace_nr_set)})
 
         case "pageids" | "pagesrecent":
-            params.update({"prop": "revisions"})
-            params.update({"rvprop": "content"})
-            params.update({"rvslots": "*"})
+            params.update(MwWikiApi.PARAMS_PAGES_CONTENT)
 
         case "recentchanges":
             params.update({"list": "recentchanges"})
@@ -404,6 +558,21 @@ def prep_headers_params_for_url(
             params.update({"prop": "imageinfo"})
             params.update({"iiprop": "url"})
 
+        case "history":
+            # Oldest revision first, so every answer is appended to the end of page file
+            params.update({"prop": "revisions"})
+            params.update({"rvprop": "ids|timestamp|user|sha1|content"})
+            params.update({"rvslots": "main"})
+            params.update({"rvlimit": "max"})
+            params.update({"rvdir": "newer"})
+
+        case "allcontent":
+            # List of namespace and content of its pages come in one continuation stream
+            params.update({"generator": "allpages"})
+            params.update({"gapnamespace": str(namespace_nr_set)})
+            params.update({"gaplimit": str(SETTING_INDEX_MAX_PAGES)})
+            params.update(MwWikiApi.PARAMS_PAGES_CONTENT)
+
         case _:
             NewtCons.error_msg(
                 f"Unexpected config type: {wiki_data_type_set}",
@@ -417,312 +586,1134 @@ def prep_headers_params_for_url(
     return (headers, params)
 
 
-def get_blocked_set(
-        ) -> set[str]:
-    """Read blocked list from file and return as a set."""
+def get_blocked_store(
+        ) -> MwBlocklist.BlockedStore:
+    """Read blocked titles and page IDs from file, new entries are added to store during run."""
 
-    blocked_set = set()
     path_file_blocked = os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_LISTS, FILE_BLOCKED)
-    blocked_list = NewtFiles.read_text_from_file(path_file_blocked)
+    blocked_store = MwBlocklist.BlockedStore(path_file_blocked)
     print()
 
-    if blocked_list:
-        for line in blocked_list.splitlines():
-            line = line.strip()
-            if line:
-                blocked_set.add(line)
-
-    return blocked_set
-
+    return blocked_store
 
-def get_json_from_url(
-        continue_page_wiki: str | None = None,
-        continue_page_backup: str | None = None
-        ) -> dict:
-    """Fetch JSON data from a URL based on settings and save to file."""
-
-    global wiki_data_type_set
-    global namespace_types_set
 
-    path_file_blocked = os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_LISTS, FILE_BLOCKED)
-    continue_page_for_block = None
+def get_response_cache(
+        ) -> MwCache.ResponseCache:
+    """Open response cache of wiki, replay reads all answers without TTL."""
 
-    headers, params = headers_params_for_url
+    global time_start
+    global time_end
 
-    match wiki_data_type_set:
-        case "allpages":
-            if continue_page_wiki is not None:
-                # continue_page_wiki - current page title from wiki
-                # continue_page_backup - previous page title from wiki, we saved in case current page is blocked
-                # continue_page_for_block - what we will block incase no result
-                continue_page_wiki = continue_page_wiki.replace(" ", "_")
-                continue_page_for_block = continue_page_wiki
-                if continue_page_wiki in BLOCKED_SET and continue_page_backup is not None:
-                    print(continue_page_wiki)
-                    continue_page_wiki = continue_page_backup.replace(" ", "_")
-                    continue_page_for_block = continue_page_wiki
+    response_cache = MwCache.ResponseCache(
+        os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_CACHE),
+        ttl_seconds=None if REPLAY_CHECK else SETTING_CACHE_TTL_HOURS * 3600,
+        max_bytes=SETTING_CACHE_MAX_MBYTES * 1024 * 1024
+    )
 
-                print(continue_page_wiki)
-                # Only without left and sep parts it will work in continue
-                left_part, sep_part, right_part = continue_page_wiki.partition(":")
-                if sep_part and left_part in set(namespace_types_set.values()):
-                    continue_page_wiki = right_part
+    # Time range of recent changes depends on time of run, replay asks for the range of the run that filled cache
+    if wiki_data_type_set == "recentchanges":
+        if not REPLAY_CHECK:
+            response_cache.save_state("recentchanges", {"rcstart": time_start, "rcend": time_end})
 
-                params.update({"apcontinue": continue_page_wiki})
+        else:
+            time_range = response_cache.load_state("recentchanges")
+            if time_range is None:
+                NewtCons.error_msg(
+                    "No recent changes in cache to replay",
+                    location="mwparser.get_response_cache : time_range=None"
+                )
+            assert isinstance(time_range, dict)  # for type checker
 
-        case "pageids" | "pagesrecent":
-            if len(SETTINGS["page_ids"]) == 0:
-                print()
-                print("No pages to process. Empty list.")
-                return {}
+            NewtUtil.check_dict_keys(
+                time_range, {"rcstart", "rcend"},
+                location="mwparser.get_response_cache : time_range"
+            )
+            time_start = time_range["rcstart"]
+            time_end = time_range["rcend"]
+            # Replay writes the whole list of range again and does not move watermark
+            for key in ("rc_watermark", "rc_newest", "rc_rows_new"):
+                SETTINGS.pop(key, None)
 
-            index_start = SETTINGS["index_start"]
-            index_max = SETTING_INDEX_MAX_PAGES
-            index_end = index_start + index_max
+    print(f"Response cache: {response_cache.path_folder}, replay: {REPLAY_CHECK}")
+    return response_cache
 
-            if len(SETTINGS["page_ids"]) < index_start:
-                print()
-                print("No more pages to process.")
-                return {}
 
-            params.update({"pageids": "|".join(
-                map(str, SETTINGS["page_ids"][index_start:index_end])
-            )})
-            SETTINGS["index_start"] = index_end
+def get_page_locations(
+        ) -> MwLocations.LocationIndex:
+    """Read page locations of wiki, build them from page folders if file does not exist yet."""
 
-            print()
-            print(f"Processing page IDs from index {index_start} to {index_end}")
-            print(f"Progress max index: {len(SETTINGS['page_ids'])}")
-            print(f"Processing current page: {index_start / index_max}")
-            print(f"Progress max pages: {len(SETTINGS['page_ids']) / index_max}")
-            print()
+    page_locations = MwLocations.LocationIndex(
+        os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"]),
+        os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_LISTS, MwLocations.FILE_LOCATIONS)
+    )
+    # Folders were removed in read_config() before index was read
+    if SETTINGS.get("namespace_rewritten"):
+        remove_namespace_locations(page_locations)
+    print()
 
-        case "recentchanges":
-            if continue_page_wiki is not None:
-                print(continue_page_wiki)
-                params.update({"rccontinue": continue_page_wiki})
+    return page_locations
 
-        case "savefiles":
-            if len(SETTINGS["files_titles"]) == 0:
-                print()
-                print("No images to process. Empty list.")
-                return {}
 
-            index_start = SETTINGS["index_start"]
-            index_max = SETTING_INDEX_MAX_TITLES
-            index_end = index_start + index_max
+def remove_namespace_locations(
+        page_locations: MwLocations.LocationIndex
+        ) -> None:
+    """Remove pages of removed namespace folders from index.
 
-            if len(SETTINGS["files_titles"]) < index_start:
-                print()
-                print("No more images to process.")
-                return {}
+    Missing page files are kept in removed folder as <ns>-<pageid>.txt, in packed store they go with namespace folder.
+    """
 
-            params.update({"titles": "|".join(
-                map(str, SETTINGS["files_titles"][index_start:index_end])
-            )})
-            SETTINGS["index_start"] = index_end
+    folder_classes = tuple(PACKED_FOLDER_CLASSES.values())
+    if PACKED_STORE_CHECK:
+        folder_classes += ("missing",)
 
-            print()
-            print(f"Processing images IDs from index {index_start} to {index_end}")
-            print(f"Progress max index: {len(SETTINGS['files_titles'])}")
-            print(f"Processing current images: {index_start / index_max}")
-            print(f"Progress max pages: {len(SETTINGS['files_titles']) / index_max}")
-            print()
+    count_removed = page_locations.delete_namespace(namespace_nr_set, folder_classes)
+    page_locations.flush()
+    print(f"Page locations removed with namespace folders: {count_removed}")
 
-        case _:
-            NewtCons.error_msg(
-                f"Unexpected config type: {wiki_data_type_set}",
-                location="mwparser.get_json_from_url : wiki_data_type_set default case"
-            )
 
-    data_from_url = NewtNet.fetch_data_from_url(
-        SETTINGS["BASE_URL"], params, headers,
-        mode="auto", logging=LOGGING
-    )
-    print()
+def remove_namespace_folders(
+        settings: dict
+        ) -> None:
+    """Remove page folders of namespace before full pageids run."""
 
-    # None data mostly comes from 403 Forbidden error, so we save continue_page_for_block to blocked list and skip it next time
-    if not data_from_url:
-        if continue_page_for_block is not None:
-            NewtFiles.save_text_to_file(
-                path_file_blocked,
-                continue_page_for_block,
-                append=True
-            )
+    settings["namespace_rewritten"] = True
 
-        NewtCons.error_msg(
-            "Failed to read JSON result, exiting",
-            location="mwparser.get_json_from_url : data_from_url=False"
+    for folder_type in (FOLDER_RAW_PAGES, FOLDER_RAW_REDIRECT, FOLDER_RAW_REMOVED, FOLDER_RAW_PACKED):
+        folder_to_remove = os.path.join(
+            DIR_GLOBAL, settings["FOLDER_LINK"], folder_type,
+            str(namespace_nr_set).zfill(settings["ns_max_key_len"])
         )
+        if os.path.isdir(folder_to_remove):
+            print(f"Removing folder: {folder_to_remove}")
+            shutil.rmtree(folder_to_remove)
 
-    # Ensure return value is a dict
-    NewtCons.validate_input(
-        data_from_url, str, check_non_empty=True,
-        location="mwparser.get_json_from_url : data_from_url"
-    )
-    assert isinstance(data_from_url, str)  # for type checker
-
-    json_from_url = NewtFiles.convert_str_to_json(data_from_url)
-
-    if json_from_url is None:
-        # If text is too long, it may be incomplete,
-        # so we need to try to split request into pieces, if possible, to be sure it will return all data
-        data_from_url_chunks = {"batchcomplete": True, "query": {"pages": []}}
-
-        if wiki_data_type_set in (
-                "pageids",
-                "pagesrecent",
-                ):
-            for index_range in range(index_start, index_end):
-                if len(SETTINGS["page_ids"]) <= index_range:
-                    break
+    if PAGE_LOCATIONS is not None:
+        remove_namespace_locations(PAGE_LOCATIONS)
 
-                params.update({"pageids": str(SETTINGS["page_ids"][index_range])})
 
-                data_from_url_small = NewtNet.fetch_data_from_url(
-                    SETTINGS["BASE_URL"], params, headers,
-                    mode="auto", logging=LOGGING
-                )
-                print()
+def get_path_checkpoint(
+        settings: dict
+        ) -> str:
+    return os.path.join(
+        DIR_GLOBAL, settings["FOLDER_LINK"], FOLDER_CHECKPOINTS,
+        f"{wiki_data_type_set}-{namespace_nr_set:0{settings['ns_max_key_len']}d}.json"
+    )
 
-                # None data mostly comes from 403 Forbidden error, so we need to catch page id and add it to blocked list to skip it next time
-                if not data_from_url_small:
-                    NewtFiles.save_text_to_file(
-                        path_file_blocked,
-                        f"---> Page ID: {SETTINGS['page_ids'][index_range]}",
-                        append=True
-                    )
-                    NewtCons.error_msg(
-                        "Failed to read small JSON result, exiting",
-                        f"Page ID: {SETTINGS['page_ids'][index_range]}",
-                        location="mwparser.get_json_from_url : data_from_url_small=False"
-                    )
 
-                # Ensure return value is a dict
-                NewtCons.validate_input(
-                    data_from_url_small, str, check_non_empty=True,
-                    location="mwparser.get_json_from_url : data_from_url_small"
-                )
-                assert isinstance(data_from_url_small, str)  # for type checker
+def load_checkpoint(
+        ) -> None:
+    """Continue from index of last written batch if list of IDs did not change since checkpoint."""
 
-                json_from_url_small = NewtFiles.convert_str_to_json(data_from_url_small)
+    list_key = "files_titles" if wiki_data_type_set == "savefiles" else "page_ids"
+    list_hash = hashlib.sha256("\n".join(map(str, SETTINGS[list_key])).encode("utf-8")).hexdigest()
 
-                if not NewtCons.validate_input(
-                    json_from_url_small, dict, check_non_empty=True, stop=False,
-                    location="mwparser.get_json_from_url : json_from_url_small != dict"
-                ):
-                    continue
-                assert isinstance(json_from_url_small, dict)  # for type checker
+    path_checkpoint = get_path_checkpoint(SETTINGS)
+    checkpoint = {
+        "index_start": SETTINGS["index_start"],
+        "list_hash": list_hash,
+        "list_length": len(SETTINGS[list_key]),
+    }
 
-                NewtUtil.check_dict_keys(
-                    json_from_url_small, {"query", "batchcomplete"},
-                    location="mwparser.get_json_from_url : json_from_url_small"
-                )
+    if os.path.isfile(path_checkpoint):
+        checkpoint_data = NewtFiles.read_json_from_file(path_checkpoint)
+        NewtCons.validate_input(
+            checkpoint_data, dict, check_non_empty=True,
+            location="mwparser.load_checkpoint : checkpoint_data"
+        )
+        assert isinstance(checkpoint_data, dict)  # for type checker
 
-                NewtUtil.check_dict_keys(
-                    json_from_url_small["query"], {"pages"},
-                    location="mwparser.get_json_from_url : json_from_url_small[query]"
-                )
+        NewtUtil.check_dict_keys(
+            checkpoint_data, {"index_start", "list_hash", "list_length"},
+            location="mwparser.load_checkpoint : checkpoint_data"
+        )
 
-                data_from_url_chunks["query"]["pages"].extend(
-                    json_from_url_small.get("query", {}).get("pages", [])
-                )
+        if checkpoint_data["list_hash"] == list_hash:
+            SETTINGS["index_start"] = checkpoint["index_start"] = checkpoint_data["index_start"]
+            print(f"Resume from checkpoint: index {SETTINGS['index_start']} of {checkpoint['list_length']}")
         else:
             NewtCons.error_msg(
-                "Failed to read JSON result, exiting",
-                location="mwparser.get_json_from_url : json_from_url=False and not pageids"
+                "List of IDs changed since checkpoint, starting from the beginning",
+                f"Checkpoint: {path_checkpoint}",
+                location="mwparser.load_checkpoint : list_hash",
+                stop=False
             )
+            # Folders were kept for resume in read_config()
+            if wiki_data_type_set == "pageids" and not INCREMENTAL_CHECK:
+                remove_namespace_folders(SETTINGS)
 
-        json_from_url = data_from_url_chunks
+    SETTINGS["checkpoint"] = checkpoint
+    SETTINGS["path_checkpoint"] = path_checkpoint
+    # End index of every batch taken from list, in the same order as batches are written
+    SETTINGS["index_pending"] = deque()
 
-    NewtCons.validate_input(
-        json_from_url, dict, check_non_empty=True,
-        location="mwparser.get_json_from_url : json_from_url"
-    )
-    assert isinstance(json_from_url, dict)  # for type checker
 
-    return json_from_url
+def save_checkpoint(
+        ) -> None:
+    """Save end index of the oldest batch, call it only after the batch is written."""
 
+    if "checkpoint" not in SETTINGS or not SETTINGS["index_pending"]:
+        return
 
-def restructure_json_allpages(
-        json_data_dict: dict
-        ) -> tuple[list[str], str]:
-    """Process and save all pages from JSON data."""
+    # Images of batch can still be in download queue
+    if IMAGE_DOWNLOADER is not None:
+        IMAGE_DOWNLOADER.wait()
 
-    global namespace_nr_set
+    # Pages of batch can still be in writer queue
+    if PAGE_WRITER is not None:
+        PAGE_WRITER.barrier()
 
-    if "continue" in json_data_dict:
-        NewtUtil.check_dict_keys(
-            json_data_dict, {"query", "batchcomplete", "limits", "continue"},
-            location="mwparser.restructure_json_allpages : json_data_dict"
-        )
+    # Pages written in this thread are only in page cache of system yet
+    MwWriter.fsync_files(PATHS_UNSYNCED)
+    PATHS_UNSYNCED.clear()
 
-    else:
-        NewtUtil.check_dict_keys(
-            json_data_dict, {"query", "batchcomplete", "limits"},
-            location="mwparser.restructure_json_allpages : json_data_dict"
-        )
+    SETTINGS["checkpoint"]["index_start"] = SETTINGS["index_pending"].popleft()
+    save_json_to_file_atomic(SETTINGS["path_checkpoint"], SETTINGS["checkpoint"])
 
-    NewtUtil.check_dict_keys(
-        json_data_dict["query"], {"allpages"},
-        location="mwparser.restructure_json_allpages : json_data_dict[query]"
-    )
 
-    continue_page_backup = ""
-    allpages_list = []
-    allpages_list.append(["pageid", "title"])
-    for page in json_data_dict["query"]["allpages"]:
-        NewtUtil.check_dict_keys(
-            page, {"pageid", "ns", "title"},
-            location="mwparser.restructure_json_allpages : page"
-        )
+def remove_checkpoint(
+        ) -> None:
+    """Remove checkpoint after the last batch, so the next run starts from the beginning."""
 
-        if int(page["ns"]) != namespace_nr_set:
-            NewtCons.error_msg(
-                f"Unexpected namespace value: {page['ns']} for page ID {page['pageid']}",
-                f"Page: {page}",
-                location="mwparser.restructure_json_allpages : page[ns]"
-            )
+    if "checkpoint" not in SETTINGS:
+        return
 
-        if page["title"].replace(" ", "_") not in BLOCKED_SET:
-            continue_page_backup = page["title"].replace(" ", "_")
+    if SETTINGS["checkpoint"]["index_start"] < SETTINGS["checkpoint"]["list_length"]:
+        print(f"Checkpoint kept for resume: {SETTINGS['path_checkpoint']}")
+        return
 
-        if page["title"].replace(" ", "_") in BLOCKED_SET:
-            continue
+    if os.path.isfile(SETTINGS["path_checkpoint"]):
+        os.remove(SETTINGS["path_checkpoint"])
 
-        allpages_list.append([
-            f"{page['pageid']:010d}",
-            page["title"],
-        ])
 
-    return (allpages_list, continue_page_backup)
+def decode_json(
+        data_from_url: str,
+        params: dict | None = None
+        ) -> dict | list | None:
+    """Decode JSON answer of wiki, None if text is broken.
 
+    With params of request answer is saved to response cache, only after it is decoded without error.
+    """
 
-def restructure_json_pageids(
-        json_data_dict: dict
-        ) -> None:
+    with MwMetrics.timer("decode"):
+        json_from_url = NewtFiles.convert_str_to_json(data_from_url)
 
-    global wiki_data_type_set
-    global namespace_types_set
-    global namespace_nr_set
+    if json_from_url is None:
+        MwMetrics.add("json_broken")
+    elif params is not None and isinstance(json_from_url, dict) and "error" not in json_from_url:
+        save_answer_to_cache(params, data_from_url)
+    return json_from_url
 
-    path_file_blocked = os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_LISTS, FILE_BLOCKED)
-    path_recentchanges_missing = os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_LISTS, "missing-"+FILE_RECENTCHANGES)
 
-    NewtUtil.check_dict_keys(
-        json_data_dict, {"query", "batchcomplete"},
-        location="mwparser.restructure_json_pageids : json_data_dict"
-    )
+def save_answer_to_cache(
+        params: dict,
+        data_from_url: str
+        ) -> None:
+    if RESPONSE_CACHE is not None and not REPLAY_CHECK:
+        RESPONSE_CACHE.put(SETTINGS["BASE_URL"], params, data_from_url)
 
-    NewtUtil.check_dict_keys(
-        json_data_dict["query"], {"pages"},
-        location="mwparser.restructure_json_pageids : json_data_dict[query]"
-    )
 
-    for page in json_data_dict["query"]["pages"]:
-        skip_page = False
+@MwMetrics.timed("fetch")
+def fetch_data_from_api(
+        params: dict,
+        headers: dict,
+        stop_on_replay_miss: bool = True
+        ) -> str | None:
+    """Fetch raw data from the wiki API, all workers share rate limit of the wiki host.
 
-        if "missing" in page:
+    In replay missing answer stops the run, with stop_on_replay_miss=False None is returned, so caller can split request.
+    """
+
+    if RESPONSE_CACHE is not None:
+        data_cached = RESPONSE_CACHE.get(SETTINGS["BASE_URL"], params)
+        if data_cached is not None:
+            MwMetrics.add("cache_hits")
+            return data_cached
+
+        if REPLAY_CHECK:
+            NewtCons.error_msg(
+                "Answer is not in cache, replay stops" if stop_on_replay_miss else "Answer is not in cache, request is split",
+                f"Params: {params}",
+                location="mwparser.fetch_data_from_api : REPLAY_CHECK",
+                stop=stop_on_replay_miss
+            )
+            return None
+
+    limiter = MwRateLimit.get_limiter(SETTINGS["BASE_URL"])
+
+    def fetch_once(
+            ) -> str | None:
+        if ASYNC_TRANSPORT_CHECK:
+            # Transport takes token for every attempt and reads 429 / 503 with Retry-After itself
+            data_from_url = MwTransport.fetch_text(
+                SETTINGS["BASE_URL"], params, headers,
+                logging=LOGGING, limiter=limiter
+            )
+        else:
+            limiter.acquire()
+            data_from_url = NewtNet.fetch_data_from_url(
+                SETTINGS["BASE_URL"], params, headers,
+                mode="auto", logging=LOGGING
+            )
+
+        MwMetrics.add("requests")
+        if not isinstance(data_from_url, str) or not data_from_url:
+            MwMetrics.add("requests_failed")
+        else:
+            MwMetrics.add("bytes_in", len(data_from_url.encode("utf-8")))
+            if MwWikiApi.is_maxlag(MwWikiApi.get_error(data_from_url)):
+                MwMetrics.add("maxlag_repeats")
+        return data_from_url
+
+    # The same loop as crawler.py, answer is saved to cache in decode_json(), text with status 200 can still be cut
+    try:
+        return MwWikiApi.fetch_repeat_on_maxlag(
+            fetch_once, limiter, SETTING_MAXLAG_WAIT_SECONDS, SETTING_MAXLAG_MAX_REPEATS,
+            report_success=not ASYNC_TRANSPORT_CHECK
+        )
+    except RuntimeError as e:
+        NewtCons.error_msg(
+            f"{e}, exiting",
+            location="mwparser.fetch_data_from_api : maxlag"
+        )
+    return None
+
+
+def get_next_page_ids_batch(
+        ) -> list[int]:
+    """Take the next slice of page IDs from settings and move index_start forward."""
+
+    if len(SETTINGS["page_ids"]) == 0:
+        print()
+        print("No pages to process. Empty list.")
+        return []
+
+    index_start = SETTINGS["index_start"]
+    index_max = SETTING_INDEX_MAX_PAGES
+    index_end = index_start + SETTINGS.get("batch_size", index_max)
+
+    if len(SETTINGS["page_ids"]) <= index_start:
+        print()
+        print("No more pages to process.")
+        return []
+
+    SETTINGS["index_start"] = index_end
+    if "index_pending" in SETTINGS:
+        SETTINGS["index_pending"].append(index_end)
+
+    print()
+    print(f"Processing page IDs from index {index_start} to {index_end}")
+    print(f"Progress max index: {len(SETTINGS['page_ids'])}")
+    print(f"Processing current page: {index_start / index_max}")
+    print(f"Progress max pages: {len(SETTINGS['page_ids']) / index_max}")
+    print()
+
+    return SETTINGS["page_ids"][index_start:index_end]
+
+
+def fetch_json_pageids(
+        page_ids_batch: list[int]
+        ) -> dict:
+    """Fetch JSON data for one batch of page IDs, it is safe to call from several threads."""
+
+    # Blocked page IDs are not requested again, also ones blocked earlier in this run
+    page_ids_batch = [page_id for page_id in page_ids_batch if not BLOCKED_STORE.has_page_id(page_id)]
+    if not page_ids_batch:
+        return {"batchcomplete": True, "query": {"pages": []}}
+
+    headers, params_for_url = headers_params_for_url
+    # Every batch gets its own params, shared dict is only a template
+    params = dict(params_for_url)
+    params.update({"pageids": "|".join(map(str, page_ids_batch))})
+
+    time_request = time.monotonic()
+    data_from_url = fetch_data_from_api(params, headers, stop_on_replay_miss=len(page_ids_batch) < 2)
+    time_request = time.monotonic() - time_request
+    print()
+
+    if not data_from_url and REPLAY_CHECK:
+        # Broken answers are not cached, cached run requested this batch again in parts
+        return {"batchcomplete": True, "query": {"pages": fetch_pages_halves(page_ids_batch)}}
+
+    if not data_from_url:
+        NewtCons.error_msg(
+            "Failed to read JSON result, exiting",
+            f"Page IDs: {page_ids_batch[0]} - {page_ids_batch[-1]}",
+            location="mwparser.fetch_json_pageids : data_from_url=False"
+        )
+
+    # Ensure return value is a dict
+    NewtCons.validate_input(
+        data_from_url, str, check_non_empty=True,
+        location="mwparser.fetch_json_pageids : data_from_url"
+    )
+    assert isinstance(data_from_url, str)  # for type checker
+
+    if STREAM_DECODE_CHECK:
+        pages_stream = get_pages_stream(data_from_url)
+        if pages_stream is not None:
+            if ADAPTIVE_BATCH_CHECK:
+                # Cut answer does not end with closed object, the rest is checked only while pages are read
+                update_batch_size(len(page_ids_batch), len(data_from_url), time_request, not data_from_url.rstrip().endswith("}"))
+            return {"batchcomplete": True, "query": {"pages": iter_pages_stream(pages_stream, page_ids_batch, params)}}
+
+    json_from_url = decode_json(data_from_url, params)
+
+    if ADAPTIVE_BATCH_CHECK:
+        update_batch_size(len(page_ids_batch), len(data_from_url), time_request, json_from_url is None)
+
+    if json_from_url is None:
+        json_from_url = {"batchcomplete": True, "query": {"pages": fetch_pages_halves(page_ids_batch)}}
+
+    NewtCons.validate_input(
+        json_from_url, dict, check_non_empty=True,
+        location="mwparser.fetch_json_pageids : json_from_url"
+    )
+    assert isinstance(json_from_url, dict)  # for type checker
+
+    return json_from_url
+
+
+def get_pages_stream(
+        data_from_url: str
+        ) -> MwJsonStream.PagesStream | None:
+    """Return pages stream of answer, None if answer has other keys or broken beginning, then it is decoded whole."""
+
+    try:
+        pages_stream = MwJsonStream.PagesStream(data_from_url)
+    except ValueError:
+        return None
+
+    # Keys after pages list are checked when it is read to the end, see iter_pages_stream()
+    envelope_head = dict(pages_stream.envelope)
+    if envelope_head.pop("query", None) != {"pages": []} or envelope_head not in ({}, {"batchcomplete": True}):
+        return None
+
+    return pages_stream
+
+
+def iter_pages_stream(
+        pages_stream: MwJsonStream.PagesStream,
+        page_ids_batch: list[int],
+        params: dict
+        ) -> Iterator[dict]:
+    """Yield pages of answer, pages after the cut of answer text are requested again in parts."""
+
+    yield from pages_stream
+
+    if pages_stream.complete:
+        # The same keys as restructure_json_pageids() checks in answer decoded whole
+        NewtUtil.check_dict_keys(
+            pages_stream.envelope, MwWikiApi.KEYS_PAGES_ANSWER,
+            location="mwparser.iter_pages_stream : pages_stream.envelope"
+        )
+        NewtUtil.check_dict_keys(
+            pages_stream.envelope["query"], {"pages"},
+            location="mwparser.iter_pages_stream : pages_stream.envelope[query]"
+        )
+        save_answer_to_cache(params, pages_stream.text)
+        return
+
+    MwMetrics.add("json_broken")
+
+    if RESPONSE_CACHE is not None:
+        # Replay does not know where answer was cut, so cached run requests the same halves as without stream
+        print(f"Answer is cut after {len(pages_stream.page_ids_seen)} pages, request again in halves: {len(page_ids_batch)}")
+        for page in fetch_pages_halves(page_ids_batch):
+            if page.get("pageid") not in pages_stream.page_ids_seen:
+                yield page
+        return
+
+    page_ids_left = [page_id for page_id in page_ids_batch if page_id not in pages_stream.page_ids_seen]
+    print(f"Answer is cut after {len(pages_stream.page_ids_seen)} pages, request again: {len(page_ids_left)}")
+
+    if page_ids_left:
+        yield from fetch_pages_bisect(page_ids_left)
+
+
+def fetch_pages_halves(
+        page_ids_batch: list[int]
+        ) -> list[dict]:
+    """Fetch pages of batch with broken answer in two halves, split again only the half that is still broken."""
+
+    index_middle = len(page_ids_batch) // 2
+    pages_from_parts = []
+    for page_ids_part in (page_ids_batch[:index_middle], page_ids_batch[index_middle:]):
+        if page_ids_part:
+            pages_from_parts.extend(fetch_pages_bisect(page_ids_part))
+    return pages_from_parts
+
+
+def fetch_pages_bisect(
+        page_ids_part: list[int]
+        ) -> list[dict]:
+    """Fetch pages of one part of broken batch, split it in two again if its JSON is broken too."""
+
+    return MwWikiApi.fetch_bisect(page_ids_part, fetch_pages_part)
+
+
+def fetch_pages_part(
+        page_ids_part: list[int]
+        ) -> list[dict] | None:
+    """Fetch pages of one part, None if part has several pages and must be split."""
+
+    headers, params_for_url = headers_params_for_url
+    params = dict(params_for_url)
+    params.update({"pageids": "|".join(map(str, page_ids_part))})
+
+    data_from_url_small = fetch_data_from_api(params, headers, stop_on_replay_miss=len(page_ids_part) < 2)
+    print()
+
+    if not data_from_url_small:
+        # Only one page of part can be forbidden, so find it
+        if len(page_ids_part) > 1:
+            return None
+
+        # None data mostly comes from 403 Forbidden error, so we need to catch page id and add it to blocked list to skip it
+        # Page ID that was blocked before and fails again means the wiki is not reachable
+        if BLOCKED_STORE.add_page_id(page_ids_part[0]):
+            NewtCons.error_msg(
+                f"Page ID {page_ids_part[0]} is blocked and skipped",
+                location="mwparser.fetch_pages_part : data_from_url_small=False",
+                stop=False
+            )
+            return []
+
+        NewtCons.error_msg(
+            "Failed to read small JSON result, exiting",
+            f"Page ID: {page_ids_part[0]}",
+            location="mwparser.fetch_pages_part : data_from_url_small=False"
+        )
+
+    # Ensure return value is a dict
+    NewtCons.validate_input(
+        data_from_url_small, str, check_non_empty=True,
+        location="mwparser.fetch_pages_part : data_from_url_small"
+    )
+    assert isinstance(data_from_url_small, str)  # for type checker
+
+    json_from_url_small = decode_json(data_from_url_small, params)
+
+    if json_from_url_small is None and len(page_ids_part) > 1:
+        return None
+
+    if not NewtCons.validate_input(
+        json_from_url_small, dict, check_non_empty=True, stop=False,
+        location="mwparser.fetch_pages_part : json_from_url_small != dict"
+    ):
+        return []
+    assert isinstance(json_from_url_small, dict)  # for type checker
+
+    NewtUtil.check_dict_keys(
+        json_from_url_small, MwWikiApi.KEYS_PAGES_ANSWER,
+        location="mwparser.fetch_pages_part : json_from_url_small"
+    )
+
+    NewtUtil.check_dict_keys(
+        json_from_url_small["query"], {"pages"},
+        location="mwparser.fetch_pages_part : json_from_url_small[query]"
+    )
+
+    return json_from_url_small.get("query", {}).get("pages", [])
+
+
+def get_batch_sizes_key(
+        ) -> str:
+    if wiki_data_type_set == "pagesrecent":
+        return wiki_data_type_set
+    return f"{namespace_nr_set:0{SETTINGS['ns_max_key_len']}d}"
+
+
+def load_batch_size(
+        ) -> None:
+    """Set batch size learned in earlier runs for namespace, or the max size for the first run."""
+
+    path_batch_sizes = os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_LISTS, FILE_BATCH_SIZES)
+    SETTINGS["path_batch_sizes"] = path_batch_sizes
+
+    batch_sizes: dict[str, int] = {}
+    if os.path.isfile(path_batch_sizes):
+        batch_sizes_data = NewtFiles.read_json_from_file(path_batch_sizes)
+        NewtCons.validate_input(
+            batch_sizes_data, dict,
+            location="mwparser.load_batch_size : batch_sizes_data"
+        )
+        assert isinstance(batch_sizes_data, dict)  # for type checker
+        batch_sizes = batch_sizes_data
+
+    SETTINGS["batch_sizes"] = batch_sizes
+    SETTINGS["batch_size"] = min(
+        max(1, int(batch_sizes.get(get_batch_sizes_key(), SETTING_INDEX_MAX_PAGES))),
+        SETTING_INDEX_MAX_PAGES
+    )
+    # Cached answers are found by page IDs of batch, so replay finds them only if cache run sent the same batches
+    SETTINGS["batch_size_frozen"] = RESPONSE_CACHE is not None
+    print(f"Batch size: {SETTINGS['batch_size']} page IDs, frozen: {SETTINGS['batch_size_frozen']}")
+
+
+def update_batch_size(
+        count_pages: int,
+        count_chars: int,
+        time_request: float,
+        is_broken: bool
+        ) -> None:
+    """Learn batch size from one response, it is called from several threads."""
+
+    if SETTINGS["batch_size_frozen"]:
+        return
+
+    with BATCH_SIZE_LOCK:
+        batch_size = SETTINGS["batch_size"]
+
+        if is_broken:
+            batch_size = min(batch_size, max(1, count_pages // 2))
+
+        else:
+            ratio = max(
+                count_chars / (SETTING_BATCH_TARGET_MBYTES * BYTES_IN_MB),
+                time_request / SETTING_BATCH_TARGET_SECONDS
+            )
+            if ratio > 1:
+                batch_size = min(batch_size, max(1, int(count_pages / ratio)))
+            # Short last batch of list says nothing about bigger batches
+            elif count_pages >= batch_size:
+                batch_size = min(SETTING_INDEX_MAX_PAGES, batch_size * 2)
+
+        if batch_size != SETTINGS["batch_size"]:
+            print(f"Batch size changed: {SETTINGS['batch_size']} -> {batch_size} page IDs")
+            SETTINGS["batch_size"] = batch_size
+
+
+def save_json_to_file_atomic(
+        path_file: str,
+        data: dict | list
+        ) -> None:
+    """Save JSON to temporary file and replace target, so target is never half-written."""
+
+    NewtFiles.ensure_dir_exists(path_file)
+    path_file_tmp = path_file + ".tmp"
+    with open(path_file_tmp, "w", encoding="utf-8") as file_tmp:
+        json.dump(data, file_tmp, ensure_ascii=False, separators=(",", ":"))
+        file_tmp.flush()
+        os.fsync(file_tmp.fileno())
+    os.replace(path_file_tmp, path_file)
+
+
+def get_path_page_file(
+        folder_pages: str,
+        namespace_nr: int,
+        page_id: int,
+        codec: str = SETTING_PAGE_COMPRESSION
+        ) -> str:
+    """Return path of page file in pages, redirect or removed folder."""
+
+    return os.path.join(
+        DIR_GLOBAL, SETTINGS["FOLDER_LINK"], folder_pages,
+        f"{namespace_nr:0{SETTINGS['ns_max_key_len']}d}",
+        f"{page_id:010d}.txt{MwStorage.CODEC_EXTENSIONS[codec]}"
+    )
+
+
+def get_packed_store(
+        namespace_nr: int
+        ) -> MwStorage.PackedStore:
+    """Return packed store of namespace, open it on first use."""
+
+    if namespace_nr not in PACKED_STORES:
+        PACKED_STORES[namespace_nr] = MwStorage.PackedStore(os.path.join(
+            DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_RAW_PACKED,
+            f"{namespace_nr:0{SETTINGS['ns_max_key_len']}d}"
+        ))
+
+    return PACKED_STORES[namespace_nr]
+
+
+@MwMetrics.timed("save_page")
+def save_page_text(
+        folder_pages: str,
+        page_id: int,
+        text_for_file: str
+        ) -> None:
+    """Save page text to its own file or to packed store of namespace."""
+
+    MwMetrics.add("pages_saved")
+    MwMetrics.add("bytes_out", len(text_for_file.encode("utf-8")))
+
+    if COLUMNAR_WRITER is not None:
+        COLUMNAR_WRITER.add_page(
+            f"{namespace_nr_set:0{SETTINGS['ns_max_key_len']}d}", page_id, PACKED_FOLDER_CLASSES[folder_pages], text_for_file
+        )
+
+    if PAGE_LOCATIONS is not None:
+        PAGE_LOCATIONS.set(page_id, namespace_nr_set, PACKED_FOLDER_CLASSES[folder_pages], SETTING_PAGE_COMPRESSION)
+
+    if PACKED_STORE_CHECK:
+        get_packed_store(namespace_nr_set).put(
+            page_id, PACKED_FOLDER_CLASSES[folder_pages], text_for_file, SETTING_PAGE_COMPRESSION
+        )
+        return
+
+    path_file = get_path_page_file(folder_pages, namespace_nr_set, page_id)
+    if SETTING_PAGE_COMPRESSION != "none":
+        write_page = functools.partial(MwStorage.save_page_file, path_file, text_for_file, SETTING_PAGE_COMPRESSION)
+    else:
+        write_page = functools.partial(NewtFiles.save_text_to_file, path_file, text_for_file, append=False)
+
+    if PAGE_WRITER is not None:
+        PAGE_WRITER.put(page_id, path_file, write_page)
+        return
+
+    write_page()
+    if "checkpoint" in SETTINGS:
+        PATHS_UNSYNCED.append(path_file)
+
+
+def move_missing_page_packed(
+        page_id: int,
+        path_recentchanges_missing: str
+        ) -> None:
+    """Mark missing page as removed in packed store of its namespace, or of all namespaces without page locations."""
+
+    missing_namespaces = list(namespace_types_set.keys())
+    if PAGE_LOCATIONS is not None:
+        location = PAGE_LOCATIONS.get(page_id)
+        missing_namespaces = [str(location.namespace)] if location is not None else []
+
+    for missing_namespace in missing_namespaces:
+        path_store = os.path.join(
+            DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_RAW_PACKED,
+            f"{int(missing_namespace):0{SETTINGS['ns_max_key_len']}d}"
+        )
+        if not os.path.isdir(path_store):
+            continue
+
+        store = get_packed_store(int(missing_namespace))
+        if store.get_folder_class(page_id) not in ("pages", "redirect"):
+            continue
+
+        store.move(page_id, "missing")
+        if PAGE_LOCATIONS is not None:
+            PAGE_LOCATIONS.set(page_id, int(missing_namespace), "missing", SETTING_PAGE_COMPRESSION)
+        # Log the same path as file will have after export
+        missing_target = os.path.join(
+            DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_RAW_REMOVED,
+            f"{int(missing_namespace):0{SETTINGS['ns_max_key_len']}d}-{page_id:010d}.txt"
+        )
+        NewtFiles.save_text_to_file(
+            path_recentchanges_missing, f"{missing_target}",
+            append=True, logging=False
+        )
+
+
+def move_missing_page_file(
+        page_id: int,
+        path_recentchanges_missing: str
+        ) -> None:
+    """Move file of missing page to removed folder, its place is taken from page locations."""
+
+    assert PAGE_LOCATIONS is not None  # for type checker
+    location = PAGE_LOCATIONS.get(page_id)
+    if location is None or location.folder_class not in ("pages", "redirect"):
+        return
+
+    missing_file = get_path_page_file(
+        FOLDERS_BY_CLASS[location.folder_class], location.namespace, page_id, location.codec
+    )
+    missing_target = os.path.join(
+        DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_RAW_REMOVED,
+        f"{location.namespace:0{SETTINGS['ns_max_key_len']}d}-{page_id:010d}.txt{MwStorage.CODEC_EXTENSIONS[location.codec]}"
+    )
+    if NewtFiles.check_file_exists(missing_file, stop=False, logging=False):
+        NewtFiles.ensure_dir_exists(missing_target)
+        shutil.move(missing_file, missing_target)
+        NewtFiles.save_text_to_file(
+            path_recentchanges_missing, f"{missing_target}",
+            append=True, logging=False
+        )
+
+    PAGE_LOCATIONS.set(page_id, location.namespace, "missing", location.codec)
+
+
+def remove_stale_page_files(
+        page_id: int,
+        folder_pages: str | None = None
+        ) -> None:
+    """Remove page file from other folders of namespace, page can turn into redirect and back."""
+
+    # Packed store keeps one record per page, new text replaces old one
+    if PACKED_STORE_CHECK:
+        if folder_pages is None:
+            get_packed_store(namespace_nr_set).delete(page_id)
+            if PAGE_LOCATIONS is not None:
+                PAGE_LOCATIONS.delete(page_id)
+        return
+
+    # Page has only one file, the one from page locations
+    if PAGE_LOCATIONS is not None:
+        location = PAGE_LOCATIONS.get(page_id)
+        if location is None or location.namespace != namespace_nr_set or location.folder_class == "missing":
+            return
+
+        if folder_pages is None:
+            PAGE_LOCATIONS.delete(page_id)
+        elif (FOLDERS_BY_CLASS[location.folder_class], location.codec) == (folder_pages, SETTING_PAGE_COMPRESSION):
+            return
+
+        path_file_stale = get_path_page_file(
+            FOLDERS_BY_CLASS[location.folder_class], namespace_nr_set, page_id, location.codec
+        )
+        if os.path.isfile(path_file_stale):
+            print(f"Removing stale file: {path_file_stale}")
+            os.remove(path_file_stale)
+        return
+
+    # File of page can also be left with other compression from earlier runs
+    for folder_type in (FOLDER_RAW_PAGES, FOLDER_RAW_REDIRECT, FOLDER_RAW_REMOVED):
+        for codec in MwStorage.CODEC_EXTENSIONS:
+            if folder_type == folder_pages and codec == SETTING_PAGE_COMPRESSION:
+                continue
+
+            path_file_stale = get_path_page_file(folder_type, namespace_nr_set, page_id, codec)
+            if os.path.isfile(path_file_stale):
+                print(f"Removing stale file: {path_file_stale}")
+                os.remove(path_file_stale)
+
+
+def fetch_latest_revids(
+        page_ids_batch: list[int]
+        ) -> dict[int, int]:
+    """Fetch latest revision IDs for one batch of page IDs, missing pages get revision 0."""
+
+    headers, params_for_url = headers_params_for_url
+    params = dict(params_for_url)
+    params.pop("rvslots", None)
+    params.update({"rvprop": "ids|timestamp|sha1"})
+    params.update({"pageids": "|".join(map(str, page_ids_batch))})
+
+    data_from_url = fetch_data_from_api(params, headers)
+
+    if not data_from_url:
+        NewtCons.error_msg(
+            "Failed to read revisions JSON result, exiting",
+            f"Page IDs: {page_ids_batch[0]} - {page_ids_batch[-1]}",
+            location="mwparser.fetch_latest_revids : data_from_url=False"
+        )
+    assert isinstance(data_from_url, str)  # for type checker
+
+    json_from_url = decode_json(data_from_url, params)
+    NewtCons.validate_input(
+        json_from_url, dict, check_non_empty=True,
+        location="mwparser.fetch_latest_revids : json_from_url"
+    )
+    assert isinstance(json_from_url, dict)  # for type checker
+
+    NewtUtil.check_dict_keys(
+        json_from_url, MwWikiApi.KEYS_PAGES_ANSWER,
+        location="mwparser.fetch_latest_revids : json_from_url"
+    )
+
+    NewtUtil.check_dict_keys(
+        json_from_url["query"], {"pages"},
+        location="mwparser.fetch_latest_revids : json_from_url[query]"
+    )
+
+    latest_revids = {}
+    for page in json_from_url["query"]["pages"]:
+        if "missing" in page or not page.get("revisions"):
+            latest_revids[int(page["pageid"])] = 0
+            continue
+
+        NewtUtil.check_dict_keys(
+            page["revisions"][0], {"revid", "parentid", "timestamp", "sha1"},
+            location="mwparser.fetch_latest_revids : page[revisions][0]"
+        )
+        latest_revids[int(page["pageid"])] = int(page["revisions"][0]["revid"])
+
+    return latest_revids
+
+
+def prepare_incremental_pageids(
+        ) -> None:
+    """Compare latest revisions with manifest and keep in page_ids only new and changed pages."""
+
+    path_manifest = os.path.join(
+        DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_MANIFEST,
+        f"{namespace_nr_set:0{SETTINGS['ns_max_key_len']}d}.json"
+    )
+    SETTINGS["path_manifest"] = path_manifest
+
+    manifest: dict[int, int] = {}
+    if os.path.isfile(path_manifest):
+        manifest_data = NewtFiles.read_json_from_file(path_manifest)
+        NewtCons.validate_input(
+            manifest_data, dict,
+            location="mwparser.prepare_incremental_pageids : manifest_data"
+        )
+        assert isinstance(manifest_data, dict)  # for type checker
+        manifest = {int(key): int(value) for key, value in manifest_data.items()}
+    else:
+        print(f"No manifest yet, all pages will be downloaded: {path_manifest}")
+
+    page_ids = SETTINGS["page_ids"]
+    page_ids_batches = [
+        page_ids[index:index + SETTING_INDEX_MAX_PAGES]
+        for index in range(0, len(page_ids), SETTING_INDEX_MAX_PAGES)
+    ]
+
+    max_batches = 1
+    if CONCURRENT_CHECK:
+        max_batches = SETTING_CONCURRENT_BATCHES_PER_WIKI.get(
+            SETTINGS["FOLDER_LINK"], SETTING_CONCURRENT_BATCHES_DEFAULT
+        )
+
+    latest_revids: dict[int, int] = {}
+    with ThreadPoolExecutor(max_workers=max_batches) as executor:
+        for batch_nr, batch_revids in enumerate(executor.map(fetch_latest_revids, page_ids_batches), 1):
+            latest_revids.update(batch_revids)
+            print(f"Revisions checked: batch {batch_nr} of {len(page_ids_batches)}")
+    print()
+
+    # Pages which are not in allpages list anymore, full rebuild would not have them
+    page_ids_set = set(page_ids)
+    for page_id in sorted(manifest.keys() - page_ids_set):
+        remove_stale_page_files(page_id)
+        del manifest[page_id]
+
+    SETTINGS["manifest"] = manifest
+    SETTINGS["page_revids"] = latest_revids
+    SETTINGS["page_ids"] = [
+        page_id for page_id in page_ids
+        if latest_revids.get(page_id, -1) != manifest.get(page_id)
+    ]
+
+    print(f"Pages in namespace: {len(page_ids)}")
+    print(f"Pages new or changed: {len(SETTINGS['page_ids'])}")
+    print()
+
+
+def remove_namespace_prefix(
+        title: str
+        ) -> str:
+    """Return title without namespace part, only such title works in apcontinue and gapcontinue."""
+
+    left_part, sep_part, right_part = title.partition(":")
+    if sep_part and left_part.replace("_", " ") in {value.replace("_", " ") for value in namespace_types_set.values()}:
+        return right_part
+    return title
+
+
+def get_json_from_url(
+        continue_page_wiki: str | None = None,
+        continue_page_backup: str | None = None,
+        continue_params: dict | None = None
+        ) -> dict:
+    """Fetch JSON data from a URL based on settings and save to file."""
+
+    global wiki_data_type_set
+    global namespace_types_set
+
+    continue_page_for_block = None
+    continue_page_from_wiki = continue_page_wiki
+
+    headers, params = headers_params_for_url
+
+    match wiki_data_type_set:
+        case "allpages":
+            if continue_page_wiki is not None:
+                # continue_page_wiki - current page title from wiki
+                # continue_page_backup - previous page title from wiki, we saved in case current page is blocked
+                # continue_page_for_block - what we will block incase no result
+                continue_page_wiki = continue_page_wiki.replace(" ", "_")
+                continue_page_for_block = continue_page_wiki
+                # Empty backup would start the list from the beginning
+                if BLOCKED_STORE.has_title(continue_page_wiki) and continue_page_backup:
+                    print(continue_page_wiki)
+                    continue_page_wiki = continue_page_backup.replace(" ", "_")
+                    continue_page_for_block = continue_page_wiki
+
+                print(continue_page_wiki)
+                params.update({"apcontinue": remove_namespace_prefix(continue_page_wiki)})
+
+        case "pageids" | "pagesrecent":
+            page_ids_batch = get_next_page_ids_batch()
+            if not page_ids_batch:
+                return {}
+
+            return fetch_json_pageids(page_ids_batch)
+
+        case "recentchanges":
+            if continue_page_wiki is not None:
+                print(continue_page_wiki)
+                params.update({"rccontinue": continue_page_wiki})
+
+        case "savefiles":
+            if len(SETTINGS["files_titles"]) == 0:
+                print()
+                print("No images to process. Empty list.")
+                return {}
+
+            index_start = SETTINGS["index_start"]
+            index_max = SETTING_INDEX_MAX_TITLES
+            index_end = index_start + index_max
+
+            if len(SETTINGS["files_titles"]) <= index_start:
+                print()
+                print("No more images to process.")
+                return {}
+
+            params.update({"titles": "|".join(
+                map(str, SETTINGS["files_titles"][index_start:index_end])
+            )})
+            SETTINGS["index_start"] = index_end
+            if "index_pending" in SETTINGS:
+                SETTINGS["index_pending"].append(index_end)
+
+            print()
+            print(f"Processing images IDs from index {index_start} to {index_end}")
+            print(f"Progress max index: {len(SETTINGS['files_titles'])}")
+            print(f"Processing current images: {index_start / index_max}")
+            print(f"Progress max pages: {len(SETTINGS['files_titles']) / index_max}")
+            print()
+
+        case "history":
+            # Every page needs its own requests, see loop_history_pages()
+            return {}
+
+        case "allcontent":
+            if continue_params is not None:
+                # Without rvcontinue wiki sends the next pages of list, with it the rest of content of the same pages
+                # Answer with rvcontinue has no gapcontinue if request had none, the same pages are asked again then
+                params.pop("rvcontinue", None)
+                params.update(continue_params)
+                if "gapcontinue" in continue_params:
+                    continue_page_for_block = continue_params["gapcontinue"].replace(" ", "_")
+                    # Empty backup would start the list from the beginning
+                    if BLOCKED_STORE.has_title(continue_page_for_block) and continue_page_backup:
+                        print(continue_page_for_block)
+                        params.pop("rvcontinue", None)
+                        continue_page_for_block = continue_page_backup.replace(" ", "_")
+                        params.update({"gapcontinue": remove_namespace_prefix(continue_page_for_block)})
+
+                print(params.get("gapcontinue", ""), params.get("rvcontinue", ""))
+
+        case _:
+            NewtCons.error_msg(
+                f"Unexpected config type: {wiki_data_type_set}",
+                location="mwparser.get_json_from_url : wiki_data_type_set default case"
+            )
+
+    data_from_url = fetch_data_from_api(params, headers)
+    print()
+
+    # None data mostly comes from 403 Forbidden error, so we save continue_page_for_block to blocked list and skip it next time
+    if not data_from_url:
+        # Blocked title is new, so request can be sent again from backup title, the same title is never tried twice
+        if continue_page_for_block is not None and BLOCKED_STORE.add_title(continue_page_for_block) and continue_page_backup:
+            return get_json_from_url(continue_page_from_wiki, continue_page_backup, continue_params)
+
+        NewtCons.error_msg(
+            "Failed to read JSON result, exiting",
+            location="mwparser.get_json_from_url : data_from_url=False"
+        )
+
+    # Ensure return value is a dict
+    NewtCons.validate_input(
+        data_from_url, str, check_non_empty=True,
+        location="mwparser.get_json_from_url : data_from_url"
+    )
+    assert isinstance(data_from_url, str)  # for type checker
+
+    json_from_url = decode_json(data_from_url, params)
+
+    # Only page IDs can be split into pieces, it is done in fetch_json_pageids()
+    if json_from_url is None:
+        NewtCons.error_msg(
+            "Failed to read JSON result, exiting",
+            location="mwparser.get_json_from_url : json_from_url=False and not pageids"
+        )
+
+    NewtCons.validate_input(
+        json_from_url, dict, check_non_empty=True,
+        location="mwparser.get_json_from_url : json_from_url"
+    )
+    assert isinstance(json_from_url, dict)  # for type checker
+
+    return json_from_url
+
+
+@MwMetrics.timed("restructure_allpages")
+def restructure_json_allpages(
+        json_data_dict: dict
+        ) -> tuple[list[str], str]:
+    """Process and save all pages from JSON data."""
+
+    global namespace_nr_set
+
+    NewtUtil.check_dict_keys(
+        json_data_dict, MwWikiApi.get_list_answer_keys(json_data_dict),
+        location="mwparser.restructure_json_allpages : json_data_dict"
+    )
+
+    NewtUtil.check_dict_keys(
+        json_data_dict["query"], {"allpages"},
+        location="mwparser.restructure_json_allpages : json_data_dict[query]"
+    )
+
+    # Whole batch is checked at once, item with wrong keys is found and reported by the check in loop
+    pages_checked = MwSchemas.check_items(json_data_dict["query"]["allpages"], MwSchemas.check_allpages_page)
+
+    continue_page_backup = ""
+    allpages_list = []
+    allpages_list.append(["pageid", "title"])
+    for page in json_data_dict["query"]["allpages"]:
+        if not pages_checked:
+            NewtUtil.check_dict_keys(
+                page, {"pageid", "ns", "title"},
+                location="mwparser.restructure_json_allpages : page"
+            )
+
+        if int(page["ns"]) != namespace_nr_set:
+            NewtCons.error_msg(
+                f"Unexpected namespace value: {page['ns']} for page ID {page['pageid']}",
+                f"Page: {page}",
+                location="mwparser.restructure_json_allpages : page[ns]"
+            )
+
+        if BLOCKED_STORE.has_title(page["title"]):
+            continue
+
+        continue_page_backup = page["title"].replace(" ", "_")
+
+        allpages_list.append([
+            f"{page['pageid']:010d}",
+            page["title"],
+        ])
+
+    return (allpages_list, continue_page_backup)
+
+
+@MwMetrics.timed("restructure_pageids")
+def restructure_json_pageids(
+        json_data_dict: dict
+        ) -> None:
+
+    global wiki_data_type_set
+    global namespace_types_set
+    global namespace_nr_set
+
+    path_recentchanges_missing = os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_LISTS, "missing-"+FILE_RECENTCHANGES)
+
+    NewtUtil.check_dict_keys(
+        json_data_dict, MwWikiApi.KEYS_PAGES_ANSWER,
+        location="mwparser.restructure_json_pageids : json_data_dict"
+    )
+
+    NewtUtil.check_dict_keys(
+        json_data_dict["query"], {"pages"},
+        location="mwparser.restructure_json_pageids : json_data_dict[query]"
+    )
+
+    for page in json_data_dict["query"]["pages"]:
+        if "missing" in page:
             # Print warning to fix log later
             # Save this page id to recentchanges log to check later
             # Move affected files to removed folder to avoid processing them again until we check what is wrong with them
@@ -736,29 +1727,47 @@ def restructure_json_pageids(
                 path_recentchanges_missing, f"Page ID {page['pageid']} data is missing",
                 append=True, logging=False
             )
-            for missing_folder in (FOLDER_RAW_PAGES, FOLDER_RAW_REDIRECT):
-                for missing_namespace in namespace_types_set.keys():
-                    missing_file = os.path.join(
-                        DIR_GLOBAL, SETTINGS["FOLDER_LINK"], missing_folder,
-                        f"{int(missing_namespace):0{SETTINGS['ns_max_key_len']}d}", f"{page['pageid']:010d}.txt"
-                    )
-                    missing_target = os.path.join(
-                        DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_RAW_REMOVED,
-                        f"{int(missing_namespace):0{SETTINGS['ns_max_key_len']}d}-{page['pageid']:010d}.txt"
-                    )
-                    if NewtFiles.check_file_exists(missing_file, stop=False, logging=False):
-                        NewtFiles.ensure_dir_exists(missing_target)
-                        shutil.move(missing_file, missing_target)
-                        NewtFiles.save_text_to_file(
-                            path_recentchanges_missing, f"{missing_target}",
-                            append=True, logging=False
-                        )
+            MwMetrics.add("pages_missing")
+            if CATALOG is not None:
+                CATALOG.add_missing("page", str(page["pageid"]))
+            if PACKED_STORE_CHECK:
+                move_missing_page_packed(page["pageid"], path_recentchanges_missing)
+            elif PAGE_LOCATIONS is not None:
+                move_missing_page_file(page["pageid"], path_recentchanges_missing)
+            else:
+                for missing_folder in (FOLDER_RAW_PAGES, FOLDER_RAW_REDIRECT):
+                    for missing_namespace in namespace_types_set.keys():
+                        for missing_extension in MwStorage.CODEC_EXTENSIONS.values():
+                            missing_file = os.path.join(
+                                DIR_GLOBAL, SETTINGS["FOLDER_LINK"], missing_folder,
+                                f"{int(missing_namespace):0{SETTINGS['ns_max_key_len']}d}",
+                                f"{page['pageid']:010d}.txt{missing_extension}"
+                            )
+                            missing_target = os.path.join(
+                                DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_RAW_REMOVED,
+                                f"{int(missing_namespace):0{SETTINGS['ns_max_key_len']}d}-{page['pageid']:010d}.txt{missing_extension}"
+                            )
+                            if NewtFiles.check_file_exists(missing_file, stop=False, logging=False):
+                                NewtFiles.ensure_dir_exists(missing_target)
+                                shutil.move(missing_file, missing_target)
+                                NewtFiles.save_text_to_file(
+                                    path_recentchanges_missing, f"{missing_target}",
+                                    append=True, logging=False
+                                )
+
+            # Revision 0 marks page as known missing, it is not requested again until it comes back
+            if "manifest" in SETTINGS:
+                SETTINGS["manifest"][page["pageid"]] = 0
             continue
 
-        NewtUtil.check_dict_keys(
-            page, {"pageid", "ns", "title", "revisions"},
-            location="mwparser.restructure_json_pageids : page"
-        )
+        # Page with all revisions is checked at once, pages can come one by one from stream
+        page_checked = MwSchemas.check_pageids_page(page)
+
+        if not page_checked:
+            NewtUtil.check_dict_keys(
+                page, {"pageid", "ns", "title", "revisions"},
+                location="mwparser.restructure_json_pageids : page"
+            )
 
         check_ns = namespace_nr_set
 
@@ -773,109 +1782,149 @@ def restructure_json_pageids(
                 location="mwparser.restructure_json_pageids : page[ns]"
             )
 
-        # Basic path for files to save
-        folder_pages = FOLDER_RAW_PAGES
-
-        text_for_file = ""
-        text_for_file += f"Namespace ::: {page['ns']} ::: {namespace_types_set[str(page['ns'])]}\n"
-        text_for_file += f"Page ID   ::: {page['pageid']}\n"
-        text_for_file += f"Title     ::: {page['title']}\n\n"
+        if not page_checked:
+            for revision in page["revisions"]:
+                NewtUtil.check_dict_keys(
+                    revision, {"slots"},
+                    location="mwparser.restructure_json_pageids : revision"
+                )
 
-        for revision in page["revisions"]:
-            NewtUtil.check_dict_keys(
-                revision, {"slots"},
-                location="mwparser.restructure_json_pageids : revision"
-            )
+                NewtUtil.check_dict_keys(
+                    revision["slots"], {"main"},
+                    location="mwparser.restructure_json_pageids : revision[slots]"
+                )
 
-            NewtUtil.check_dict_keys(
-                revision["slots"], {"main"},
-                location="mwparser.restructure_json_pageids : revision[slots]"
-            )
+                NewtUtil.check_dict_keys(
+                    revision["slots"]["main"], {"contentmodel", "contentformat", "content"},
+                    location="mwparser.restructure_json_pageids : revision[slots][main]"
+                )
 
-            NewtUtil.check_dict_keys(
-                revision["slots"]["main"], {"contentmodel", "contentformat", "content"},
-                location="mwparser.restructure_json_pageids : revision[slots][main]"
-            )
+        # The same check as crawler.py, page with other content model is blocked
+        unexpected_content = MwWikiApi.find_unexpected_content(page)
+        if unexpected_content is not None:
+            content_key, content_value = unexpected_content
 
-            if revision["slots"]["main"]["contentmodel"] != "wikitext":
+            if content_key == "contentmodel":
                 NewtCons.error_msg(
-                    f"Unexpected Contentmodel : {revision['slots']['main']['contentmodel']}",
+                    f"Unexpected Contentmodel : {content_value}",
                     f"Title: {page['title']}",
                     f"Page: {page['pageid']}",
                     location="mwparser.restructure_json_pageids : revision[slots][main][contentmodel]",
                     stop=False
                 )
-                NewtFiles.save_text_to_file(
-                    path_file_blocked,
-                    page["title"].replace(" ", "_"),
-                    append=True
-                )
-                skip_page = True
-                break
-
-            if revision["slots"]["main"]["contentformat"] != "text/x-wiki":
-                NewtCons.error_msg(
-                    f"Unexpected Contentformat : {revision['slots']['main']['contentformat']}",
-                    f"Title: {page['title']}",
-                    f"Page: {page['pageid']}",
-                    location="mwparser.restructure_json_pageids : revision[slots][main][contentformat]"
-                )
+                BLOCKED_STORE.add_title(page["title"])
+                continue
 
-            if len(revision["slots"]["main"]["content"]) < 6:
-                folder_pages = FOLDER_RAW_REMOVED
+            NewtCons.error_msg(
+                f"Unexpected Contentformat : {content_value}",
+                f"Title: {page['title']}",
+                f"Page: {page['pageid']}",
+                location="mwparser.restructure_json_pageids : revision[slots][main][contentformat]"
+            )
 
-            if revision["slots"]["main"]["content"].lower().startswith("#redirect"):
-                folder_pages = FOLDER_RAW_REDIRECT
+        folder_class, text_for_file = MwWikiApi.format_page_text(page, namespace_types_set[str(page["ns"])])
+        folder_pages = FOLDERS_BY_CLASS[folder_class]
 
-            text_for_file += "-" * 80 + "\n"
-            text_for_file += f"{revision['slots']['main']['content']}\n\n"
+        if "manifest" in SETTINGS:
+            remove_stale_page_files(page["pageid"], folder_pages)
 
-        # It helps to skip outer for if break was in inner for
-        if skip_page:
-            continue
+        save_page_text(folder_pages, page["pageid"], text_for_file)
 
-        text_for_file += "=== END ==="
+        if "manifest" in SETTINGS:
+            SETTINGS["manifest"][page["pageid"]] = SETTINGS["page_revids"].get(page["pageid"], 0)
 
-        path_file_pageid = os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"], folder_pages, f"{namespace_nr_set:0{SETTINGS['ns_max_key_len']}d}", f"{page['pageid']:010d}.txt")
-        NewtFiles.save_text_to_file(
-            path_file_pageid,
-            text_for_file,
-            append=False
-        )
+    # Batch is complete, make it durable before next one
+    for store in PACKED_STORES.values():
+        store.flush()
+    if PAGE_LOCATIONS is not None:
+        PAGE_LOCATIONS.flush()
 
 
-def restructure_json_recentchanges(
+@MwMetrics.timed("restructure_allcontent")
+def restructure_json_allcontent(
         json_data_dict: dict
-        ) -> list[str]:
-    """Process and save all pages from JSON data."""
+        ) -> tuple[list[str], str]:
+    """Save content of pages from generator answer and return their rows for allpages list."""
 
-    global namespace_types_set
+    # Answer with rvcontinue has no batchcomplete, its other pages get content in next answers
+    if "batchcomplete" not in json_data_dict:
+        NewtUtil.check_dict_keys(
+            json_data_dict, {"query", "continue"},
+            location="mwparser.restructure_json_allcontent : json_data_dict"
+        )
 
-    if "continue" in json_data_dict:
+    elif "continue" in json_data_dict:
         NewtUtil.check_dict_keys(
-            json_data_dict, {"query", "batchcomplete", "limits", "continue"},
-            location="mwparser.restructure_json_recentchanges : json_data_dict"
+            json_data_dict, {"query", "batchcomplete", "continue"},
+            location="mwparser.restructure_json_allcontent : json_data_dict"
         )
 
     else:
         NewtUtil.check_dict_keys(
-            json_data_dict, {"query", "batchcomplete", "limits"},
-            location="mwparser.restructure_json_recentchanges : json_data_dict"
+            json_data_dict, {"query", "batchcomplete"},
+            location="mwparser.restructure_json_allcontent : json_data_dict"
         )
 
+    NewtUtil.check_dict_keys(
+        json_data_dict["query"], {"pages"},
+        location="mwparser.restructure_json_allcontent : json_data_dict[query]"
+    )
+
+    continue_page_backup = ""
+    allpages_list = []
+    allpages_list.append(["pageid", "title"])
+    pages_with_content = []
+    for page in json_data_dict["query"]["pages"]:
+        if BLOCKED_STORE.has_title(page["title"]):
+            continue
+
+        # Pages are sorted by page ID, list continues from the largest title
+        continue_page_backup = max(continue_page_backup, page["title"].replace(" ", "_"))
+
+        if "revisions" not in page:
+            continue
+
+        pages_with_content.append(page)
+        allpages_list.append([
+            f"{page['pageid']:010d}",
+            page["title"],
+        ])
+
+    restructure_json_pageids({"batchcomplete": True, "query": {"pages": pages_with_content}})
+
+    return (allpages_list, continue_page_backup)
+
+
+@MwMetrics.timed("restructure_recentchanges")
+def restructure_json_recentchanges(
+        json_data_dict: dict
+        ) -> list[str]:
+    """Process and save all pages from JSON data."""
+
+    global namespace_types_set
+
+    NewtUtil.check_dict_keys(
+        json_data_dict, MwWikiApi.get_list_answer_keys(json_data_dict),
+        location="mwparser.restructure_json_recentchanges : json_data_dict"
+    )
+
     NewtUtil.check_dict_keys(
         json_data_dict["query"], {"recentchanges"},
         location="mwparser.restructure_json_recentchanges : json_data_dict[query]"
     )
 
+    # Whole batch is checked at once, item with wrong keys is found and reported by the check in loop
+    pages_checked = MwSchemas.check_items(json_data_dict["query"]["recentchanges"], MwSchemas.check_recentchanges_page)
+
     recentchanges_list = []
     recentchanges_list.append(["timestamp", "pageid", "ns", "type", "title"])
 
     for page in json_data_dict["query"]["recentchanges"]:
-        NewtUtil.check_dict_keys(
-            page, {"type", "ns", "title", "pageid", "revid", "old_revid", "rcid", "timestamp"},
-            location="mwparser.restructure_json_recentchanges : page"
-        )
+        if not pages_checked:
+            NewtUtil.check_dict_keys(
+                page, {"type", "ns", "title", "pageid", "revid", "old_revid", "rcid", "timestamp"},
+                location="mwparser.restructure_json_recentchanges : page"
+            )
 
         if str(page["ns"]) not in namespace_types_set:
             NewtCons.error_msg(
@@ -885,6 +1934,13 @@ def restructure_json_recentchanges(
                 stop=False
             )
 
+        if "rc_newest" in SETTINGS and page["rcid"] > SETTINGS["rc_newest"]["rcid"]:
+            SETTINGS["rc_newest"] = {"timestamp": page["timestamp"], "rcid": page["rcid"]}
+
+        # rcend is inclusive, so changes at watermark timestamp come again
+        if "rc_watermark" in SETTINGS and page["rcid"] <= SETTINGS["rc_watermark"]["rcid"]:
+            continue
+
         if page["pageid"] == 0:
             continue
 
@@ -896,108 +1952,361 @@ def restructure_json_recentchanges(
             page["title"],
         ])
 
-    return recentchanges_list
+    return recentchanges_list
+
+
+@MwMetrics.timed("restructure_savefiles")
+def restructure_json_savefiles(
+        json_data_dict: dict
+        ) -> None:
+
+    path_missing_image = os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_LISTS, "missing-images.txt")
+
+    if "batchcomplete" in json_data_dict:
+        NewtUtil.check_dict_keys(
+            json_data_dict, {"query", "batchcomplete"},
+            location="mwparser.restructure_json_savefiles : json_data_dict + batchcomplete"
+        )
+    else:
+        NewtUtil.check_dict_keys(
+            json_data_dict, {"query", "continue"},
+            location="mwparser.restructure_json_savefiles : json_data_dict + continue"
+        )
+
+    NewtUtil.check_dict_keys(
+        json_data_dict["query"], {"pages"},
+        location="mwparser.restructure_json_savefiles : json_data_dict[query]"
+    )
+
+    for image_data in json_data_dict["query"]["pages"]:
+        # Image with all its infos is checked at once, images without info have other keys
+        image_checked = MwSchemas.check_savefiles_image(image_data)
+
+        if "imageinfo" in image_data:
+            if not image_checked:
+                NewtUtil.check_dict_keys(
+                    image_data, {"pageid", "ns", "title", "imagerepository", "imageinfo"},
+                    location="mwparser.restructure_json_savefiles : image_data with imageinfo"
+                )
+
+        elif "pageid" in image_data:
+            NewtUtil.check_dict_keys(
+                image_data, {"pageid", "ns", "title", "imagerepository"},
+                location="mwparser.restructure_json_savefiles : image_data without imageinfo"
+            )
+
+            NewtFiles.save_text_to_file(
+                path_missing_image,
+                f"{image_data['pageid']:010d} > {image_data['title']}",
+                append=True
+            )
+            if CATALOG is not None:
+                CATALOG.add_missing("image", image_data["title"])
+            continue
+
+        else:
+            NewtUtil.check_dict_keys(
+                image_data, {"missing", "ns", "title", "imagerepository"},
+                location="mwparser.restructure_json_savefiles : image_data without pageid"
+            )
+
+            NewtFiles.save_text_to_file(
+                path_missing_image,
+                f"Unknown > {image_data['title']}",
+                append=True
+            )
+            if CATALOG is not None:
+                CATALOG.add_missing("image", image_data["title"])
+            continue
+
+        for image_info in image_data["imageinfo"]:
+            if not image_checked:
+                NewtUtil.check_dict_keys(
+                    image_info, {"url", "descriptionurl", "descriptionshorturl"},
+                    location="mwparser.restructure_json_savefiles : image_info"
+                )
+
+            url_filename = os.path.basename(image_info["url"])
+            filename = f"{image_data['pageid']:010d}-{url_filename}"
+            path_file_image = os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_RAW_IMAGES, filename)
+            MwMetrics.add("images")
+
+            if REPLAY_CHECK:
+                continue
+
+            if IMAGE_DOWNLOADER is not None:
+                IMAGE_DOWNLOADER.put(image_info["url"], path_file_image)
+                continue
+
+            MwRateLimit.get_limiter(image_info["url"]).acquire()
+            if not NewtNet.fetch_data_from_url(
+                image_info["url"],
+                save_path=path_file_image,
+                max_mb_size=SETTING_IMAGE_MAX_MBYTES,
+                mode="auto",
+                repeat_on_fail=False,
+                logging=LOGGING
+            ):
+                save_missing_image(image_info["url"], path_file_image)
+        print()
+
+
+def save_missing_image(
+        url: str,
+        path_file_image: str
+        ) -> None:
+    """Save failed image download to missing list, called from download workers too."""
+
+    path_missing_image = os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_LISTS, "missing-images.txt")
+    MwMetrics.add("images_missing")
+
+    with MISSING_IMAGE_LOCK:
+        NewtFiles.save_text_to_file(
+            path_missing_image,
+            f"{url} > {path_file_image}",
+            append=True
+        )
+
+    if CATALOG is not None:
+        CATALOG.add_missing("image_download", url)
+
+
+@MwMetrics.timed("save_list")
+def save_data_list(
+        data_list: list[str],
+        append: bool = True
+        ) -> None:
+    """Save the restructured list data to a file."""
+
+    if "file_name" not in SETTINGS:
+        NewtCons.error_msg(
+            "Missing 'file_name' in SETTINGS for saving data list",
+            location="mwparser.save_data_list : file_name"
+        )
+
+    # Catalog keeps every row once, CSV list is exported from it at the end, skip header
+    if CATALOG is not None:
+        if wiki_data_type_set == "recentchanges":
+            CATALOG.upsert_recentchanges(data_list[1:], CATALOG_RUN)
+        else:
+            CATALOG.upsert_pages(namespace_nr_set, ((int(row[0]), row[1]) for row in data_list[1:]), CATALOG_RUN)
+        return
+
+    # Rows after watermark are collected and merged at the end, skip header
+    if "rc_rows_new" in SETTINGS:
+        SETTINGS["rc_rows_new"].extend(data_list[1:])
+        return
+
+    NewtFiles.save_csv_to_file(
+        os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_LISTS, SETTINGS["file_name"]),
+        data_list,
+        append=append
+    )
+    print()
+
+
+def get_path_history_file(
+        page_id: int
+        ) -> str:
+    return os.path.join(
+        DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_RAW_HISTORY,
+        f"{namespace_nr_set:0{SETTINGS['ns_max_key_len']}d}",
+        f"{page_id:010d}.txt"
+    )
+
+
+def fetch_json_history(
+        page_id: int,
+        rvcontinue: str | None
+        ) -> dict:
+    """Fetch JSON data for next part of revisions of one page."""
+
+    headers, params_for_url = headers_params_for_url
+    params = dict(params_for_url)
+    params.update({"pageids": str(page_id)})
+    if rvcontinue is not None:
+        params.update({"rvcontinue": rvcontinue})
+
+    data_from_url = fetch_data_from_api(params, headers)
+
+    if not data_from_url:
+        NewtCons.error_msg(
+            "Failed to read JSON result, exiting",
+            f"Page ID: {page_id}, rvcontinue: {rvcontinue}",
+            location="mwparser.fetch_json_history : data_from_url=False"
+        )
+
+    NewtCons.validate_input(
+        data_from_url, str, check_non_empty=True,
+        location="mwparser.fetch_json_history : data_from_url"
+    )
+    assert isinstance(data_from_url, str)  # for type checker
+
+    json_from_url = decode_json(data_from_url, params)
+    NewtCons.validate_input(
+        json_from_url, dict, check_non_empty=True,
+        location="mwparser.fetch_json_history : json_from_url"
+    )
+    assert isinstance(json_from_url, dict)  # for type checker
+
+    # Answer has no batchcomplete while revisions of page continue, limits come with rvlimit=max
+    if "batchcomplete" in json_from_url:
+        NewtUtil.check_dict_keys(
+            json_from_url, {"query", "batchcomplete", "limits"},
+            location="mwparser.fetch_json_history : json_from_url"
+        )
+
+    else:
+        NewtUtil.check_dict_keys(
+            json_from_url, {"query", "limits", "continue"},
+            location="mwparser.fetch_json_history : json_from_url"
+        )
+
+    NewtUtil.check_dict_keys(
+        json_from_url["query"], {"pages"},
+        location="mwparser.fetch_json_history : json_from_url[query]"
+    )
+
+    return json_from_url
 
 
-def restructure_json_savefiles(
-        json_data_dict: dict
+@MwMetrics.timed("save_history")
+def save_history_page(
+        page_id: int
         ) -> None:
+    """Write all revisions of page to its history file, every answer is written as soon as it comes.
 
-    path_missing_image = os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_LISTS, "missing-images.txt")
+    Next rvcontinue and size of written part of file are kept in <pageid>.continue,
+    so unfinished page continues from there. File without .continue is finished.
+    """
 
-    if "batchcomplete" in json_data_dict:
-        NewtUtil.check_dict_keys(
-            json_data_dict, {"query", "batchcomplete"},
-            location="mwparser.restructure_json_savefiles : json_data_dict + batchcomplete"
+    path_file = get_path_history_file(page_id)
+    path_continue = path_file[:-len(".txt")] + ".continue"
+
+    rvcontinue = None
+    offset = 0
+    if os.path.isfile(path_continue):
+        history_continue = NewtFiles.read_json_from_file(path_continue)
+        NewtCons.validate_input(
+            history_continue, dict, check_non_empty=True,
+            location="mwparser.save_history_page : history_continue"
         )
-    else:
+        assert isinstance(history_continue, dict)  # for type checker
+
         NewtUtil.check_dict_keys(
-            json_data_dict, {"query", "continue"},
-            location="mwparser.restructure_json_savefiles : json_data_dict + continue"
+            history_continue, {"rvcontinue", "offset"},
+            location="mwparser.save_history_page : history_continue"
         )
+        rvcontinue = history_continue["rvcontinue"]
+        offset = history_continue["offset"]
+        print(f"Continue history of page ID {page_id} from revision {rvcontinue}")
 
-    NewtUtil.check_dict_keys(
-        json_data_dict["query"], {"pages"},
-        location="mwparser.restructure_json_savefiles : json_data_dict[query]"
-    )
+    elif os.path.isfile(path_file):
+        return
 
-    for image_data in json_data_dict["query"]["pages"]:
-        if "imageinfo" in image_data:
-            NewtUtil.check_dict_keys(
-                image_data, {"pageid", "ns", "title", "imagerepository", "imageinfo"},
-                location="mwparser.restructure_json_savefiles : image_data with imageinfo"
-            )
+    else:
+        save_json_to_file_atomic(path_continue, {"rvcontinue": rvcontinue, "offset": offset})
 
-        elif "pageid" in image_data:
-            NewtUtil.check_dict_keys(
-                image_data, {"pageid", "ns", "title", "imagerepository"},
-                location="mwparser.restructure_json_savefiles : image_data without imageinfo"
-            )
+    # Part written after the last .continue is cut, its revisions come again
+    if os.path.isfile(path_file):
+        os.truncate(path_file, offset)
 
-            NewtFiles.save_text_to_file(
-                path_missing_image,
-                f"{image_data['pageid']:010d} > {image_data['title']}",
-                append=True
-            )
-            continue
+    with open(path_file, "ab") as file_history:
+        while True:
+            json_data = fetch_json_history(page_id, rvcontinue)
 
-        else:
-            NewtUtil.check_dict_keys(
-                image_data, {"missing", "ns", "title", "imagerepository"},
-                location="mwparser.restructure_json_savefiles : image_data without pageid"
-            )
+            for page in json_data["query"]["pages"]:
+                if "missing" in page:
+                    NewtCons.error_msg(
+                        f"Page ID {page['pageid']} data is missing",
+                        f"Page: {page}",
+                        location="mwparser.save_history_page : 'missing' in page",
+                        stop=False
+                    )
+                    file_history.close()
+                    os.remove(path_file)
+                    os.remove(path_continue)
+                    return
 
-            NewtFiles.save_text_to_file(
-                path_missing_image,
-                f"Unknown > {image_data['title']}",
-                append=True
-            )
-            continue
+                NewtUtil.check_dict_keys(
+                    page, {"pageid", "ns", "title", "revisions"},
+                    location="mwparser.save_history_page : page"
+                )
+
+                if offset == 0:
+                    file_history.write(
+                        MwWikiApi.get_page_header(page, namespace_types_set[str(page["ns"])]).encode("utf-8")
+                    )
+
+                for revision in page["revisions"]:
+                    # Hidden revisions have no user, sha1 or content, so only these keys are required
+                    if "revid" not in revision or "timestamp" not in revision:
+                        NewtCons.error_msg(
+                            f"Unexpected revision of page ID {page['pageid']}",
+                            f"Revision: {revision}",
+                            location="mwparser.save_history_page : revision"
+                        )
+
+                    file_history.write((
+                        MwWikiApi.LINE_REVISION +
+                        f"Revision  ::: {revision['revid']}\n"
+                        f"Parent    ::: {revision.get('parentid', 0)}\n"
+                        f"Timestamp ::: {revision['timestamp']}\n"
+                        f"User      ::: {revision.get('user', '')}\n"
+                        f"SHA1      ::: {revision.get('sha1', '')}\n\n"
+                    ).encode("utf-8"))
+                    file_history.write(revision.get("slots", {}).get("main", {}).get("content", "").encode("utf-8"))
+                    file_history.write(b"\n\n")
+
+            if "continue" not in json_data:
+                break
 
-        for image_info in image_data["imageinfo"]:
             NewtUtil.check_dict_keys(
-                image_info, {"url", "descriptionurl", "descriptionshorturl"},
-                location="mwparser.restructure_json_savefiles : image_info"
+                json_data["continue"], {"rvcontinue", "continue"},
+                location="mwparser.save_history_page : json_data[continue]"
             )
+            rvcontinue = json_data["continue"]["rvcontinue"]
 
-            url_filename = os.path.basename(image_info["url"])
-            filename = f"{image_data['pageid']:010d}-{url_filename}"
-            path_file_image = os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_RAW_IMAGES, filename)
+            # Revisions must be on disk before .continue points after them
+            file_history.flush()
+            os.fsync(file_history.fileno())
+            offset = file_history.tell()
+            save_json_to_file_atomic(path_continue, {"rvcontinue": rvcontinue, "offset": offset})
 
-            if not NewtNet.fetch_data_from_url(
-                image_info["url"],
-                save_path=path_file_image,
-                max_mb_size=SETTING_IMAGE_MAX_MBYTES,
-                mode="auto",
-                repeat_on_fail=False,
-                logging=LOGGING
-            ):
-                NewtFiles.save_text_to_file(
-                    path_missing_image,
-                    f"{image_info['url']} > {path_file_image}",
-                    append=True
-                )
-        print()
+        file_history.write(MwWikiApi.LINE_END.encode("utf-8"))
+        file_history.flush()
+        os.fsync(file_history.fileno())
 
+    os.remove(path_continue)
 
-def save_data_list(
-        data_list: list[str],
-        append: bool = True
+
+def loop_history_pages(
         ) -> None:
-    """Save the restructured list data to a file."""
+    """Crawl full history of all pages of namespace, one page after another."""
 
-    if "file_name" not in SETTINGS:
+    os.makedirs(os.path.dirname(get_path_history_file(0)), exist_ok=True)
+
+    try:
+        for index_page, page_id in enumerate(SETTINGS["page_ids"]):
+            if BLOCKED_STORE.has_page_id(page_id):
+                continue
+
+            if index_page % SETTING_INDEX_MAX_PAGES == 0:
+                print(f"History progress: {index_page} of {len(SETTINGS['page_ids'])}")
+
+            save_history_page(page_id)
+
+    except Exception as e:
         NewtCons.error_msg(
-            "Missing 'file_name' in SETTINGS for saving data list",
-            location="mwparser.save_data_list : file_name"
+            f"Script encountered an error: {e}",
+            location="mwparser.loop_history_pages : Exception"
         )
 
-    NewtFiles.save_csv_to_file(
-        os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_LISTS, SETTINGS["file_name"]),
-        data_list,
-        append=append
-    )
-    print()
+    except SystemExit:
+        NewtCons.error_msg(
+            "SystemExit on fetching history",
+            location="mwparser.loop_history_pages : SystemExit"
+        )
 
 
 def loop_next_pages(
@@ -1025,8 +2334,11 @@ def loop_next_pages(
                         continue_page_backup = continue_page_backup
                         )
 
-                    data_list, continue_page_backup = restructure_json_allpages(json_data)
+                    data_list, continue_page_backup_new = restructure_json_allpages(json_data)
                     save_data_list(data_list)
+                    # All pages of batch can be blocked, then backup from earlier batch is still valid
+                    if continue_page_backup_new:
+                        continue_page_backup = continue_page_backup_new
 
                 case "pageids" | "pagesrecent":
                     if json_data == {}:
@@ -1036,8 +2348,23 @@ def loop_next_pages(
                         break
 
                     restructure_json_pageids(json_data)
+                    save_checkpoint()
                     json_data = get_json_from_url()
 
+                case "allcontent":
+                    if "continue" not in json_data:
+                        break
+
+                    json_data = get_json_from_url(
+                        continue_page_backup = continue_page_backup,
+                        continue_params = json_data["continue"]
+                    )
+
+                    data_list, continue_page_backup_new = restructure_json_allcontent(json_data)
+                    save_data_list(data_list)
+                    if continue_page_backup_new:
+                        continue_page_backup = continue_page_backup_new
+
                 case "recentchanges":
                     if "continue" not in json_data:
                         break
@@ -1059,6 +2386,7 @@ def loop_next_pages(
                         break
 
                     restructure_json_savefiles(json_data)
+                    save_checkpoint()
                     json_data = get_json_from_url()
 
                 case _:
@@ -1077,11 +2405,220 @@ def loop_next_pages(
         )
 
 
+def loop_next_pages_pipeline(
+        json_data: dict
+        ) -> None:
+    """Loop over page IDs with fetch, parse and write stages in their own threads.
+
+    Fetch thread of writer.py requests and decodes next batches into parse queue,
+    this thread restructures the current batch and puts page files into queues of PAGE_WRITER.
+    """
+
+    fetch_stage = MwWriter.FetchStage(get_json_from_url)
+    print(f"Batches in parse queue: {MwWriter.SETTING_PARSE_QUEUE_DEPTH}")
+
+    try:
+        while True:
+            if json_data == {}:
+                break
+
+            if "query" not in json_data:
+                break
+
+            restructure_json_pageids(json_data)
+            save_checkpoint()
+            # Batch fetched while this one was restructured, it also raises SystemExit from fetch thread
+            json_data = fetch_stage.get()
+
+    except Exception as e:
+        NewtCons.error_msg(
+            f"Script encountered an error: {e}",
+            location="mwparser.loop_next_pages_pipeline : Exception"
+        )
+
+    except SystemExit:
+        NewtCons.error_msg(
+            "SystemExit on fetching all pages",
+            location="mwparser.loop_next_pages_pipeline : SystemExit"
+        )
+
+    finally:
+        fetch_stage.close()
+
+
+def loop_next_pages_concurrent(
+        json_data: dict
+        ) -> None:
+    """Loop over page IDs with several batches in flight, restructure them in the same order as serial loop."""
+
+    max_batches = SETTING_CONCURRENT_BATCHES_PER_WIKI.get(
+        SETTINGS["FOLDER_LINK"], SETTING_CONCURRENT_BATCHES_DEFAULT
+    )
+    print(f"Concurrent batches in flight: {max_batches}")
+
+    futures_in_flight: deque[Future] = deque()
+    page_ids_left = True
+    executor = ThreadPoolExecutor(max_workers=max_batches)
+
+    try:
+        while True:
+            # Keep pool full before restructure, so next batches are fetched while files are written
+            while page_ids_left and len(futures_in_flight) < max_batches:
+                page_ids_batch = get_next_page_ids_batch()
+                if not page_ids_batch:
+                    page_ids_left = False
+                    break
+                futures_in_flight.append(executor.submit(fetch_json_pageids, page_ids_batch))
+
+            if json_data == {}:
+                break
+
+            if "query" not in json_data:
+                break
+
+            restructure_json_pageids(json_data)
+            save_checkpoint()
+
+            if not futures_in_flight:
+                break
+
+            # Result of the oldest batch, it also raises SystemExit from worker thread
+            json_data = futures_in_flight.popleft().result()
+
+    except Exception as e:
+        NewtCons.error_msg(
+            f"Script encountered an error: {e}",
+            location="mwparser.loop_next_pages_concurrent : Exception"
+        )
+
+    except SystemExit:
+        NewtCons.error_msg(
+            "SystemExit on fetching all pages",
+            location="mwparser.loop_next_pages_concurrent : SystemExit"
+        )
+
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def find_recentchanges_tail(
+        path_file: str,
+        prefix: bytes
+        ) -> int:
+    """Return offset where the last lines starting with prefix begin, file is read from the end."""
+
+    block_size = SETTING_RC_TAIL_BLOCK_BYTES
+    with open(path_file, "rb") as file_rc:
+        file_size = file_rc.seek(0, os.SEEK_END)
+
+        while True:
+            position = max(0, file_size - block_size)
+            file_rc.seek(position)
+            lines = file_rc.read().splitlines(keepends=True)
+            # First line of block may be cut in the middle
+            if position > 0:
+                lines = lines[1:]
+
+            tail_size = 0
+            for line in reversed(lines):
+                if not line.startswith(prefix):
+                    break
+                tail_size += len(line)
+            else:
+                if position > 0:
+                    block_size *= 2
+                    continue
+
+            return file_size - tail_size
+
+
+def merge_recentchanges_rows(
+        ) -> None:
+    """Merge rows after watermark into sorted recentchanges file without reading whole file."""
+
+    path_file = os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_LISTS, SETTINGS["file_name"])
+    rows_new = SETTINGS["rc_rows_new"]
+    print(f"New recent changes after watermark: {len(rows_new)}")
+
+    if not os.path.isfile(path_file):
+        rows_unique = sorted(set(map(tuple, rows_new)))
+        NewtFiles.save_csv_to_file(
+            path_file,
+            [["timestamp", "pageid", "ns", "type", "title"]] + [list(row) for row in rows_unique]
+        )
+        print()
+        return
+
+    # All new rows are not older than watermark, so only rows with watermark timestamp
+    # at the end of file can be sorted between them, take them back and write again
+    prefix = (SETTINGS["rc_watermark"]["timestamp"] + ",").encode("utf-8")
+    offset_tail = find_recentchanges_tail(path_file, prefix)
+
+    with open(path_file, "rb+") as file_rc:
+        file_rc.seek(offset_tail)
+        rows_tail = list(csv.reader(file_rc.read().decode("utf-8").splitlines()))
+        file_rc.truncate(offset_tail)
+
+    rows_unique = sorted(set(map(tuple, rows_tail + rows_new)))
+    if rows_unique:
+        NewtFiles.save_csv_to_file(
+            path_file,
+            [list(row) for row in rows_unique],
+            append=True
+        )
+    print()
+
+
+def export_catalog_list(
+        ) -> None:
+    """Remove rows older runs saw and this complete run did not, and write CSV list from catalog."""
+
+    assert CATALOG is not None  # for type checker
+
+    if wiki_data_type_set == "recentchanges":
+        # With watermark run sees only new changes, older rows stay
+        if "rc_watermark" not in SETTINGS:
+            print(f"Old recent changes removed: {CATALOG.remove_other_runs('recentchanges', CATALOG_RUN)}")
+        row_header = ["timestamp", "pageid", "ns", "type", "title"]
+        rows = CATALOG.iter_recentchanges_rows()
+
+    else:
+        # List that starts from APCONTINUE_PARAM does not see pages before it
+        if not APCONTINUE_CHECK:
+            print(f"Pages removed from list: {CATALOG.remove_other_runs('pages', CATALOG_RUN, namespace_nr_set)}")
+        row_header = ["pageid", "title"]
+        rows = CATALOG.iter_pages_rows(namespace_nr_set)
+
+    # Export goes to temporary file first, so list is never half-written
+    file_path = os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_LISTS, SETTINGS["file_name"])
+    file_path_tmp = file_path + ".tmp"
+    NewtFiles.ensure_dir_exists(file_path_tmp)
+    NewtFiles.save_csv_to_file(file_path_tmp, [row_header])
+
+    rows_batch = []
+    for row in rows:
+        rows_batch.append(row)
+        if len(rows_batch) >= SETTING_DEDUP_WRITE_ROWS:
+            NewtFiles.save_csv_to_file(file_path_tmp, rows_batch, append=True)
+            rows_batch = []
+
+    if rows_batch:
+        NewtFiles.save_csv_to_file(file_path_tmp, rows_batch, append=True)
+
+    os.replace(file_path_tmp, file_path)
+    print()
+
+
 def remove_duplicated_lines(
         ) -> None:
     """Remove duplicated lines from the recentchanges file."""
 
     file_path = os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_LISTS, SETTINGS["file_name"])
+
+    if os.path.isfile(file_path) and os.path.getsize(file_path) > SETTING_DEDUP_MAX_MBYTES * BYTES_IN_MB:
+        remove_duplicated_lines_external(file_path)
+        return
+
     lines = NewtFiles.read_csv_from_file(file_path)
 
     NewtCons.validate_input(
@@ -1111,12 +2648,213 @@ def remove_duplicated_lines(
     print()
 
 
+def save_sorted_chunk(
+        folder_chunks: str,
+        chunk: set[tuple[str, ...]]
+        ) -> str:
+    """Save sorted unique rows of one chunk to spill file and return its path."""
+
+    path_chunk = os.path.join(folder_chunks, f"chunk-{len(os.listdir(folder_chunks)):05d}.csv")
+    with open(path_chunk, "w", newline="", encoding="utf-8") as file_chunk:
+        csv.writer(file_chunk).writerows(sorted(chunk))
+
+    return path_chunk
+
+
+def remove_duplicated_lines_external(
+        file_path: str
+        ) -> None:
+    """Remove duplicated lines with sorted chunks on disk and k-way merge, result is the same as in memory."""
+
+    memory_max = SETTING_DEDUP_MAX_MBYTES * BYTES_IN_MB
+    folder_chunks = tempfile.mkdtemp(prefix="dedup-", dir=os.path.dirname(file_path))
+    print(f"Removing duplicated lines in chunks of {SETTING_DEDUP_MAX_MBYTES} MB: {file_path}")
+
+    try:
+        paths_chunks = []
+        with open(file_path, newline="", encoding="utf-8") as file_list:
+            reader = csv.reader(file_list)
+            row_header = next(reader, [])
+
+            chunk: set[tuple[str, ...]] = set()
+            chunk_size = 0
+            for row in reader:
+                # Ensure header does not exist in data lines
+                if row == row_header:
+                    continue
+
+                row_tuple = tuple(row)
+                if row_tuple in chunk:
+                    continue
+
+                chunk.add(row_tuple)
+                # Approximate size of tuple and str objects in memory
+                chunk_size += 80 + sum(50 + len(field) for field in row)
+                if chunk_size >= memory_max:
+                    paths_chunks.append(save_sorted_chunk(folder_chunks, chunk))
+                    chunk = set()
+                    chunk_size = 0
+
+            if chunk:
+                paths_chunks.append(save_sorted_chunk(folder_chunks, chunk))
+            # Release last chunk before merge
+            chunk = set()
+
+        print(f"Sorted chunks: {len(paths_chunks)}")
+
+        # Merged result goes to temporary file first, so list is never half-written
+        file_path_tmp = os.path.join(folder_chunks, "merged.csv")
+        NewtFiles.save_csv_to_file(file_path_tmp, [row_header])
+
+        files_chunks = [open(path_chunk, newline="", encoding="utf-8") for path_chunk in paths_chunks]
+        try:
+            rows_merged = heapq.merge(*(map(tuple, csv.reader(file_chunk)) for file_chunk in files_chunks))
+
+            # Rows come sorted, so duplicates from different chunks are neighbours
+            row_previous = None
+            rows_batch = []
+            for row_tuple in rows_merged:
+                if row_tuple == row_previous:
+                    continue
+                row_previous = row_tuple
+                rows_batch.append(list(row_tuple))
+
+                if len(rows_batch) >= SETTING_DEDUP_WRITE_ROWS:
+                    NewtFiles.save_csv_to_file(file_path_tmp, rows_batch, append=True)
+                    rows_batch = []
+
+            if rows_batch:
+                NewtFiles.save_csv_to_file(file_path_tmp, rows_batch, append=True)
+
+        finally:
+            for file_chunk in files_chunks:
+                file_chunk.close()
+
+        os.replace(file_path_tmp, file_path)
+
+    finally:
+        shutil.rmtree(folder_chunks, ignore_errors=True)
+
+    print()
+
+
+def get_log_name(
+        ) -> str:
+    """Return name of log files of run, log file with this name is what check_todo() looks for."""
+
+    if wiki_data_type_set in (
+            "allpages",
+            "pageids",
+            "history",
+            "allcontent",
+            ):
+        return f"{wiki_data_type_set}-{namespace_nr_set:0{SETTINGS['ns_max_key_len']}d}"
+    return wiki_data_type_set
+
+
+def save_run_metrics(
+        run_status: str
+        ) -> dict:
+    """Save metrics and profiling of run, it is registered with atexit, so run that stops with error saves them too."""
+
+    atexit.unregister(save_run_metrics)
+
+    path_logs = os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_LOGS)
+    log_name = get_log_name()
+
+    limiter = MwRateLimit.get_limiter(SETTINGS["BASE_URL"])
+    MwMetrics.add("rate_limiter_requests", limiter.count_requests)
+    MwMetrics.add("rate_limiter_throttled", limiter.count_throttled)
+    metrics_summary = MwMetrics.save_summary(
+        os.path.join(path_logs, f"{log_name}-metrics.json"),
+        {
+            "config": file_config_set,
+            "type": wiki_data_type_set,
+            "namespace": namespace_nr_set,
+            "time_start": TIME_RUN_START,
+            "status": run_status,
+            "checks": {
+                "ASYNC_TRANSPORT_CHECK": ASYNC_TRANSPORT_CHECK,
+                "CONCURRENT_CHECK": CONCURRENT_CHECK,
+                "PACKED_STORE_CHECK": PACKED_STORE_CHECK,
+                "WRITER_POOL_CHECK": WRITER_POOL_CHECK,
+                "PARALLEL_DOWNLOAD_CHECK": PARALLEL_DOWNLOAD_CHECK,
+                "SETTING_PAGE_COMPRESSION": SETTING_PAGE_COMPRESSION,
+            },
+        }
+    )
+    MwMetrics.stop_profiling(os.path.join(path_logs, log_name))
+
+    return metrics_summary
+
+
 if __name__ == "__main__":
     NewtCons.check_location(DIR_GLOBAL, MUST_LOCATION)
-    TODO_LIST = check_todo()
+    # Before first limiter is created, limiters of all hosts get it
+    MwRateLimit.SETTING_RATE_LIMITED = RATE_LIMIT_CHECK
+    TODO_LIST = MwTodo.check_todo(LOGGING)
     SETTINGS = read_config()
+    if RESPONSE_CACHE_CHECK or REPLAY_CHECK:
+        RESPONSE_CACHE = get_response_cache()
+
     headers_params_for_url = prep_headers_params_for_url()
-    BLOCKED_SET = get_blocked_set()
+    BLOCKED_STORE = get_blocked_store()
+    if CATALOG_CHECK:
+        CATALOG = get_catalog(SETTINGS)
+    TIME_RUN_START = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    MwMetrics.start_profiling(PROFILE_CHECK, TRACEMALLOC_CHECK)
+    # Run that stops with error exits from NewtCons.error_msg(), metrics are saved then too
+    atexit.register(save_run_metrics, "stopped")
+    RUN_STATUS = "complete"
+
+    if wiki_data_type_set in ("pageids", "pagesrecent", "allcontent"):
+        try:
+            MwStorage.check_codec(SETTING_PAGE_COMPRESSION)
+        except (ValueError, ImportError) as e:
+            NewtCons.error_msg(
+                f"Page compression is not available: {e}",
+                location="mwparser.__main__ : SETTING_PAGE_COMPRESSION"
+            )
+
+    if LOCATION_INDEX_CHECK and wiki_data_type_set in ("pageids", "pagesrecent", "allcontent"):
+        PAGE_LOCATIONS = get_page_locations()
+
+    if PARALLEL_DOWNLOAD_CHECK and wiki_data_type_set == "savefiles":
+        IMAGE_DOWNLOADER = MwDownloader.ImageDownloader(
+            {"User-Agent": headers_params_for_url[0]["User-Agent"]},
+            SETTING_IMAGE_MAX_MBYTES,
+            workers=SETTING_DOWNLOAD_WORKERS,
+            on_fail=save_missing_image,
+            logging=LOGGING
+        )
+
+    if INCREMENTAL_CHECK and wiki_data_type_set == "pageids":
+        prepare_incremental_pageids()
+
+    if RESUME_CHECK and wiki_data_type_set in ("pageids", "pagesrecent", "savefiles"):
+        load_checkpoint()
+
+    if ADAPTIVE_BATCH_CHECK and wiki_data_type_set in ("pageids", "pagesrecent"):
+        load_batch_size()
+
+    # Parquet files have all pages of namespace, so only run that writes all of them again writes them
+    if COLUMNAR_CHECK and wiki_data_type_set in ("pageids", "allcontent") and SETTINGS.get("namespace_rewritten"):
+        try:
+            COLUMNAR_WRITER = MwColumnar.ColumnarWriter(os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"], MwColumnar.FOLDER_COLUMNAR))
+        except ImportError as e:
+            NewtCons.error_msg(
+                f"Parquet export is not available: {e}",
+                location="mwparser.__main__ : COLUMNAR_CHECK"
+            )
+        assert COLUMNAR_WRITER is not None  # for type checker
+        COLUMNAR_WRITER.start_namespace(f"{namespace_nr_set:0{SETTINGS['ns_max_key_len']}d}")
+        # Export of stopped run is removed, previous export of namespace stays
+        atexit.register(COLUMNAR_WRITER.abort)
+
+    # Packed store appends to one segment file, it is written in parser thread
+    if WRITER_POOL_CHECK and not PACKED_STORE_CHECK and wiki_data_type_set in ("pageids", "pagesrecent", "allcontent"):
+        PAGE_WRITER = MwWriter.WriterPool()
+
     json_data = get_json_from_url()
 
     try:
@@ -1125,16 +2863,54 @@ def remove_duplicated_lines(
                 data_list, continue_page_backup = restructure_json_allpages(json_data)
                 save_data_list(data_list, False)
                 loop_next_pages(json_data, continue_page_backup)
-                remove_duplicated_lines()
-
-            case "pageids" | "pagesrecent" | "savefiles":
+                if CATALOG is not None:
+                    export_catalog_list()
+                else:
+                    remove_duplicated_lines()
+
+            case "pageids" | "pagesrecent":
+                if CONCURRENT_CHECK:
+                    loop_next_pages_concurrent(json_data)
+                elif PAGE_WRITER is not None:
+                    loop_next_pages_pipeline(json_data)
+                else:
+                    loop_next_pages(json_data)
+
+            case "savefiles":
                 loop_next_pages(json_data)
+                if IMAGE_DOWNLOADER is not None:
+                    IMAGE_DOWNLOADER.close()
+
+            case "history":
+                loop_history_pages()
+
+            case "allcontent":
+                data_list, continue_page_backup = restructure_json_allcontent(json_data)
+                save_data_list(data_list, False)
+                loop_next_pages(json_data, continue_page_backup)
+                if CATALOG is not None:
+                    export_catalog_list()
+                else:
+                    remove_duplicated_lines()
 
             case "recentchanges":
                 data_list = restructure_json_recentchanges(json_data)
                 save_data_list(data_list, False)
                 loop_next_pages(json_data)
-                remove_duplicated_lines()
+
+                if CATALOG is not None:
+                    export_catalog_list()
+                elif "rc_rows_new" in SETTINGS:
+                    merge_recentchanges_rows()
+                else:
+                    remove_duplicated_lines()
+
+                # Watermark moves only after successful run
+                if "rc_newest" in SETTINGS and SETTINGS["rc_newest"]["rcid"] > 0:
+                    save_json_to_file_atomic(
+                        os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_LISTS, FILE_RECENTCHANGES_WATERMARK),
+                        SETTINGS["rc_newest"]
+                    )
 
             case _:
                 NewtCons.error_msg(
@@ -1144,18 +2920,57 @@ def remove_duplicated_lines(
     except KeyboardInterrupt:
         print()
         print("=== Script interrupted by user ===")
+        RUN_STATUS = "interrupted"
 
-    print("=== ✅ END ✅ ===")
+    if PAGE_WRITER is not None:
+        PAGE_WRITER.close()
 
-    if SAVE_LOG:
-        if wiki_data_type_set in (
-                "allpages",
-                "pageids",
-                ):
-            file_target_name = f"{wiki_data_type_set}-{namespace_nr_set:0{SETTINGS['ns_max_key_len']}d}.txt"
+    if COLUMNAR_WRITER is not None:
+        atexit.unregister(COLUMNAR_WRITER.abort)
+        # Interrupted run has only part of namespace
+        if RUN_STATUS == "interrupted":
+            COLUMNAR_WRITER.abort()
         else:
-            file_target_name = f"{wiki_data_type_set}.txt"
+            print(f"Pages written to Parquet files: {COLUMNAR_WRITER.close()}")
+
+    if "manifest" in SETTINGS:
+        # Manifest has only pages that are already written, so it is safe to save after interrupt
+        save_json_to_file_atomic(SETTINGS["path_manifest"], SETTINGS["manifest"])
+
+    remove_checkpoint()
+
+    if "batch_sizes" in SETTINGS and not SETTINGS["batch_size_frozen"]:
+        SETTINGS["batch_sizes"][get_batch_sizes_key()] = SETTINGS["batch_size"]
+        save_json_to_file_atomic(SETTINGS["path_batch_sizes"], SETTINGS["batch_sizes"])
+
+    for store in PACKED_STORES.values():
+        store.close()
+
+    if PAGE_LOCATIONS is not None:
+        PAGE_LOCATIONS.close()
 
-        path_target = os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_LOGS, file_target_name)
+    if CATALOG is not None:
+        # blocked.txt stays the list to edit by hand, catalog gets its copy for queries
+        CATALOG.replace_blocked(BLOCKED_STORE.titles, BLOCKED_STORE.page_ids)
+        CATALOG.close()
+
+    if ASYNC_TRANSPORT_CHECK:
+        MwTransport.close_sessions()
+
+    # Replay keeps expired answers, they are the only copy of data it reads
+    if RESPONSE_CACHE is not None and not REPLAY_CHECK:
+        count_cached, size_cached = RESPONSE_CACHE.evict()
+        print(f"Response cache: {count_cached} answers, {size_cached / (1024 * 1024):.1f} MB")
+
+    METRICS_SUMMARY = save_run_metrics(RUN_STATUS)
+
+    print(f"Run seconds: {METRICS_SUMMARY['run_seconds']}")
+    for TIMER_NAME, TIMER_VALUES in METRICS_SUMMARY["timers"].items():
+        print(f"  {TIMER_NAME}: {TIMER_VALUES['seconds']} s in {TIMER_VALUES['count']} calls")
+
+    print("=== ✅ END ✅ ===")
+
+    if SAVE_LOG:
+        path_target = os.path.join(DIR_GLOBAL, SETTINGS["FOLDER_LINK"], FOLDER_LOGS, f"{get_log_name()}.txt")
 
         NewtFiles.cleanup_logging(SETUP_LOGGING_DATA, path_target)
@@ -0,0 +1,471 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+import sys
+import os
+import gzip
+import mmap
+import struct
+from collections.abc import Iterator
+from typing import BinaryIO, NamedTuple
+
+FOLDER_RAW = os.path.join("data", "raw")
+FOLDER_RAW_PACKED = os.path.join("data", "raw", "packed")
+FOLDER_RAW_REMOVED = os.path.join("data", "raw", "removed")
+FILE_INDEX = "index.bin"
+
+# New segment file is started when current one would grow over this size
+SETTING_SEGMENT_MAX_MBYTES = 256
+
+BYTES_IN_MB = 1024 * 1024
+
+# Compression of page text, id is kept in index record, extension is added to page file name
+# zstd needs Python 3.14+ or zstandard package
+CODECS = {
+    "none": 0,
+    "gzip": 1,
+    "zstd": 2,
+}
+CODEC_NAMES = {value: key for key, value in CODECS.items()}
+CODEC_EXTENSIONS = {
+    "none": "",
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+SETTING_GZIP_LEVEL = 6
+SETTING_ZSTD_LEVEL = 9
+
+# Folder class of page, names are the same as folders in data/raw
+# "missing" pages are moved by pageids/pagesrecent to data/raw/removed/<ns>-<pageid>.txt
+FOLDER_CLASSES = {
+    "pages": 0,
+    "redirect": 1,
+    "removed": 2,
+    "missing": 3,
+}
+FOLDER_CLASS_NAMES = {value: key for key, value in FOLDER_CLASSES.items()}
+# Index record that removes page from store
+FOLDER_CLASS_DELETED = 255
+
+# Page ID, segment number, offset, length, flags
+# Flags have folder class in low 4 bits and codec in high 4 bits
+INDEX_RECORD = struct.Struct("<QIQIB")
+
+
+class PageRecord(NamedTuple):
+    """Page text with its place in data/raw, the same for files and packed store."""
+
+    namespace: str
+    page_id: int
+    folder_class: str
+    text: str
+
+
+def get_zstd_module(
+        ):
+    """Return zstd module of standard library or zstandard package."""
+
+    try:
+        from compression import zstd  # type: ignore[import-not-found]
+        return zstd
+    except ImportError:
+        pass
+
+    try:
+        import zstandard  # type: ignore[import-not-found]
+        return zstandard
+    except ImportError:
+        raise ImportError("zstd compression needs Python 3.14+ or package: pip install zstandard") from None
+
+
+def check_codec(
+        codec: str
+        ) -> None:
+    """Raise error early if codec is unknown or its module is missing."""
+
+    if codec not in CODECS:
+        raise ValueError(f"Unknown compression: {codec}, expected one of {list(CODECS)}")
+    if codec == "zstd":
+        get_zstd_module()
+
+
+def compress(
+        data: bytes,
+        codec: str
+        ) -> bytes:
+    match codec:
+        case "none":
+            return data
+        case "gzip":
+            # mtime=0 keeps the same bytes for the same text
+            return gzip.compress(data, compresslevel=SETTING_GZIP_LEVEL, mtime=0)
+        case "zstd":
+            return get_zstd_module().compress(data, SETTING_ZSTD_LEVEL)
+        case _:
+            raise ValueError(f"Unknown compression: {codec}")
+
+
+def decompress(
+        data: bytes,
+        codec: str
+        ) -> bytes:
+    match codec:
+        case "none":
+            return data
+        case "gzip":
+            return gzip.decompress(data)
+        case "zstd":
+            return get_zstd_module().decompress(data)
+        case _:
+            raise ValueError(f"Unknown compression: {codec}")
+
+
+def get_codec_from_path(
+        path_file: str
+        ) -> str:
+    for codec, extension in CODEC_EXTENSIONS.items():
+        if extension and path_file.endswith(extension):
+            return codec
+    return "none"
+
+
+def save_page_file(
+        path_file: str,
+        text: str,
+        codec: str
+        ) -> None:
+    """Save compressed page text to file, codec must match file extension."""
+
+    os.makedirs(os.path.dirname(path_file), exist_ok=True)
+    with open(path_file, "wb") as file_page:
+        file_page.write(compress(text.encode("utf-8"), codec))
+
+
+def read_page_file(
+        path_file: str
+        ) -> str:
+    """Read page text from file, compression is taken from file extension."""
+
+    with open(path_file, "rb") as file_page:
+        return decompress(file_page.read(), get_codec_from_path(path_file)).decode("utf-8")
+
+
+class PackedStore:
+    """Pages of one namespace in append-only segment files with index of page ID to segment, offset, length and folder class."""
+
+    def __init__(
+            self,
+            path_folder: str,
+            segment_max_mbytes: float = SETTING_SEGMENT_MAX_MBYTES
+            ) -> None:
+        self.path_folder = path_folder
+        self.path_index = os.path.join(path_folder, FILE_INDEX)
+        self.segment_max_bytes = int(segment_max_mbytes * BYTES_IN_MB)
+
+        # Page ID to segment number, offset, length, flags
+        self.index: dict[int, tuple[int, int, int, int]] = {}
+        self.segment_nr = 0
+        self.segment_size = 0
+        self.file_segment: BinaryIO | None = None
+        self.file_index: BinaryIO | None = None
+        self.segment_maps: dict[int, mmap.mmap] = {}
+
+        self.load_index()
+
+    def get_path_segment(
+            self,
+            segment_nr: int
+            ) -> str:
+        return os.path.join(self.path_folder, f"segment-{segment_nr:05d}.dat")
+
+    def load_index(
+            self
+            ) -> None:
+        """Read index records, the last record of page wins."""
+
+        if not os.path.isdir(self.path_folder):
+            return
+
+        segments = sorted(
+            int(name[len("segment-"):-len(".dat")]) for name in os.listdir(self.path_folder)
+            if name.startswith("segment-") and name.endswith(".dat")
+        )
+        segment_sizes = {segment_nr: os.path.getsize(self.get_path_segment(segment_nr)) for segment_nr in segments}
+        if segments:
+            self.segment_nr = segments[-1]
+            self.segment_size = segment_sizes[self.segment_nr]
+
+        if not os.path.isfile(self.path_index):
+            return
+
+        with open(self.path_index, "rb") as file_index:
+            data_index = file_index.read()
+
+        # Record can be half-written after crash, cut it
+        size_usable = len(data_index) - len(data_index) % INDEX_RECORD.size
+
+        for page_id, segment_nr, offset, length, flags in INDEX_RECORD.iter_unpack(data_index[:size_usable]):
+            if flags == FOLDER_CLASS_DELETED:
+                self.index.pop(page_id, None)
+                continue
+
+            # Data of record was not written to disk before crash
+            if offset + length > segment_sizes.get(segment_nr, 0):
+                continue
+
+            self.index[page_id] = (segment_nr, offset, length, flags)
+
+        if size_usable != len(data_index):
+            with open(self.path_index, "rb+") as file_index:
+                file_index.truncate(size_usable)
+
+    def open_for_append(
+            self
+            ) -> None:
+        if self.file_segment is not None:
+            return
+
+        os.makedirs(self.path_folder, exist_ok=True)
+        self.file_segment = open(self.get_path_segment(self.segment_nr), "ab")
+        self.file_index = open(self.path_index, "ab")
+
+    def append_record(
+            self,
+            page_id: int,
+            segment_nr: int,
+            offset: int,
+            length: int,
+            flags: int
+            ) -> None:
+        self.open_for_append()
+        assert self.file_index is not None  # for type checker
+        self.file_index.write(INDEX_RECORD.pack(page_id, segment_nr, offset, length, flags))
+
+    def put(
+            self,
+            page_id: int,
+            folder_class: str,
+            text: str,
+            codec: str = "none"
+            ) -> None:
+        """Append page text to current segment, older text of page stays in segment but is not indexed."""
+
+        data = compress(text.encode("utf-8"), codec)
+        flags = FOLDER_CLASSES[folder_class] | CODECS[codec] << 4
+        self.open_for_append()
+        assert self.file_segment is not None  # for type checker
+
+        if self.segment_size > 0 and self.segment_size + len(data) > self.segment_max_bytes:
+            self.file_segment.close()
+            self.segment_nr += 1
+            self.segment_size = 0
+            self.file_segment = open(self.get_path_segment(self.segment_nr), "ab")
+
+        offset = self.segment_size
+        self.file_segment.write(data)
+        self.segment_size += len(data)
+
+        self.append_record(page_id, self.segment_nr, offset, len(data), flags)
+        self.index[page_id] = (self.segment_nr, offset, len(data), flags)
+
+    def move(
+            self,
+            page_id: int,
+            folder_class: str
+            ) -> bool:
+        """Change folder class of page without copying its text, return False if page is not in store."""
+
+        if page_id not in self.index:
+            return False
+
+        segment_nr, offset, length, flags = self.index[page_id]
+        flags = FOLDER_CLASSES[folder_class] | (flags & 0xF0)
+        self.append_record(page_id, segment_nr, offset, length, flags)
+        self.index[page_id] = (segment_nr, offset, length, flags)
+        return True
+
+    def delete(
+            self,
+            page_id: int
+            ) -> bool:
+        """Remove page from index, return False if page is not in store."""
+
+        if page_id not in self.index:
+            return False
+
+        self.append_record(page_id, 0, 0, 0, FOLDER_CLASS_DELETED)
+        del self.index[page_id]
+        return True
+
+    def get_folder_class(
+            self,
+            page_id: int
+            ) -> str | None:
+        if page_id not in self.index:
+            return None
+        return FOLDER_CLASS_NAMES[self.index[page_id][3] & 0x0F]
+
+    def read_bytes(
+            self,
+            segment_nr: int,
+            offset: int,
+            length: int
+            ) -> bytes:
+        """Read part of segment through mmap, map is opened again if segment has grown."""
+
+        if length == 0:
+            return b""
+
+        if segment_nr == self.segment_nr and self.file_segment is not None:
+            self.file_segment.flush()
+
+        segment_map = self.segment_maps.get(segment_nr)
+        if segment_map is None or offset + length > len(segment_map):
+            if segment_map is not None:
+                segment_map.close()
+            with open(self.get_path_segment(segment_nr), "rb") as file_segment:
+                segment_map = mmap.mmap(file_segment.fileno(), 0, access=mmap.ACCESS_READ)
+            self.segment_maps[segment_nr] = segment_map
+
+        return segment_map[offset:offset + length]
+
+    def get(
+            self,
+            page_id: int
+            ) -> tuple[str, str] | None:
+        """Return folder class and text of page, or None if page is not in store."""
+
+        if page_id not in self.index:
+            return None
+
+        segment_nr, offset, length, flags = self.index[page_id]
+        data = decompress(self.read_bytes(segment_nr, offset, length), CODEC_NAMES[flags >> 4])
+        return (FOLDER_CLASS_NAMES[flags & 0x0F], data.decode("utf-8"))
+
+    def iter_pages(
+            self
+            ) -> Iterator[tuple[int, str, str]]:
+        """Yield page ID, folder class and text for all pages, sorted by page ID."""
+
+        for page_id in sorted(self.index):
+            page = self.get(page_id)
+            if page is not None:
+                yield (page_id, page[0], page[1])
+
+    def flush(
+            self
+            ) -> None:
+        """Flush segment before index, so index never points to data that is not on disk."""
+
+        if self.file_segment is not None:
+            self.file_segment.flush()
+            os.fsync(self.file_segment.fileno())
+        if self.file_index is not None:
+            self.file_index.flush()
+            os.fsync(self.file_index.fileno())
+
+    def close(
+            self
+            ) -> None:
+        self.flush()
+
+        for file_open in (self.file_segment, self.file_index):
+            if file_open is not None:
+                file_open.close()
+        self.file_segment = None
+        self.file_index = None
+
+        for segment_map in self.segment_maps.values():
+            segment_map.close()
+        self.segment_maps.clear()
+
+
+def iter_page_records(
+        path_wiki: str,
+        namespace_dir: str | None = None
+        ) -> Iterator[PageRecord]:
+    """Yield decompressed pages of one or all namespaces from packed stores and page files.
+
+    Args:
+        path_wiki: Path to FOLDER_LINK of wiki.
+        namespace_dir: Namespace folder name like "0000", None for all namespaces.
+
+    Returns:
+        Iterator of PageRecord, packed stores first, then files of pages, redirect and removed folders.
+    """
+
+    path_packed = os.path.join(path_wiki, FOLDER_RAW_PACKED)
+    if os.path.isdir(path_packed):
+        for store_dir in sorted(os.listdir(path_packed)):
+            if namespace_dir is not None and store_dir != namespace_dir:
+                continue
+
+            store = PackedStore(os.path.join(path_packed, store_dir))
+            try:
+                for page_id, folder_class, text in store.iter_pages():
+                    yield PageRecord(store_dir, page_id, folder_class, text)
+            finally:
+                store.close()
+
+    for folder_class in ("pages", "redirect", "removed"):
+        path_folder = os.path.join(path_wiki, FOLDER_RAW, folder_class)
+        if not os.path.isdir(path_folder):
+            continue
+
+        for entry_ns in sorted(os.scandir(path_folder), key=lambda entry: entry.name):
+            # Missing pages are moved to removed folder as <ns>-<pageid>.txt
+            if entry_ns.is_file() and folder_class == "removed":
+                ns_part, _, page_part = entry_ns.name.partition("-")
+                if namespace_dir is None or ns_part == namespace_dir:
+                    page_id = int(page_part.split(".", 1)[0])
+                    yield PageRecord(ns_part, page_id, "missing", read_page_file(entry_ns.path))
+                continue
+
+            if not entry_ns.is_dir() or (namespace_dir is not None and entry_ns.name != namespace_dir):
+                continue
+
+            for entry_page in sorted(os.scandir(entry_ns.path), key=lambda entry: entry.name):
+                if entry_page.is_file() and ".txt" in entry_page.name:
+                    page_id = int(entry_page.name.split(".", 1)[0])
+                    yield PageRecord(entry_ns.name, page_id, folder_class, read_page_file(entry_page.path))
+
+
+def export_to_files(
+        path_wiki: str,
+        namespace_dir: str
+        ) -> int:
+    """Write pages of one namespace store to the per-file layout in data/raw and return count of pages."""
+
+    store = PackedStore(os.path.join(path_wiki, FOLDER_RAW_PACKED, namespace_dir))
+    count_pages = 0
+
+    try:
+        for page_id, folder_class, text in store.iter_pages():
+            if folder_class == "missing":
+                path_file = os.path.join(path_wiki, FOLDER_RAW_REMOVED, f"{namespace_dir}-{page_id:010d}.txt")
+            else:
+                path_file = os.path.join(path_wiki, FOLDER_RAW, folder_class, namespace_dir, f"{page_id:010d}.txt")
+
+            os.makedirs(os.path.dirname(path_file), exist_ok=True)
+            with open(path_file, "w", encoding="utf-8") as file_page:
+                file_page.write(text)
+            count_pages += 1
+
+    finally:
+        store.close()
+
+    return count_pages
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python mwparser/storage.py <path to FOLDER_LINK> <namespace folder, e.g. 0000>")
+        sys.exit(1)
+
+    count_exported = export_to_files(sys.argv[1], sys.argv[2])
+    print(f"Exported pages: {count_exported}")
@@ -0,0 +1,126 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+import os
+
+import newtutils.console as NewtCons
+import newtutils.utility as NewtUtil
+import newtutils.files as NewtFiles
+
+# Shared by script.py and scheduler.py, importing this file has no side effects
+DIR_PROJECT = os.path.dirname(os.path.realpath(__file__))
+DIR_GLOBAL = os.path.dirname(os.path.dirname(DIR_PROJECT))
+
+FOLDER_LOGS = os.path.join("data", "logs")
+FILE_NAMESPACES = os.path.join("data", "schemas", "namespace_types.json")
+
+WIKI_DATA_TYPE_DICT = {
+    "1": "allpages",
+    "2": "pageids",
+    "3": "recentchanges",
+    "4": "pagesrecent",
+    "5": "savefiles",
+    "6": "history",
+    "7": "allcontent",
+}
+
+
+def check_todo(
+        logging: bool = True
+        ) -> list[tuple[str, str, str]]:
+    """ Check for missing log files based on existing config files and return a list of tasks to do. """
+
+    todo_list = []
+    path_config = os.path.join(DIR_PROJECT, "configs")
+    for file in os.listdir(path_config):
+        # Skip if it's not a file (e.g., directory)
+        if not os.path.isfile(os.path.join(path_config, file)):
+            continue
+
+        # Skip specific config example file
+        if file == "xxx.json":
+            continue
+
+        # Skip non-config files
+        if not file.endswith(".json"):
+            NewtCons.error_msg(
+                f"Found non-config file: {file}", stop=False,
+                location="mwparser.check_todo : non-config file"
+            )
+            continue
+
+        # Get settings from config file
+        path_config_file = os.path.join(path_config, file)
+        file_settings = NewtFiles.read_json_from_file(path_config_file)
+        NewtCons.validate_input(
+            file_settings, dict, check_non_empty=True,
+            location="mwparser.check_todo : file_settings"
+        )
+        assert isinstance(file_settings, dict)  # for type checker
+
+        # Check required keys in file_settings
+        NewtUtil.check_dict_keys(
+            file_settings, {"FOLDER_LINK", "BASE_URL"},
+            location="mwparser.check_todo : file_settings"
+        )
+
+        for value in file_settings.values():
+            NewtCons.validate_input(
+                value, str, check_non_empty=True,
+                location="mwparser.check_todo : file_settings[value]"
+            )
+
+        # Check if namespace_types.json exists for the config
+        path_namespace_types = os.path.join(DIR_GLOBAL, file_settings["FOLDER_LINK"], FILE_NAMESPACES)
+        if not os.path.isfile(path_namespace_types):
+            NewtCons.error_msg(
+                f"Missing namespace_types.json for config: {file}",
+                f"File must be here: {path_namespace_types}",
+                location="mwparser.check_todo : namespace_types.json missing"
+            )
+
+        # Get namespace types from file
+        ns_dict = NewtFiles.read_json_from_file(path_namespace_types)
+        NewtCons.validate_input(
+            ns_dict, dict, check_non_empty=True,
+            location="mwparser.check_todo : ns_dict"
+        )
+        assert isinstance(ns_dict, dict)
+
+        # Calculate max key length from namespace types for formatting
+        max_key_len = len(max(ns_dict.keys(), key=len))
+
+        path_logs = os.path.join(DIR_GLOBAL, file_settings["FOLDER_LINK"], FOLDER_LOGS)
+
+        for wiki_data_type in WIKI_DATA_TYPE_DICT.values():
+            # Full history is crawled only on demand, it is too slow for every run
+            # Combined allpages and pageids pass is run on demand instead of the two tasks
+            if wiki_data_type in ("history", "allcontent"):
+                continue
+
+            if wiki_data_type in ("allpages", "pageids"):
+                for ns_key, ns_value in ns_dict.items():
+                    name_wiki_log_file = f"{wiki_data_type}-{int(ns_key):0{max_key_len}d}.txt"
+                    path_wiki_log_file = os.path.join(path_logs, name_wiki_log_file)
+                    if not os.path.isfile(path_wiki_log_file):
+                        todo_list.append((file, wiki_data_type, ns_key, ns_value))
+            else:
+                name_wiki_log_file = f"{wiki_data_type}.txt"
+                path_wiki_log_file = os.path.join(path_logs, name_wiki_log_file)
+                if not os.path.isfile(path_wiki_log_file):
+                    todo_list.append((file, wiki_data_type, None, None))
+
+    print()
+    if todo_list and logging:
+        print("=== TODO LIST ===")
+        todo_list.reverse()
+        for todo in todo_list:
+            print(todo)
+        print()
+
+    return todo_list
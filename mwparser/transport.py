@@ -0,0 +1,379 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import socket
+import ssl
+import threading
+import time
+import zlib
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+import ratelimit as MwRateLimit
+
+# Max open keep-alive connections per BASE_URL
+SETTING_POOL_CONNECTIONS = 8
+# Seconds to wait for connection and for full response
+SETTING_TIMEOUT_SECONDS = 60
+# Max repeats of one request on network error or 5xx / 429 answer
+SETTING_REPEAT_ON_FAIL = 3
+# Seconds to wait before repeat, multiplied by attempt number
+SETTING_REPEAT_WAIT_SECONDS = 2
+# Max redirects of one request, like http to https or moved api.php, urllib of NewtNet follows them too
+SETTING_MAX_REDIRECTS = 5
+STATUS_REDIRECTS = (301, 302, 303, 307, 308)
+
+LOOP_LOCK = threading.Lock()
+transport_loop: asyncio.AbstractEventLoop | None = None
+sessions: dict[str, AsyncSession] = {}
+
+
+class HttpResponse:
+    """Status, lower-case headers and decoded body of one HTTP response."""
+
+    def __init__(
+            self,
+            status: int,
+            headers: dict[str, str],
+            body: bytes
+            ) -> None:
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def text(
+            self
+            ) -> str:
+        return self.body.decode("utf-8")
+
+
+class AsyncSession:
+    """Pool of HTTP/1.1 keep-alive connections to the host of one BASE_URL."""
+
+    def __init__(
+            self,
+            base_url: str,
+            max_connections: int = SETTING_POOL_CONNECTIONS,
+            timeout: float = SETTING_TIMEOUT_SECONDS
+            ) -> None:
+        url_parts = urlsplit(base_url)
+        if url_parts.scheme not in ("http", "https") or not url_parts.hostname:
+            raise ValueError(f"Unsupported URL for session: {base_url}")
+
+        self.base_url = base_url
+        self.host = url_parts.hostname
+        self.port = url_parts.port or (443 if url_parts.scheme == "https" else 80)
+        self.path = url_parts.path or "/"
+        self.host_header = url_parts.netloc.rpartition("@")[2]
+        self.ssl_context = ssl.create_default_context() if url_parts.scheme == "https" else None
+        self.timeout = timeout
+
+        self.idle_connections: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self.connection_slots = asyncio.Semaphore(max_connections)
+        self.count_requests = 0
+        self.count_connections = 0
+
+    async def get(
+            self,
+            params: dict | None = None,
+            headers: dict | None = None
+            ) -> HttpResponse:
+        """Send GET request with params to BASE_URL and read full response."""
+
+        target = self.path
+        if params:
+            target += "?" + urlencode(params)
+
+        request_headers = {
+            "Host": self.host_header,
+            "Connection": "keep-alive",
+            "Accept-Encoding": "gzip, deflate",
+        }
+        request_headers.update(headers or {})
+
+        request_lines = [f"GET {target} HTTP/1.1"]
+        request_lines.extend(f"{key}: {value}" for key, value in request_headers.items())
+        request_bytes = ("\r\n".join(request_lines) + "\r\n\r\n").encode("latin-1")
+
+        async with self.connection_slots:
+            # Second attempt only for reused connection, server may close it while it was idle
+            for attempt in range(2):
+                reused, reader, writer = await self.open_connection()
+                try:
+                    writer.write(request_bytes)
+                    await writer.drain()
+                    response, keep_alive = await asyncio.wait_for(
+                        self.read_response(reader), self.timeout
+                    )
+
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    if reused and attempt == 0:
+                        continue
+                    raise
+
+                except BaseException:
+                    writer.close()
+                    raise
+
+                self.count_requests += 1
+                if keep_alive:
+                    self.idle_connections.append((reader, writer))
+                else:
+                    writer.close()
+
+                return response
+
+        raise ConnectionError(f"No connection to {self.base_url}")  # for type checker
+
+    async def open_connection(
+            self
+            ) -> tuple[bool, asyncio.StreamReader, asyncio.StreamWriter]:
+        """Take idle connection from pool or open a new one."""
+
+        while self.idle_connections:
+            reader, writer = self.idle_connections.pop()
+            if not reader.at_eof() and not writer.is_closing():
+                return (True, reader, writer)
+            writer.close()
+
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=self.ssl_context),
+            self.timeout
+        )
+        # Requests are small and answer is awaited, so do not hold them back for ACK
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        self.count_connections += 1
+        return (False, reader, writer)
+
+    async def read_response(
+            self,
+            reader: asyncio.StreamReader
+            ) -> tuple[HttpResponse, bool]:
+        """Read status, headers and body, return response and keep-alive flag."""
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by server")
+
+        status_parts = status_line.decode("latin-1").split(None, 2)
+        if len(status_parts) < 2 or not status_parts[0].startswith("HTTP/"):
+            raise ConnectionError(f"Unexpected status line: {status_line!r}")
+
+        headers: dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = (
+            status_parts[0] == "HTTP/1.1"
+            and headers.get("connection", "").lower() != "close"
+        )
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = await self.read_chunked(reader)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await reader.read()
+            keep_alive = False
+
+        match headers.get("content-encoding", "").lower():
+            case "gzip":
+                body = gzip.decompress(body)
+            case "deflate":
+                try:
+                    body = zlib.decompress(body)
+                except zlib.error:
+                    body = zlib.decompress(body, -zlib.MAX_WBITS)
+
+        return (HttpResponse(int(status_parts[1]), headers, body), keep_alive)
+
+    async def read_chunked(
+            self,
+            reader: asyncio.StreamReader
+            ) -> bytes:
+        """Read body with chunked transfer encoding."""
+
+        chunks = []
+        while True:
+            size_line = await reader.readline()
+            size = int(size_line.split(b";", 1)[0].strip(), 16)
+            if size == 0:
+                # Skip trailers up to empty line
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+        return b"".join(chunks)
+
+    async def close(
+            self
+            ) -> None:
+        """Close all idle connections."""
+
+        while self.idle_connections:
+            _, writer = self.idle_connections.pop()
+            writer.close()
+
+
+def get_event_loop(
+        ) -> asyncio.AbstractEventLoop:
+    """Start the background event loop once and return it."""
+
+    global transport_loop
+
+    with LOOP_LOCK:
+        if transport_loop is None:
+            transport_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=transport_loop.run_forever,
+                name="mwparser-transport", daemon=True
+            ).start()
+
+    return transport_loop
+
+
+def get_session(
+        base_url: str
+        ) -> AsyncSession:
+    """Return shared session for BASE_URL, create it on first use."""
+
+    with LOOP_LOCK:
+        if base_url not in sessions:
+            sessions[base_url] = AsyncSession(base_url)
+
+    return sessions[base_url]
+
+
+def get_redirect_target(
+        base_url: str,
+        params: dict | None,
+        location: str
+        ) -> tuple[str, dict]:
+    """Return URL without query and params of Location header, relative Location is resolved against request URL."""
+
+    url_request = base_url + ("?" + urlencode(params) if params else "")
+    url_parts = urlsplit(urljoin(url_request, location))
+    return (
+        urlunsplit((url_parts.scheme, url_parts.netloc, url_parts.path, "", "")),
+        dict(parse_qsl(url_parts.query, keep_blank_values=True))
+    )
+
+
+def fetch_response(
+        base_url: str,
+        params: dict | None = None,
+        headers: dict | None = None
+        ) -> HttpResponse:
+    """Run one GET request on the background loop and wait for the response, safe to call from any thread.
+
+    Redirects are followed up to SETTING_MAX_REDIRECTS, every target gets its own session,
+    the last redirect response is returned if there are more.
+    """
+
+    for _ in range(SETTING_MAX_REDIRECTS + 1):
+        session = get_session(base_url)
+        future = asyncio.run_coroutine_threadsafe(
+            session.get(params, headers), get_event_loop()
+        )
+        response = future.result()
+
+        if response.status not in STATUS_REDIRECTS or not response.headers.get("location"):
+            return response
+        base_url, params = get_redirect_target(base_url, params, response.headers["location"])
+
+    return response
+
+
+def fetch_text(
+        base_url: str,
+        params: dict | None = None,
+        headers: dict | None = None,
+        logging: bool = True,
+        limiter: MwRateLimit.RateLimiter | None = None
+        ) -> str | None:
+    """Fetch text through the shared session, return None on failure like NewtNet.fetch_data_from_url().
+
+    Args:
+        base_url: URL of api.php.
+        params: Query parameters.
+        headers: Extra request headers.
+        logging: Print status of every response.
+        limiter: Rate limiter of host, it gives token for every attempt and gets 429 / 503 feedback.
+
+    Returns:
+        Decoded body of 200 response, or None.
+    """
+
+    for attempt in range(1, SETTING_REPEAT_ON_FAIL + 1):
+        if limiter is not None:
+            limiter.acquire()
+
+        try:
+            response = fetch_response(base_url, params, headers)
+
+        except (OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+            if logging:
+                print(f"Request failed ({attempt}/{SETTING_REPEAT_ON_FAIL}): {e!r}")
+            time.sleep(SETTING_REPEAT_WAIT_SECONDS * attempt)
+            continue
+
+        if logging:
+            print(f"Status {response.status}: {len(response.body)} bytes from {base_url}")
+
+        if response.status == 200:
+            if limiter is not None:
+                limiter.on_success()
+            return response.text
+
+        if response.status in (429, 503):
+            retry_after = MwRateLimit.parse_retry_after(response.headers.get("retry-after"))
+            # Limiter pauses all workers of host, next acquire() waits for it
+            if limiter is not None:
+                limiter.on_throttle(retry_after)
+            else:
+                time.sleep(retry_after if retry_after is not None else SETTING_REPEAT_WAIT_SECONDS * attempt)
+            continue
+
+        if response.status >= 500:
+            time.sleep(SETTING_REPEAT_WAIT_SECONDS * attempt)
+            continue
+
+        # 403 Forbidden and other client errors will not change on repeat
+        return None
+
+    return None
+
+
+def close_sessions(
+        ) -> None:
+    """Close all sessions and stop the background loop."""
+
+    global transport_loop
+
+    with LOOP_LOCK:
+        if transport_loop is None:
+            return
+
+        for session in sessions.values():
+            asyncio.run_coroutine_threadsafe(session.close(), transport_loop).result()
+        sessions.clear()
+
+        transport_loop.call_soon_threadsafe(transport_loop.stop)
+        transport_loop = None
@@ -0,0 +1,234 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+
+import ratelimit as MwRateLimit
+
+USER_AGENT = "MyGuildWarsBot/1.2 (burova.anna+parser+bot@gmail.com)"
+
+# Params of every query, script.py and crawler.py add params of mode to them
+PARAMS_QUERY = {
+    "action": "query",
+    "format": "json",
+    "maxlag": "2",
+    "utf8": "true",
+    "formatversion": "2",
+}
+# Latest revision content of pages, used by pageids, pagesrecent and allcontent
+PARAMS_PAGES_CONTENT = {
+    "prop": "revisions",
+    "rvprop": "content",
+    "rvslots": "*",
+}
+
+# Keys of answer with pages of prop=revisions, one answer has all pages of request
+KEYS_PAGES_ANSWER = {"query", "batchcomplete"}
+
+# Page files of pageids, pagesrecent and allcontent, read back by columnar.py
+LINE_REVISION = "-" * 80 + "\n"
+LINE_END = "=== END ==="
+
+CONTENT_MODEL = "wikitext"
+CONTENT_FORMAT = "text/x-wiki"
+
+# Content shorter than this is an emptied page
+CONTENT_MIN_LENGTH = 6
+
+
+def get_error(
+        data_from_url: str
+        ) -> dict | None:
+    """Return error of wiki answer, None if answer is not error.
+
+    Error answers are short, so only the beginning of text is checked before decoding it.
+    """
+
+    if not data_from_url.startswith('{"error"'):
+        return None
+
+    try:
+        json_error = json.loads(data_from_url)
+    except json.JSONDecodeError:
+        return None
+
+    if not isinstance(json_error, dict) or not isinstance(json_error.get("error"), dict):
+        return None
+    return json_error["error"]
+
+
+def is_maxlag(
+        error: dict | None
+        ) -> bool:
+    """Wiki is behind with replication, the same request can be sent again after wait."""
+
+    return error is not None and error.get("code") == "maxlag"
+
+
+def get_headers(
+        user_agent: str = USER_AGENT
+        ) -> dict[str, str]:
+    return {
+        "User-Agent": user_agent,
+        "Accept-Encoding": "gzip",
+    }
+
+
+def fetch_repeat_on_maxlag(
+        fetch_once: Callable[[], str | None],
+        limiter: MwRateLimit.RateLimiter,
+        wait_seconds: float,
+        max_repeats: int,
+        report_success: bool = True
+        ) -> str | None:
+    """Return answer of fetch_once(), request is sent again while wiki reports maxlag.
+
+    All requests to host pause for wait_seconds after maxlag. Other error answers are returned to caller.
+    RuntimeError if wiki still reports maxlag after max_repeats requests.
+
+    Args:
+        fetch_once: Sends request once and returns answer text or None, it takes token of limiter itself.
+        limiter: Rate limiter of wiki host.
+        wait_seconds: Pause after maxlag error.
+        max_repeats: Max requests of one call.
+        report_success: Tell limiter about successful answer, transport of limiter does it itself.
+    """
+
+    for _ in range(max_repeats):
+        data_from_url = fetch_once()
+
+        wiki_error = get_error(data_from_url) if isinstance(data_from_url, str) else None
+        if wiki_error is None:
+            if data_from_url and report_success:
+                limiter.on_success()
+            return data_from_url
+
+        if not is_maxlag(wiki_error):
+            return data_from_url
+
+        print(f"Wiki reports maxlag: {wiki_error.get('info', '')}")
+        limiter.on_throttle(wait_seconds)
+
+    raise RuntimeError(f"Wiki still reports maxlag after {max_repeats} repeats")
+
+
+def get_list_answer_keys(
+        json_data: dict
+        ) -> set[str]:
+    """Return keys of allpages and recentchanges answer, every part but the last has continue."""
+
+    if "continue" in json_data:
+        return {"query", "batchcomplete", "limits", "continue"}
+    return {"query", "batchcomplete", "limits"}
+
+
+def check_answer_keys(
+        item: object,
+        keys_expected: set[str],
+        location: str
+        ) -> None:
+    """ValueError if item is not dict with exactly these keys, the same check as NewtUtil.check_dict_keys() for library code."""
+
+    if not isinstance(item, dict) or set(item) != keys_expected:
+        keys_found = sorted(item) if isinstance(item, dict) else type(item).__name__
+        raise ValueError(f"{location}: expected keys {sorted(keys_expected)}, found {keys_found}")
+
+
+def fetch_bisect(
+        item_ids: list[int],
+        fetch_part: Callable[[list[int]], list[dict] | None]
+        ) -> list[dict]:
+    """Return items of all IDs, part whose fetch_part() returns None is split in halves and fetched again.
+
+    fetch_part() must not return None for one ID, it decides itself what to do with one failed ID.
+    """
+
+    items = fetch_part(item_ids)
+    if items is not None:
+        return items
+
+    if len(item_ids) < 2:
+        raise ValueError(f"Part with one ID can not be split: {item_ids}")
+
+    index_middle = len(item_ids) // 2
+    return fetch_bisect(item_ids[:index_middle], fetch_part) + fetch_bisect(item_ids[index_middle:], fetch_part)
+
+
+def get_page_header(
+        page: dict,
+        namespace_name: str
+        ) -> str:
+    return (
+        f"Namespace ::: {page['ns']} ::: {namespace_name}\n"
+        f"Page ID   ::: {page['pageid']}\n"
+        f"Title     ::: {page['title']}\n\n"
+    )
+
+
+def get_unexpected_content_key(
+        slot_main: dict
+        ) -> str | None:
+    """Return key of main slot with unexpected value, None if revision is wikitext."""
+
+    if slot_main["contentmodel"] != CONTENT_MODEL:
+        return "contentmodel"
+    if slot_main["contentformat"] != CONTENT_FORMAT:
+        return "contentformat"
+    return None
+
+
+def find_unexpected_content(
+        page: dict
+        ) -> tuple[str, str] | None:
+    """Return key and value of main slot of the first revision that is not wikitext, None if all revisions are.
+
+    Page with other contentmodel is blocked by caller, other contentformat is an error.
+    """
+
+    for revision in page["revisions"]:
+        content_key = get_unexpected_content_key(revision["slots"]["main"])
+        if content_key is not None:
+            return (content_key, revision["slots"]["main"][content_key])
+    return None
+
+
+def get_folder_class(
+        content: str,
+        folder_class: str
+        ) -> str:
+    """Return folder class after one more revision, the last matching revision wins."""
+
+    if len(content) < CONTENT_MIN_LENGTH:
+        folder_class = "removed"
+
+    if content.lower().startswith("#redirect"):
+        folder_class = "redirect"
+
+    return folder_class
+
+
+def format_page_text(
+        page: dict,
+        namespace_name: str
+        ) -> tuple[str, str]:
+    """Return folder class and text of page file, revisions must be checked with find_unexpected_content() before."""
+
+    folder_class = "pages"
+    # Parts are joined once, repeated += copies text of large pages again for every revision
+    text_parts = [get_page_header(page, namespace_name)]
+
+    for revision in page["revisions"]:
+        content = revision["slots"]["main"]["content"]
+        folder_class = get_folder_class(content, folder_class)
+
+        text_parts.append(LINE_REVISION)
+        text_parts.append(f"{content}\n\n")
+
+    text_parts.append(LINE_END)
+    return (folder_class, "".join(text_parts))
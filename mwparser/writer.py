@@ -0,0 +1,200 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+from collections.abc import Callable
+
+# Threads that write page files
+SETTING_WRITER_WORKERS = 4
+# Files waiting in queue of one thread, then parser waits for free place
+SETTING_WRITER_QUEUE_DEPTH = 100
+# Written files are fsynced together on barrier()
+SETTING_WRITER_FSYNC = True
+# Fetched batches waiting for parser, then fetch thread waits for free place
+SETTING_PARSE_QUEUE_DEPTH = 2
+
+
+def fsync_files(
+        paths_files: list[str]
+        ) -> None:
+    """Fsync written files, so they are on disk before checkpoint says so."""
+
+    for path_file in paths_files:
+        # File can be moved to removed folder after it was written
+        if not os.path.isfile(path_file):
+            continue
+        # Read-write mode, fsync of read-only descriptor fails on Windows
+        file_descriptor = os.open(path_file, os.O_RDWR)
+        try:
+            os.fsync(file_descriptor)
+        finally:
+            os.close(file_descriptor)
+
+
+class FetchStage:
+    """Fetch stage for batches, one thread calls fetch_next() and puts batches into bounded parse queue.
+
+    Parser takes batches in the same order with get(), so checkpoints of the oldest batch stay right.
+    Error of fetch thread, also SystemExit, is raised in parser thread.
+    """
+
+    def __init__(
+            self,
+            fetch_next: Callable[[], dict],
+            queue_depth: int = SETTING_PARSE_QUEUE_DEPTH
+            ) -> None:
+        self.fetch_next = fetch_next
+        self.queue: queue.Queue[tuple[dict, BaseException | None]] = queue.Queue(maxsize=queue_depth)
+        self.stopped = threading.Event()
+
+        self.thread = threading.Thread(target=self.run_fetch, name="mwparser-fetch", daemon=True)
+        self.thread.start()
+
+    def run_fetch(
+            self
+            ) -> None:
+        while not self.stopped.is_set():
+            try:
+                batch = self.fetch_next()
+            except BaseException as e:
+                self.queue.put(({}, e))
+                return
+
+            self.queue.put((batch, None))
+            # Empty batch is the end of list
+            if not batch:
+                return
+
+    def get(
+            self
+            ) -> dict:
+        """Return next fetched batch, empty dict after the last one."""
+
+        batch, error = self.queue.get()
+        if error is not None:
+            raise error
+        return batch
+
+    def close(
+            self
+            ) -> None:
+        """Stop fetch thread after its current request, batches not taken by parser are dropped."""
+
+        self.stopped.set()
+        while self.thread.is_alive():
+            # Fetch thread can wait for free place in full queue
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.thread.join(timeout=0.1)
+
+
+class WriterPool:
+    """Write stage for page files, files with the same key always go to the same thread, so their writes keep order."""
+
+    def __init__(
+            self,
+            workers: int = SETTING_WRITER_WORKERS,
+            queue_depth: int = SETTING_WRITER_QUEUE_DEPTH,
+            fsync: bool = SETTING_WRITER_FSYNC
+            ) -> None:
+        self.fsync = fsync
+
+        self.queues: list[queue.Queue[tuple[str, Callable[[], None]] | None]] = [
+            queue.Queue(maxsize=queue_depth) for _ in range(workers)
+        ]
+        self.paths_lock = threading.Lock()
+        self.paths_unsynced: list[str] = []
+        self.error: BaseException | None = None
+        self.count_written = 0
+
+        self.threads = [
+            threading.Thread(target=self.run_worker, args=(nr,), name=f"mwparser-writer-{nr}", daemon=True)
+            for nr in range(workers)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def put(
+            self,
+            key: int,
+            path_file: str,
+            write: Callable[[], None]
+            ) -> None:
+        """Queue write of one file, wait only if queue of its thread is full."""
+
+        self.raise_error()
+        self.queues[key % len(self.queues)].put((path_file, write))
+
+    def run_worker(
+            self,
+            nr: int
+            ) -> None:
+        while True:
+            task = self.queues[nr].get()
+            if task is None:
+                self.queues[nr].task_done()
+                break
+
+            path_file, write = task
+            try:
+                write()
+                with self.paths_lock:
+                    self.paths_unsynced.append(path_file)
+                    self.count_written += 1
+
+            except BaseException as e:
+                with self.paths_lock:
+                    if self.error is None:
+                        self.error = e
+
+            finally:
+                self.queues[nr].task_done()
+
+    def raise_error(
+            self
+            ) -> None:
+        """Raise the first error of writer threads in the calling thread."""
+
+        if self.error is not None:
+            raise RuntimeError(f"Page writer failed: {self.error!r}") from self.error
+
+    def barrier(
+            self
+            ) -> None:
+        """Wait until all queued files are written and fsync them in one pass."""
+
+        for queue_worker in self.queues:
+            queue_worker.join()
+
+        with self.paths_lock:
+            paths_to_sync = self.paths_unsynced
+            self.paths_unsynced = []
+
+        if self.fsync:
+            fsync_files(paths_to_sync)
+
+        self.raise_error()
+
+    def close(
+            self
+            ) -> None:
+        """Write and fsync all queued files and stop threads."""
+
+        try:
+            self.barrier()
+        finally:
+            for queue_worker in self.queues:
+                queue_worker.put(None)
+            for thread in self.threads:
+                thread.join()
+
+        print(f"Page files written: {self.count_written}")
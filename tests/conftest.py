@@ -0,0 +1,15 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+import sys
+import os
+
+# Modules of mwparser import each other by file name, like script.py does when run from its folder
+DIR_PROJECT = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "mwparser")
+if DIR_PROJECT not in sys.path:
+    sys.path.insert(0, DIR_PROJECT)
@@ -0,0 +1,78 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+import os
+
+import blocklist as MwBlocklist
+
+
+def read_lines(
+        path_file
+        ) -> list[str]:
+    with open(path_file, encoding="utf-8") as file_blocked:
+        return file_blocked.read().splitlines()
+
+
+def test_add_has(tmp_path):
+    path_file = tmp_path / "lists" / "blocked.txt"
+    store = MwBlocklist.BlockedStore(str(path_file))
+
+    assert store.add_title("Some page")
+    assert not store.add_title("Some_page")
+    assert store.add_page_id(42)
+    assert not store.add_page_id(42)
+
+    assert store.has_title("Some page")
+    assert store.has_title("Some_page")
+    assert store.has_page_id(42)
+    assert not store.has_page_id(43)
+    assert read_lines(path_file) == ["Some_page", f"{MwBlocklist.PAGE_ID_PREFIX}42"]
+
+
+def test_load(tmp_path):
+    path_file = tmp_path / "blocked.txt"
+    path_file.write_text(f"Title_one\n\n{MwBlocklist.PAGE_ID_PREFIX}7\nTitle_two", encoding="utf-8")
+
+    store = MwBlocklist.BlockedStore(str(path_file))
+    assert store.titles == {"Title_one", "Title_two"}
+    assert store.page_ids == {7}
+
+    # Last line without line break is not joined with new entry
+    store.add_title("Title three")
+    assert read_lines(path_file)[-2:] == ["Title_two", "Title_three"]
+
+
+def test_load_duplicates_compacted(tmp_path):
+    path_file = tmp_path / "blocked.txt"
+    path_file.write_text("B\nA\nB\n", encoding="utf-8")
+
+    MwBlocklist.BlockedStore(str(path_file))
+    assert read_lines(path_file) == ["B", "A"]
+
+
+def test_load_unchanged_not_written(tmp_path):
+    path_file = tmp_path / "blocked.txt"
+    path_file.write_text(f"B\nA\n{MwBlocklist.PAGE_ID_PREFIX}7", encoding="utf-8")
+    os.utime(path_file, ns=(0, 0))
+
+    store = MwBlocklist.BlockedStore(str(path_file))
+    assert os.stat(path_file).st_mtime_ns == 0
+
+    store.add_title("C")
+    assert read_lines(path_file) == ["B", "A", f"{MwBlocklist.PAGE_ID_PREFIX}7", "C"]
+
+
+def test_read_only(tmp_path):
+    path_file = tmp_path / "blocked.txt"
+    path_file.write_text("B\nA\nB\n", encoding="utf-8")
+
+    store = MwBlocklist.BlockedStore(str(path_file), read_only=True)
+    store.add_title("C")
+
+    assert store.has_title("C")
+    assert read_lines(path_file) == ["B", "A", "B"]
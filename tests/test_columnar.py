@@ -0,0 +1,107 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+import columnar as MwColumnar
+import wikiapi as MwWikiApi
+
+
+def get_page_text(
+        contents: list[str],
+        title: str = "Main Page"
+        ) -> str:
+    page = {
+        "pageid": 7, "ns": 0, "title": title,
+        "revisions": [{"slots": {"main": {"content": content}}} for content in contents],
+    }
+    return MwWikiApi.format_page_text(page, "Main")[1]
+
+
+@pytest.mark.parametrize("content", [
+    "Plain text",
+    "",
+    "Text with\n" + MwWikiApi.LINE_REVISION + "dash line of wikitext",
+    "Text ending with end line\n" + MwWikiApi.LINE_END,
+])
+def test_parse_page_text_round_trip(content):
+    assert MwColumnar.parse_page_text(get_page_text([content])) == (0, "Main Page", content)
+
+
+def test_parse_page_text_several_revisions():
+    namespace, title, content = MwColumnar.parse_page_text(get_page_text(["First", "Second"]))
+
+    assert (namespace, title) == (0, "Main Page")
+    assert content == "First\n\n" + MwWikiApi.LINE_REVISION + "Second"
+
+
+def test_parse_page_text_no_revisions():
+    assert MwColumnar.parse_page_text(get_page_text([])) == (0, "Main Page", "")
+
+
+@pytest.mark.parametrize("text", [
+    "No header",
+    "Namespace ::: 0\nPage ID   ::: 7\nTitle     ::: A\n\nNo revision line\n\n" + MwWikiApi.LINE_END,
+    get_page_text(["Cut"])[:-len(MwWikiApi.LINE_END)],
+])
+def test_parse_page_text_broken(text):
+    with pytest.raises(ValueError):
+        MwColumnar.parse_page_text(text)
+
+
+def read_partition(
+        path_folder: str,
+        folder_class: str = "pages",
+        namespace_dir: str = "0000"
+        ) -> list[str]:
+    _, parquet = MwColumnar.get_pyarrow_modules()
+    path_file = os.path.join(path_folder, "pages", folder_class, namespace_dir, "part-00000.parquet")
+    return parquet.read_table(path_file).column("title").to_pylist()
+
+
+def test_columnar_writer_close(tmp_path):
+    pytest.importorskip("pyarrow")
+
+    columnar_writer = MwColumnar.ColumnarWriter(str(tmp_path))
+    columnar_writer.start_namespace("0000")
+    columnar_writer.add_page("0000", 7, "pages", get_page_text(["Text"], "Old"))
+    assert columnar_writer.close() == 1
+    assert read_partition(str(tmp_path)) == ["Old"]
+
+    columnar_writer.start_namespace("0000")
+    columnar_writer.add_page("0000", 7, "pages", get_page_text(["Text"], "New"))
+    columnar_writer.close()
+
+    assert read_partition(str(tmp_path)) == ["New"]
+    assert not os.path.exists(tmp_path / "pages.tmp")
+
+
+def test_columnar_writer_abort_keeps_previous(tmp_path):
+    pytest.importorskip("pyarrow")
+
+    columnar_writer = MwColumnar.ColumnarWriter(str(tmp_path))
+    columnar_writer.start_namespace("0000")
+    columnar_writer.add_page("0000", 7, "pages", get_page_text(["Text"], "Old"))
+    columnar_writer.close()
+
+    columnar_writer.start_namespace("0000")
+    columnar_writer.add_page("0000", 8, "pages", get_page_text(["Text"], "New"))
+    columnar_writer.abort()
+
+    assert read_partition(str(tmp_path)) == ["Old"]
+    assert not os.path.exists(tmp_path / "pages.tmp")
+
+
+def test_columnar_writer_not_started(tmp_path):
+    pytest.importorskip("pyarrow")
+
+    columnar_writer = MwColumnar.ColumnarWriter(str(tmp_path))
+    with pytest.raises(RuntimeError):
+        columnar_writer.add_page("0000", 7, "pages", get_page_text(["Text"]))
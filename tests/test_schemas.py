@@ -0,0 +1,66 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+import schemas as MwSchemas
+
+PAGE_ALLPAGES = {"pageid": 1, "ns": 0, "title": "Main Page"}
+
+PAGE_PAGEIDS = {
+    "pageid": 1, "ns": 0, "title": "Main Page",
+    "revisions": [{"slots": {"main": {"contentmodel": "wikitext", "contentformat": "text/x-wiki", "content": "Text"}}}],
+}
+
+
+def test_check_allpages_page():
+    assert MwSchemas.check_allpages_page(PAGE_ALLPAGES)
+    assert not MwSchemas.check_allpages_page({"pageid": 1, "ns": 0})
+    assert not MwSchemas.check_allpages_page(dict(PAGE_ALLPAGES, extra=1))
+    assert not MwSchemas.check_allpages_page([PAGE_ALLPAGES])
+
+
+def test_check_recentchanges_page():
+    page = {
+        "type": "edit", "ns": 0, "title": "Main Page", "pageid": 1,
+        "revid": 10, "old_revid": 9, "rcid": 100, "timestamp": "2026-10-01T00:00:00Z",
+    }
+    assert MwSchemas.check_recentchanges_page(page)
+    assert not MwSchemas.check_recentchanges_page({key: page[key] for key in page if key != "rcid"})
+
+
+def test_check_pageids_page_nested():
+    assert MwSchemas.check_pageids_page(PAGE_PAGEIDS)
+
+    page_no_list = dict(PAGE_PAGEIDS, revisions={"slots": {}})
+    assert not MwSchemas.check_pageids_page(page_no_list)
+
+    page_wrong_slot = dict(PAGE_PAGEIDS, revisions=[{"slots": {"main": {"content": "Text"}}}])
+    assert not MwSchemas.check_pageids_page(page_wrong_slot)
+
+    page_extra_slot = dict(PAGE_PAGEIDS, revisions=[{"slots": {"main": {}, "other": {}}}])
+    assert not MwSchemas.check_pageids_page(page_extra_slot)
+
+
+def test_check_savefiles_image():
+    image = {
+        "pageid": 1, "ns": 6, "title": "File:A.png", "imagerepository": "local",
+        "imageinfo": [{"url": "u", "descriptionurl": "d", "descriptionshorturl": "s"}],
+    }
+    assert MwSchemas.check_savefiles_image(image)
+    assert not MwSchemas.check_savefiles_image(dict(image, imageinfo=[{"url": "u"}]))
+
+
+def test_check_items():
+    assert MwSchemas.check_items([PAGE_ALLPAGES, PAGE_ALLPAGES], MwSchemas.check_allpages_page)
+    assert MwSchemas.check_items([], MwSchemas.check_allpages_page)
+    assert not MwSchemas.check_items([PAGE_ALLPAGES, {"pageid": 2}], MwSchemas.check_allpages_page)
+
+
+def test_compile_schema_any_value():
+    check_item = MwSchemas.compile_schema({"a": None, "b": {"c": None}})
+    assert check_item({"a": [1, 2], "b": {"c": None}})
+    assert not check_item({"a": 1, "b": None})
@@ -0,0 +1,149 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+import sys
+import os
+import csv
+
+import pytest
+
+# script.py needs newtutils from NewtCode projects folder
+pytest.importorskip("newtutils")
+
+# script.py reads config, data type and namespace from command line on import, pytest arguments are not them
+argv_pytest = sys.argv
+sys.argv = argv_pytest[:1]
+try:
+    import script as MwScript
+finally:
+    sys.argv = argv_pytest
+
+ROW_HEADER = ["timestamp", "pageid", "ns", "type", "title"]
+
+
+def write_rows(
+        path_file,
+        rows: list[list[str]]
+        ) -> None:
+    os.makedirs(os.path.dirname(path_file), exist_ok=True)
+    with open(path_file, "w", newline="", encoding="utf-8") as file_list:
+        csv.writer(file_list).writerows(rows)
+
+
+def read_rows(
+        path_file
+        ) -> list[list[str]]:
+    with open(path_file, newline="", encoding="utf-8") as file_list:
+        return list(csv.reader(file_list))
+
+
+@pytest.fixture
+def settings_rc(tmp_path, monkeypatch):
+    settings = {
+        "FOLDER_LINK": "wiki",
+        "file_name": MwScript.FILE_RECENTCHANGES,
+        "ns_max_key_len": 1,
+    }
+    monkeypatch.setattr(MwScript, "DIR_GLOBAL", str(tmp_path))
+    # SETTINGS is set by read_config() only when script runs
+    monkeypatch.setattr(MwScript, "SETTINGS", settings, raising=False)
+    monkeypatch.setattr(MwScript, "namespace_types_set", {"0": "Main"})
+    return settings
+
+
+def get_path_rc(
+        tmp_path
+        ) -> str:
+    return os.path.join(tmp_path, "wiki", MwScript.FOLDER_LISTS, MwScript.FILE_RECENTCHANGES)
+
+
+def test_merge_recentchanges_rows(tmp_path, settings_rc):
+    path_file = get_path_rc(tmp_path)
+    write_rows(path_file, [
+        ROW_HEADER,
+        ["2026-10-01T00:00:00Z", "0000000001", "0", "edit", "A"],
+        ["2026-10-02T00:00:00Z", "0000000003", "0", "edit", "C"],
+    ])
+    settings_rc["rc_watermark"] = {"timestamp": "2026-10-02T00:00:00Z", "rcid": 20}
+    settings_rc["rc_rows_new"] = [
+        ["2026-10-03T00:00:00Z", "0000000004", "0", "edit", "D"],
+        ["2026-10-02T00:00:00Z", "0000000002", "0", "edit", "B"],
+        ["2026-10-02T00:00:00Z", "0000000003", "0", "edit", "C"],
+    ]
+
+    MwScript.merge_recentchanges_rows()
+
+    assert read_rows(path_file) == [
+        ROW_HEADER,
+        ["2026-10-01T00:00:00Z", "0000000001", "0", "edit", "A"],
+        ["2026-10-02T00:00:00Z", "0000000002", "0", "edit", "B"],
+        ["2026-10-02T00:00:00Z", "0000000003", "0", "edit", "C"],
+        ["2026-10-03T00:00:00Z", "0000000004", "0", "edit", "D"],
+    ]
+
+
+def test_merge_recentchanges_rows_new_file(tmp_path, settings_rc):
+    settings_rc["rc_rows_new"] = [
+        ["2026-10-02T00:00:00Z", "0000000002", "0", "edit", "B"],
+        ["2026-10-01T00:00:00Z", "0000000001", "0", "edit", "A"],
+        ["2026-10-02T00:00:00Z", "0000000002", "0", "edit", "B"],
+    ]
+
+    MwScript.merge_recentchanges_rows()
+
+    assert read_rows(get_path_rc(tmp_path)) == [
+        ROW_HEADER,
+        ["2026-10-01T00:00:00Z", "0000000001", "0", "edit", "A"],
+        ["2026-10-02T00:00:00Z", "0000000002", "0", "edit", "B"],
+    ]
+
+
+def get_change(
+        rcid: int,
+        timestamp: str,
+        page_id: int = 1
+        ) -> dict:
+    return {
+        "type": "edit", "ns": 0, "title": f"Page {page_id}", "pageid": page_id,
+        "revid": rcid, "old_revid": rcid - 1, "rcid": rcid, "timestamp": timestamp,
+    }
+
+
+def test_watermark_skips_seen_changes(settings_rc):
+    settings_rc["rc_watermark"] = {"timestamp": "2026-10-02T00:00:00Z", "rcid": 20}
+    settings_rc["rc_newest"] = dict(settings_rc["rc_watermark"])
+    json_data = {
+        "batchcomplete": True,
+        "limits": {"recentchanges": 500},
+        "query": {"recentchanges": [
+            get_change(21, "2026-10-03T00:00:00Z", page_id=2),
+            get_change(20, "2026-10-02T00:00:00Z"),
+            get_change(19, "2026-10-02T00:00:00Z"),
+        ]},
+    }
+
+    rows = MwScript.restructure_json_recentchanges(json_data)
+
+    assert rows[1:] == [["2026-10-03T00:00:00Z", "0000000002", "0", "edit", "Page 2"]]
+    assert settings_rc["rc_newest"] == {"timestamp": "2026-10-03T00:00:00Z", "rcid": 21}
+
+
+def test_remove_duplicated_lines_external(tmp_path, monkeypatch):
+    # Chunks of a few rows, so merge of several sorted chunks is tested
+    monkeypatch.setattr(MwScript, "SETTING_DEDUP_MAX_MBYTES", 600 / MwScript.BYTES_IN_MB)
+    monkeypatch.setattr(MwScript, "SETTING_DEDUP_WRITE_ROWS", 3)
+
+    rows_data = [[f"2026-10-{day:02d}T00:00:00Z", f"{page_id:010d}", "0", "edit", f"Title {page_id}"]
+                 for day in (3, 1, 2) for page_id in (2, 1)]
+    path_file = tmp_path / "recentchanges.csv"
+    write_rows(path_file, [ROW_HEADER] + rows_data + [ROW_HEADER] + rows_data[::-1])
+
+    MwScript.remove_duplicated_lines_external(str(path_file))
+
+    assert read_rows(path_file) == [ROW_HEADER] + sorted(rows_data)
+    assert os.listdir(tmp_path) == ["recentchanges.csv"]
@@ -0,0 +1,140 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+import storage as MwStorage
+
+TEXT_PAGE = "Namespace ::: 0\nPage ID   ::: 0000000007\nTitle     ::: Ä page\n\nContent\n"
+
+
+def get_codecs_available(
+        ) -> list[str]:
+    codecs = ["none", "gzip"]
+    try:
+        MwStorage.get_zstd_module()
+        codecs.append("zstd")
+    except ImportError:
+        pass
+    return codecs
+
+
+@pytest.mark.parametrize("codec", ["none", "gzip", "zstd"])
+def test_compress_round_trip(codec):
+    if codec not in get_codecs_available():
+        pytest.skip("zstd needs Python 3.14+ or zstandard package")
+
+    data = TEXT_PAGE.encode("utf-8") * 10
+    assert MwStorage.decompress(MwStorage.compress(data, codec), codec) == data
+
+
+def test_check_codec_unknown():
+    with pytest.raises(ValueError):
+        MwStorage.check_codec("lz4")
+
+
+@pytest.mark.parametrize("codec", ["none", "gzip", "zstd"])
+def test_page_file_round_trip(tmp_path, codec):
+    if codec not in get_codecs_available():
+        pytest.skip("zstd needs Python 3.14+ or zstandard package")
+
+    path_file = os.path.join(tmp_path, "0000", f"0000000007.txt{MwStorage.CODEC_EXTENSIONS[codec]}")
+    MwStorage.save_page_file(path_file, TEXT_PAGE, codec)
+
+    assert MwStorage.get_codec_from_path(path_file) == codec
+    assert MwStorage.read_page_file(path_file) == TEXT_PAGE
+
+
+def test_packed_store_write_read(tmp_path):
+    store = MwStorage.PackedStore(str(tmp_path / "0000"))
+    for page_id, codec in enumerate(get_codecs_available()):
+        store.put(page_id, "pages", f"{codec}: {TEXT_PAGE}", codec)
+    store.put(100, "redirect", "old text")
+    store.put(100, "redirect", "new text")
+    store.close()
+
+    store = MwStorage.PackedStore(str(tmp_path / "0000"))
+    try:
+        for page_id, codec in enumerate(get_codecs_available()):
+            assert store.get(page_id) == ("pages", f"{codec}: {TEXT_PAGE}")
+        # The last record of page wins
+        assert store.get(100) == ("redirect", "new text")
+        assert store.get(5000) is None
+    finally:
+        store.close()
+
+
+def test_packed_store_move_delete(tmp_path):
+    store = MwStorage.PackedStore(str(tmp_path / "0000"))
+    store.put(1, "pages", "one", "gzip")
+    store.put(2, "pages", "two")
+    assert store.move(1, "removed")
+    assert store.delete(2)
+    assert not store.delete(3)
+    store.close()
+
+    store = MwStorage.PackedStore(str(tmp_path / "0000"))
+    try:
+        assert store.get(1) == ("removed", "one")
+        assert store.get(2) is None
+        assert list(store.iter_pages()) == [(1, "removed", "one")]
+    finally:
+        store.close()
+
+
+def test_packed_store_new_segment(tmp_path):
+    store = MwStorage.PackedStore(str(tmp_path / "0000"), segment_max_mbytes=10 / MwStorage.BYTES_IN_MB)
+    store.put(1, "pages", "a" * 8)
+    store.put(2, "pages", "b" * 8)
+    store.close()
+
+    assert os.path.isfile(store.get_path_segment(1))
+    store = MwStorage.PackedStore(str(tmp_path / "0000"))
+    try:
+        assert store.get(2) == ("pages", "b" * 8)
+    finally:
+        store.close()
+
+
+def test_packed_store_cut_index_record(tmp_path):
+    store = MwStorage.PackedStore(str(tmp_path / "0000"))
+    store.put(1, "pages", "one")
+    store.close()
+
+    # Half-written record after crash is cut on load
+    with open(store.path_index, "ab") as file_index:
+        file_index.write(b"\x01\x02\x03")
+
+    store = MwStorage.PackedStore(str(tmp_path / "0000"))
+    try:
+        assert store.get(1) == ("pages", "one")
+        assert os.path.getsize(store.path_index) == MwStorage.INDEX_RECORD.size
+    finally:
+        store.close()
+
+
+def test_export_to_files(tmp_path):
+    path_wiki = str(tmp_path)
+    store = MwStorage.PackedStore(os.path.join(path_wiki, MwStorage.FOLDER_RAW_PACKED, "0000"))
+    store.put(7, "pages", TEXT_PAGE, "gzip")
+    store.put(8, "redirect", "redirect text")
+    store.put(9, "missing", "missing text")
+    store.close()
+
+    assert MwStorage.export_to_files(path_wiki, "0000") == 3
+
+    path_page = os.path.join(path_wiki, MwStorage.FOLDER_RAW, "pages", "0000", "0000000007.txt")
+    with open(path_page, encoding="utf-8") as file_page:
+        assert file_page.read() == TEXT_PAGE
+    assert os.path.isfile(os.path.join(path_wiki, MwStorage.FOLDER_RAW, "redirect", "0000", "0000000008.txt"))
+    assert os.path.isfile(os.path.join(path_wiki, MwStorage.FOLDER_RAW_REMOVED, "0000-0000000009.txt"))
+
+    records = sorted(MwStorage.iter_page_records(path_wiki, "0000"))
+    assert MwStorage.PageRecord("0000", 7, "pages", TEXT_PAGE) in records
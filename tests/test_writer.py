@@ -0,0 +1,68 @@
+"""
+Created on 2026-10
+
+@author: NewtCode Anna Burova
+"""
+
+from __future__ import annotations
+
+import pytest
+
+import writer as MwWriter
+
+
+def test_fetch_stage_order():
+    batches = iter([{"nr": nr} for nr in range(5)] + [{}])
+    fetch_stage = MwWriter.FetchStage(lambda: next(batches), queue_depth=2)
+
+    try:
+        assert [fetch_stage.get() for _ in range(6)] == [{"nr": nr} for nr in range(5)] + [{}]
+    finally:
+        fetch_stage.close()
+    assert not fetch_stage.thread.is_alive()
+
+
+def test_fetch_stage_error_in_parser_thread():
+    def fetch_next():
+        raise SystemExit(1)
+
+    fetch_stage = MwWriter.FetchStage(fetch_next)
+    try:
+        with pytest.raises(SystemExit):
+            fetch_stage.get()
+    finally:
+        fetch_stage.close()
+
+
+def test_fetch_stage_close_with_full_queue():
+    fetch_stage = MwWriter.FetchStage(lambda: {"nr": 1}, queue_depth=1)
+    assert fetch_stage.get() == {"nr": 1}
+
+    fetch_stage.close()
+    assert not fetch_stage.thread.is_alive()
+
+
+def test_writer_pool_keeps_order_of_key(tmp_path):
+    path_file = tmp_path / "page.txt"
+    writer_pool = MwWriter.WriterPool(workers=2, queue_depth=1)
+
+    for nr in range(10):
+        def write(nr=nr):
+            with open(path_file, "a", encoding="utf-8") as file_page:
+                file_page.write(f"{nr}\n")
+        writer_pool.put(7, str(path_file), write)
+    writer_pool.close()
+
+    assert path_file.read_text(encoding="utf-8").splitlines() == [str(nr) for nr in range(10)]
+    assert writer_pool.count_written == 10
+
+
+def test_writer_pool_error():
+    writer_pool = MwWriter.WriterPool(workers=1)
+
+    def write():
+        raise OSError("disk full")
+    writer_pool.put(1, "page.txt", write)
+
+    with pytest.raises(RuntimeError):
+        writer_pool.close()